@@ -1,3 +1,6 @@
+import json
+import time
+
 import streamlit as st
 import requests
 
@@ -11,11 +14,22 @@ if option == "Upload Data":
     uploaded_files = st.file_uploader("Choose PDF files", type=["pdf"], accept_multiple_files=True)
     if uploaded_files:
         for uploaded_file in uploaded_files:
-            files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}
+            # Field name of the `uploaded_files: list[UploadFile]` parameter of /upload
+            files = [("uploaded_files", (uploaded_file.name, uploaded_file.getvalue(), "application/pdf"))]
             # Replace with your actual backend upload endpoint
             response = requests.post("http://localhost:8000/upload", files=files)
-            if response.status_code == 200:
-                st.success(f"Uploaded {uploaded_file.name} successfully!")
+            if response.status_code == 200 and response.json().get("job_id"):
+                job_id = response.json()["job_id"]
+                with st.spinner(f"Processing {uploaded_file.name}..."):
+                    job = {"status": "queued"}
+                    while job.get("status") in ("queued", "running"):
+                        time.sleep(1)
+                        job = requests.get(f"http://localhost:8000/jobs/{job_id}").json()
+                if job.get("status") == "completed":
+                    st.success(f"Uploaded {uploaded_file.name} successfully!")
+                else:
+                    errors = [f.get("error") for f in job.get("files", []) if f.get("error")] or [job.get("error")]
+                    st.error(f"Failed to process {uploaded_file.name}: {errors[0]}")
             else:
                 st.error(f"Failed to upload {uploaded_file.name}.")
 
@@ -25,8 +39,25 @@ elif option == "Q/A":
     if st.button("Send"):
         if user_input:
             # Replace with your actual backend chat endpoint
-            response = requests.post("http://localhost:8000/query", json={"query": user_input})
+            response = requests.post(
+                "http://localhost:8000/query/stream", json={"query": user_input}, stream=True
+            )
             if response.status_code == 200:
-                st.write("Bot:", response.json().get("answer", "No answer returned."))
+                placeholder = st.empty()
+                answer = ""
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event:"):
+                        event = line[len("event:"):].strip()
+                    elif line.startswith("data:"):
+                        data = json.loads(line[len("data:"):].strip())
+                        if event == "token":
+                            answer += data.get("text", "")
+                            placeholder.write(f"Bot: {answer}")
+                        elif event == "done":
+                            answer = data.get("answer", answer or "No answer returned.")
+                            placeholder.write(f"Bot: {answer}")
+                            if data.get("source_url"):
+                                st.write("Source:", data["source_url"])
             else:
                 st.write("Error communicating with backend.")
@@ -0,0 +1,97 @@
+"""
+Cold start of the API, measured in a fresh interpreter.
+
+Times `import main`, then runs the app's lifespan and sends /query until the
+first answer, and polls /ready until the warm-up finished. The PDF is
+ingested between the import and the lifespan, outside the measured window.
+Run by `python -m benchmarks.run --only cold_start`, which passes its fake
+latencies on and reads the JSON written to --output.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.run import _configure_environment, _install_fakes
+
+
+async def _first_answer(app, query: str, timeout: float) -> dict:
+    import httpx
+
+    from src.core.lifecycle import app_lifecycle
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        start = time.perf_counter()
+        attempts = 0
+        while time.perf_counter() - start < timeout:
+            attempts += 1
+            response = await client.post("/query", json={"query": query, "min_score": 0.0})
+            if response.json().get("statusCode") == 200:
+                break
+        first_answer_seconds = time.perf_counter() - start
+
+        while not app_lifecycle.ready and time.perf_counter() - start < timeout:
+            if (await client.get("/ready")).status_code == 200:
+                break
+            await asyncio.sleep(0.01)
+        ready_seconds = time.perf_counter() - start
+        status = (await client.get("/ready")).json()
+
+    return {
+        "first_answer_seconds": round(first_answer_seconds, 4),
+        "first_answer_attempts": attempts,
+        "ready_seconds": round(ready_seconds, 4),
+        "warmup_seconds": status.get("warmup_seconds"),
+        "components": status.get("components"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--backend", choices=("weaviate", "faiss"), default="weaviate")
+    parser.add_argument("--embeddings", choices=("fake", "real"), default="fake")
+    parser.add_argument("--embed-ms-per-text", type=float, default=0.0)
+    parser.add_argument("--weaviate-latency-ms", type=float, default=2.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    args.answer_cache = False
+    args.llm_error_rate = 0.0
+
+    with tempfile.TemporaryDirectory(prefix="rag-cold-start-") as data_dir:
+        _configure_environment(data_dir, args)
+        start = time.perf_counter()
+        import main as api
+
+        import_seconds = time.perf_counter() - start
+
+        # Nothing connects at import time, so the fakes can go in afterwards
+        fake_client = _install_fakes(args)
+        from src.db.ingestion import IngestionPipeline
+        from src.utils.document_processing import DocumentProcessor
+
+        IngestionPipeline(fake_client, "DemoCollection").run([(args.pdf, os.path.basename(args.pdf))])
+        if args.embeddings == "real":
+            # Ingestion loaded the model; drop it so the warm-up loads it again
+            DocumentProcessor._embedding_model = None
+
+        async def run():
+            async with api.lifespan(api.app):
+                return await _first_answer(api.app, "How do I renew a trader licence?", args.timeout)
+
+        results = {"import_seconds": round(import_seconds, 4), **asyncio.run(run())}
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Encode throughput, memory and accuracy of the embedding backends.
+
+Each backend runs in a fresh interpreter so its memory is measured from a
+clean process: peak RSS after loading the model and after encoding. Every
+backend encodes the same texts, and the lowest and mean cosine similarity of
+its vectors to the ones of the first backend (the PyTorch reference by
+default) are reported. The accuracy tolerance itself is asserted by
+tests/test_embedding_backends.py.
+
+Texts are chunks of --pdf when given, otherwise generated sentences of
+varying length.
+
+Usage:
+    python -m benchmarks.embedding_backends --backends torch onnx onnx-int8 --texts 2000 --output results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.run import _WORDS, percentile
+
+
+def _generated_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(_WORDS) for _ in range(rng.choice((6, 12, 40, 120, 250)))).capitalize() + "."
+        for _ in range(count)
+    ]
+
+
+def _pdf_texts(pdf_path: str, count: int):
+    from src.utils.document_processing import DocumentProcessor
+
+    processor = DocumentProcessor(file_path=pdf_path)
+    texts = []
+    for chunk in processor.iter_chunks(page for page in processor.iter_pages() if page["page_content"].strip()):
+        texts.append(chunk["chunk_text"])
+        if len(texts) == count:
+            break
+    return texts
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_worker(args):
+    """Benchmarks one backend in this process; writes its vectors and results."""
+    from src.utils.embedding_backends import load_embedding_model
+
+    with open(args.texts_file, encoding="utf-8") as f:
+        texts = json.load(f)
+    results = {"backend": args.worker, "peak_rss_mb_before_load": _peak_rss_mb()}
+
+    start = time.perf_counter()
+    model = load_embedding_model(args.model, args.worker, threads=args.threads)
+    results["load_seconds"] = round(time.perf_counter() - start, 3)
+    model.encode(texts[:8], normalize_embeddings=True, show_progress_bar=False)  # warm-up
+    results["peak_rss_mb_after_load"] = _peak_rss_mb()
+
+    vectors = None
+    throughput = {}
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        encoded = model.encode(texts, normalize_embeddings=True, show_progress_bar=False, batch_size=batch_size)
+        throughput[str(batch_size)] = round(len(texts) / (time.perf_counter() - start), 2)
+        if vectors is None:
+            vectors = np.asarray(encoded, dtype=np.float32)
+    results["texts_per_second"] = throughput
+    results["best_texts_per_second"] = max(throughput.values())
+
+    # Query-sized calls: one short text at a time
+    latencies = []
+    for text in texts[:args.single_queries]:
+        start = time.perf_counter()
+        model.encode([text[:200]], normalize_embeddings=True, show_progress_bar=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    results["single_text_p50_ms"] = round(statistics.median(latencies), 3)
+    results["single_text_p95_ms"] = round(percentile(latencies, 0.95), 3)
+    results["peak_rss_mb"] = _peak_rss_mb()
+
+    np.save(args.vectors_file, vectors)
+    with open(args.result_file, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+def _run_backend(backend: str, texts_file: str, work_dir: str, args):
+    vectors_file = os.path.join(work_dir, f"{backend}.npy")
+    result_file = os.path.join(work_dir, f"{backend}.json")
+    command = [
+        sys.executable, "-m", "benchmarks.embedding_backends",
+        "--worker", backend,
+        "--texts-file", texts_file,
+        "--vectors-file", vectors_file,
+        "--result-file", result_file,
+        "--model", args.model,
+        "--threads", str(args.threads),
+        "--single-queries", str(args.single_queries),
+        "--batch-sizes", *map(str, args.batch_sizes),
+    ]
+    subprocess.run(command, check=True, stdout=sys.stderr)
+    with open(result_file, encoding="utf-8") as f:
+        return json.load(f), np.load(vectors_file)
+
+
+def main():
+    from src.config.settings import settings
+    from src.utils.embedding_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="The first one is the accuracy reference")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL)
+    parser.add_argument("--threads", type=int, default=settings.EMBEDDING_THREADS)
+    parser.add_argument("--pdf", help="Embed chunks of this PDF instead of generated text")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--single-queries", type=int, default=100)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--texts-file", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors-file", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return 0
+
+    texts = _pdf_texts(args.pdf, args.texts) if args.pdf else _generated_texts(args.texts)
+    results = {"model": args.model, "threads": args.threads, "texts": len(texts), "backends": {}}
+    with tempfile.TemporaryDirectory(prefix="rag-embedding-") as work_dir:
+        texts_file = os.path.join(work_dir, "texts.json")
+        with open(texts_file, "w", encoding="utf-8") as f:
+            json.dump(texts, f)
+
+        reference = None
+        for backend in args.backends:
+            print(f"Benchmarking the {backend} backend...", file=sys.stderr)
+            backend_results, vectors = _run_backend(backend, texts_file, work_dir, args)
+            if reference is None:
+                reference = vectors
+            else:
+                # Both sides are normalized, so the row-wise dot product is the cosine similarity
+                cosine = np.sum(vectors * reference, axis=1)
+                backend_results["min_cosine"] = round(float(cosine.min()), 5)
+                backend_results["mean_cosine"] = round(float(cosine.mean()), 5)
+            results["backends"][backend] = backend_results
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+In-process stand-ins for Weaviate, Gemini and the embedding model, so the
+benchmarks run without network access. Every fake has a configurable
+latency to model the remote service it replaces.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+import uuid as uuid_lib
+import zlib
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def _sleep_ms(ms: float):
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+class FakeEmbeddingModel:
+    """
+    Deterministic bag-of-words embeddings: each word maps to a fixed random
+    vector (seeded by its CRC32) and a text is the sum of its words, so
+    texts that share words are close, which keeps retrieval meaningful.
+    """
+
+    def __init__(self, dim: int = 384, ms_per_text: float = 0.0):
+        self.dim = dim
+        self.ms_per_text = ms_per_text
+        self._words: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._words.get(word)
+        if vector is None:
+            vector = np.random.default_rng(zlib.crc32(word.encode("utf-8"))).standard_normal(self.dim).astype(np.float32)
+            with self._lock:
+                self._words[word] = vector
+        return vector
+
+    def encode(self, texts, normalize_embeddings: bool = False, show_progress_bar: bool = False, batch_size: int = 32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        _sleep_ms(self.ms_per_text * len(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                vectors[row] += self._word_vector(word)
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors /= norms
+        return vectors[0] if single else vectors
+
+
+class _FakeBatch:
+    def __init__(self, collection: "FakeCollection", flush_size: int):
+        self._collection = collection
+        self._flush_size = flush_size
+        self._pending: List[tuple] = []
+
+    def add_object(self, properties: Dict[str, Any], uuid: Optional[str] = None, vector=None):
+        self._pending.append((str(uuid or uuid_lib.uuid4()), dict(properties), vector))
+        if len(self._pending) >= self._flush_size:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._collection._insert(self._pending)
+            self._pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+
+class _FakeBatchManager:
+    def __init__(self, collection: "FakeCollection"):
+        self._collection = collection
+        self.failed_objects: List[Any] = []
+
+    def dynamic(self):
+        return _FakeBatch(self._collection, flush_size=100)
+
+
+class _FakeData:
+    def __init__(self, collection: "FakeCollection"):
+        self._collection = collection
+
+    def delete_many(self, where):
+        # Filter.by_id().contains_any(ids) keeps the ids on `.value`
+        ids = [str(object_id) for object_id in (getattr(where, "value", None) or [])]
+        return SimpleNamespace(successful=self._collection._delete(ids))
+
+
+class _FakeQuery:
+    def __init__(self, collection: "FakeCollection"):
+        self._collection = collection
+
+    def near_vector(self, near_vector, limit: int = 10, include_vector: bool = False, return_metadata=None, **kwargs):
+        _sleep_ms(self._collection.latency_ms)
+        scores = self._collection._cosine(near_vector)
+        order = np.argsort(-scores)[:limit]
+        return SimpleNamespace(objects=[
+            self._collection._object(int(i), include_vector, distance=1.0 - float(scores[i])) for i in order
+        ])
+
+    def hybrid(self, query: str, vector=None, alpha: float = 0.75, limit: int = 10, include_vector: bool = False,
+               return_metadata=None, **kwargs):
+        _sleep_ms(self._collection.latency_ms)
+        vector_scores = self._collection._cosine(vector) if vector is not None else np.zeros(0)
+        keyword_scores = self._collection._keyword_overlap(query)
+        fused = alpha * vector_scores + (1.0 - alpha) * keyword_scores
+        order = np.argsort(-fused)[:limit]
+        return SimpleNamespace(objects=[
+            self._collection._object(int(i), include_vector, score=float(fused[i])) for i in order
+        ])
+
+
+class FakeCollection:
+    """Brute-force cosine collection that answers the query/batch/data calls the vector store makes."""
+
+    def __init__(self, name: str, latency_ms: float):
+        self.name = name
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._properties: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self.batch = _FakeBatchManager(self)
+        self.data = _FakeData(self)
+        self.query = _FakeQuery(self)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _insert(self, objects: List[tuple]):
+        _sleep_ms(self.latency_ms)
+        with self._lock:
+            positions = {object_id: i for i, object_id in enumerate(self._ids)}
+            new_vectors = []
+            for object_id, properties, vector in objects:
+                vector = np.asarray(vector, dtype=np.float32)
+                norm = float(np.linalg.norm(vector)) or 1.0
+                if object_id in positions:
+                    self._properties[positions[object_id]] = properties
+                    self._vectors[positions[object_id]] = vector / norm
+                    continue
+                positions[object_id] = len(self._ids)
+                self._ids.append(object_id)
+                self._properties.append(properties)
+                new_vectors.append(vector / norm)
+            if new_vectors:
+                stacked = np.stack(new_vectors)
+                self._vectors = stacked if self._vectors.size == 0 else np.vstack([self._vectors, stacked])
+
+    def _delete(self, ids: List[str]) -> int:
+        _sleep_ms(self.latency_ms)
+        doomed = set(ids)
+        with self._lock:
+            keep = [i for i, object_id in enumerate(self._ids) if object_id not in doomed]
+            deleted = len(self._ids) - len(keep)
+            self._ids = [self._ids[i] for i in keep]
+            self._properties = [self._properties[i] for i in keep]
+            self._vectors = self._vectors[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+        return deleted
+
+    def _cosine(self, vector) -> np.ndarray:
+        if not self._ids:
+            return np.zeros(0, dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (float(np.linalg.norm(query)) or 1.0)
+        return self._vectors @ query
+
+    def _keyword_overlap(self, query: str) -> np.ndarray:
+        terms = set(_WORD.findall(query.lower()))
+        if not terms:
+            return np.zeros(len(self._ids), dtype=np.float32)
+        return np.array([
+            len(terms & set(_WORD.findall(properties.get("chunk_text", "").lower()))) / len(terms)
+            for properties in self._properties
+        ], dtype=np.float32)
+
+    def _object(self, i: int, include_vector: bool, distance: Optional[float] = None, score: Optional[float] = None):
+        return SimpleNamespace(
+            uuid=self._ids[i],
+            properties=dict(self._properties[i]),
+            vector=self._vectors[i].tolist() if include_vector else None,
+            metadata=SimpleNamespace(distance=distance, score=score),
+        )
+
+
+class _FakeCollections:
+    def __init__(self, latency_ms: float):
+        self._latency_ms = latency_ms
+        self._collections: Dict[str, FakeCollection] = {}
+        self._lock = threading.Lock()
+
+    def exists(self, name: str) -> bool:
+        return name in self._collections
+
+    def create(self, name: str, **kwargs) -> FakeCollection:
+        with self._lock:
+            if name in self._collections:
+                raise ValueError(f"Collection {name} already exists")
+            self._collections[name] = FakeCollection(name, self._latency_ms)
+            return self._collections[name]
+
+    def use(self, name: str) -> FakeCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollection(name, self._latency_ms)
+            return self._collections[name]
+
+    get = use
+
+    def delete(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+
+
+class FakeWeaviateClient:
+    """Stand-in for a connected Weaviate v4 client; `latency_ms` is added to every round trip."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.collections = _FakeCollections(latency_ms)
+
+    def is_ready(self) -> bool:
+        return True
+
+    def close(self):
+        return
+
+
+class FakeGeminiModel:
+    """
+    Stand-in for `genai.GenerativeModel`: answers after `latency_ms` (plus
+    `ms_per_token` for every generated token) with a short extract of the
+    prompt, and reports usage metadata like the real client.
+
+    A share `error_rate` of the calls fail like a throttled Gemini (HTTP
+    429), and `calls` counts the requests that reached the model.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, ms_per_token: float = 0.0, answer_tokens: int = 60,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.ms_per_token = ms_per_token
+        self.answer_tokens = answer_tokens
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _maybe_fail(self):
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+        if failed:
+            raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+    def _answer(self, contents: str) -> str:
+        words = _WORD.findall(contents)
+        return " ".join(words[-self.answer_tokens:])
+
+    def _usage(self, contents: str, answer: str):
+        return SimpleNamespace(prompt_token_count=len(contents) // 4, candidates_token_count=len(answer) // 4)
+
+    def _delay_ms(self) -> float:
+        return self.latency_ms + self.ms_per_token * self.answer_tokens
+
+    def generate_content(self, contents: str, **kwargs):
+        self._maybe_fail()
+        _sleep_ms(self._delay_ms())
+        answer = self._answer(contents)
+        return SimpleNamespace(text=answer, usage_metadata=self._usage(contents, answer))
+
+    async def generate_content_async(self, contents: str, stream: bool = False, **kwargs):
+        self._maybe_fail()
+        answer = self._answer(contents)
+        usage = self._usage(contents, answer)
+        if not stream:
+            await asyncio.sleep(self._delay_ms() / 1000)
+            return SimpleNamespace(text=answer, usage_metadata=usage)
+        return _FakeStream(answer.split(" "), self.latency_ms, self.ms_per_token, usage)
+
+
+class _FakeStream:
+    def __init__(self, words: List[str], first_token_ms: float, ms_per_token: float, usage):
+        self._words = words
+        self._first_token_ms = first_token_ms
+        self._ms_per_token = ms_per_token
+        self.usage_metadata = usage
+
+    async def __aiter__(self):
+        await asyncio.sleep(self._first_token_ms / 1000)
+        for i, word in enumerate(self._words):
+            if i:
+                await asyncio.sleep(self._ms_per_token / 1000)
+            yield SimpleNamespace(text=word if i == 0 else " " + word)
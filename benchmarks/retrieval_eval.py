@@ -0,0 +1,101 @@
+"""
+Recall@k and latency of the retrieval modes against the configured vector store.
+
+The evaluation set is a JSONL file with one labelled question per line:
+
+    {"query": "How do I renew my registration?", "filename": "APMC_DOCUMENTATION.pdf", "page_number": 12}
+
+`page_number` is optional; without it any chunk of the file counts as a hit.
+
+Usage:
+    python -m benchmarks.retrieval_eval eval.jsonl --top-k 5 --alpha 0.5 --output results.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from src.config.settings import settings
+from src.config.weaviate_db import close_weaviate_client, get_weaviate_client
+from src.utils.document_processing import DocumentProcessor
+
+MODES = ("vector", "hybrid")
+
+
+def _is_hit(docs, item) -> bool:
+    for doc in docs:
+        metadata = doc["metadata"]
+        if metadata.get("filename") != item["filename"]:
+            continue
+        if item.get("page_number") is None or metadata.get("page_number") == item["page_number"]:
+            return True
+    return False
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def evaluate(items, weaviate_client, class_name: str, top_k: int, alpha: float) -> dict:
+    processor = DocumentProcessor()
+    results = {}
+    query_vectors = [processor.embed_query(item["query"]) for item in items]
+    for mode in MODES:
+        hits = 0
+        latencies = []
+        for item, query_vector in zip(items, query_vectors):
+            start = time.perf_counter()
+            if mode == "hybrid":
+                docs, _ = processor.hybrid_search(
+                    item["query"], query_vector, weaviate_client, class_name, top_k=top_k, alpha=alpha
+                )
+            else:
+                docs, _ = processor.search_by_vector(query_vector, weaviate_client, class_name, top_k=top_k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += _is_hit(docs, item)
+        results[mode] = {
+            f"recall_at_{top_k}": round(hits / len(items), 4),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(_percentile(latencies, 0.50), 3),
+            "p95_ms": round(_percentile(latencies, 0.95), 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("eval_file", help="JSONL file of labelled questions")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=settings.HYBRID_ALPHA)
+    parser.add_argument("--class-name", default=settings.WEAVIATE_CLASS_NAME)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    with open(args.eval_file, encoding="utf-8") as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    if not items:
+        raise SystemExit("The evaluation file is empty.")
+
+    weaviate_client = get_weaviate_client() if settings.VECTOR_STORE_BACKEND == "weaviate" else None
+    try:
+        results = {
+            "backend": settings.VECTOR_STORE_BACKEND,
+            "questions": len(items),
+            "top_k": args.top_k,
+            "alpha": args.alpha,
+            "modes": evaluate(items, weaviate_client, args.class_name, args.top_k, args.alpha),
+        }
+    finally:
+        close_weaviate_client()
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
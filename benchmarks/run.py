@@ -0,0 +1,483 @@
+"""
+Offline performance benchmarks of the RAG pipeline.
+
+Weaviate, Gemini and (by default) the embedding model are replaced by the
+in-process fakes of `benchmarks.fakes`, each with a configurable latency, so
+the numbers are reproducible without network access. Measured separately:
+
+- parse_split: PDF page extraction and chunking throughput of DocumentProcessor
+- chunking:    the chunker against the per-page LangChain splitter it replaced
+- embedding:   embedding throughput per batch size
+- ingestion:   end-to-end IngestionPipeline throughput
+- query:       /query latency percentiles under concurrent load
+- citations:   cost and accuracy of attributing answer sentences to pages
+- cold_start:  import time and time to first answer of a fresh process
+
+A synthetic PDF is generated unless --pdf is given. Results are written as
+JSON; with --baseline, metrics that regressed by more than --tolerance are
+reported and the exit code is 1. The query benchmark drives the FastAPI
+routes in-process through httpx's ASGI transport, so httpx must be installed.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --only query --concurrency 32 --requests 500 --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS = ("parse_split", "chunking", "embedding", "ingestion", "query", "citations", "cold_start")
+
+# Metrics compared against a baseline and whether higher values are better
+TRACKED_METRICS = {
+    "parse_split": {"pages_per_second": True, "chunks_per_second": True},
+    "chunking": {"chunks_per_second": True},
+    "embedding": {"best_texts_per_second": True},
+    "ingestion": {"pages_per_second": True, "chunks_per_second": True},
+    "query": {"p50_ms": False, "p95_ms": False, "p99_ms": False, "requests_per_second": True},
+    "citations": {"p50_ms": False, "p95_ms": False, "accuracy": True},
+    "cold_start": {"import_seconds": False, "first_answer_seconds": False},
+}
+
+_WORDS = (
+    "market committee registration licence trader renewal fee online portal farmer produce auction "
+    "payment receipt document application approval inspection yard commission agent permit weighbridge "
+    "arrival price report district office certificate deadline penalty appeal storage warehouse"
+).split()
+
+
+def _configure_environment(data_dir: str, args):
+    """Points every on-disk store at a scratch directory; must run before `src` is imported."""
+    os.environ.update({
+        "VECTOR_STORE_BACKEND": args.backend,
+        "FAISS_INDEX_DIR": os.path.join(data_dir, "faiss"),
+        "JOBS_DB_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+        "JOBS_UPLOAD_DIR": os.path.join(data_dir, "uploads"),
+        "MANIFEST_DB_PATH": os.path.join(data_dir, "manifest.sqlite3"),
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "RERANK_ENABLED": "false",
+        "WEAVIATE_CLASS_NAME": "DemoCollection",
+    })
+    if not args.answer_cache:
+        # Entries expire immediately, so every request runs the whole pipeline
+        os.environ["ANSWER_CACHE_TTL_SECONDS"] = "0"
+
+
+def _install_fakes(args):
+    """Swaps the Weaviate connection, Gemini client and embedding model for the in-process fakes."""
+    from benchmarks.fakes import FakeEmbeddingModel, FakeGeminiModel, FakeWeaviateClient
+    import src.config.weaviate_db as weaviate_db
+
+    fake_client = FakeWeaviateClient(latency_ms=args.weaviate_latency_ms)
+    weaviate_db.weaviate_connection = lambda: fake_client
+
+    from src.services.llm_service import LLMService
+
+    LLMService._instance = object.__new__(LLMService)
+    LLMService._client = FakeGeminiModel(
+        latency_ms=args.llm_latency_ms, ms_per_token=args.llm_ms_per_token, error_rate=args.llm_error_rate
+    )
+
+    if args.embeddings == "fake":
+        from src.utils.document_processing import DocumentProcessor
+
+        DocumentProcessor._embedding_model = FakeEmbeddingModel(ms_per_text=args.embed_ms_per_text)
+    return fake_client
+
+
+def generate_pdf(path: str, pages: int, seed: int = 0):
+    """Writes a PDF of `pages` pages of pseudo-random prose (about 3,000 characters each)."""
+    import fitz
+
+    rng = random.Random(seed)
+    document = fitz.open()
+    for page_number in range(pages):
+        sentences = [
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+            for _ in range(30)
+        ]
+        page = document.new_page()
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), f"Section {page_number + 1}. " + " ".join(sentences), fontsize=8)
+    document.save(path)
+    document.close()
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench_parse_split(pdf_path: str) -> dict:
+    from src.utils.document_processing import DocumentProcessor
+
+    processor = DocumentProcessor(file_path=pdf_path)
+    pages, parse_seconds = _timed(lambda: list(processor.iter_pages()))
+    for page in pages:
+        page["filename"] = os.path.basename(pdf_path)
+    chunks, split_seconds = _timed(lambda: list(processor.iter_chunks(pages)))
+    total = parse_seconds + split_seconds
+    return {
+        "pages": len(pages),
+        "chunks": len(chunks),
+        "parse_seconds": round(parse_seconds, 4),
+        "split_seconds": round(split_seconds, 4),
+        "pages_per_second": round(len(pages) / total, 2),
+        "chunks_per_second": round(len(chunks) / total, 2),
+    }
+
+
+def _legacy_split(pages):
+    # The splitter DocumentProcessor used before the chunker: rebuilt for every page,
+    # with a LangChain Document per chunk
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    for page in pages:
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=1500, chunk_overlap=200, length_function=len, is_separator_regex=False
+        )
+        documents = splitter.create_documents(
+            [page["page_content"]], metadatas=[{"filename": page["filename"], "page_number": page["page_number"]}]
+        )
+        for document in documents:
+            yield {"chunk_text": document.page_content, "metadata": document.metadata}
+
+
+def _measure_split(split, pages) -> dict:
+    import tracemalloc
+
+    tracemalloc.start()
+    chunks, seconds = _timed(lambda: list(split(pages)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    lengths = [len(chunk["chunk_text"]) for chunk in chunks]
+    return {
+        "chunks": len(chunks),
+        "seconds": round(seconds, 4),
+        "chunks_per_second": round(len(chunks) / seconds, 2) if seconds else None,
+        "pages_per_second": round(len(pages) / seconds, 2) if seconds else None,
+        "mean_chunk_chars": round(statistics.fmean(lengths), 1) if lengths else 0,
+        "chunks_under_500_chars": sum(1 for length in lengths if length < 500),
+        "peak_traced_mb": round(peak / (1024 * 1024), 2),
+    }
+
+
+def bench_chunking(pdf_path: str) -> dict:
+    """Splits the same pages with the chunker and with the legacy splitter (timed without uuids)."""
+    from src.utils.chunking import chunker
+    from src.utils.document_processing import DocumentProcessor
+    from src.config.settings import settings
+
+    pages = [page for page in DocumentProcessor(file_path=pdf_path).iter_pages() if page["page_content"].strip()]
+    for page in pages:
+        page["filename"] = os.path.basename(pdf_path)
+
+    def split(pages):
+        window = settings.INGEST_PAGES_PER_TASK
+        for start in range(0, len(pages), window):
+            for chunk in chunker.split_pages(pages[start:start + window]):
+                yield {"chunk_text": chunk.text}
+
+    results = {"pages": len(pages), "legacy": _measure_split(_legacy_split, pages)}
+    results.update(_measure_split(split, pages))
+    legacy_rate = results["legacy"]["chunks_per_second"]
+    if legacy_rate and results["chunks_per_second"]:
+        results["speedup"] = round(results["chunks_per_second"] / legacy_rate, 2)
+    return results
+
+
+def bench_embedding(pdf_path: str, batch_sizes) -> dict:
+    from src.utils.document_processing import DocumentProcessor
+
+    processor = DocumentProcessor(file_path=pdf_path)
+    pages = list(processor.iter_pages())
+    for page in pages:
+        page["filename"] = os.path.basename(pdf_path)
+    texts = [chunk["chunk_text"] for chunk in processor.iter_chunks(pages)]
+    model = processor.embedding_model
+    model.encode(texts[:8], normalize_embeddings=True, show_progress_bar=False)  # warm-up
+    results = {"texts": len(texts), "model": type(model).__name__, "batch_sizes": {}}
+    for batch_size in batch_sizes:
+        _, seconds = _timed(lambda: model.encode(
+            texts, normalize_embeddings=True, show_progress_bar=False, batch_size=batch_size
+        ))
+        results["batch_sizes"][str(batch_size)] = {
+            "seconds": round(seconds, 4),
+            "texts_per_second": round(len(texts) / seconds, 2),
+        }
+    results["best_texts_per_second"] = max(entry["texts_per_second"] for entry in results["batch_sizes"].values())
+    return results
+
+
+def bench_ingestion(pdf_path: str, copies: int, fake_client) -> dict:
+    from src.db.ingestion import IngestionPipeline
+
+    files = [(pdf_path, f"benchmark_{i}.pdf") for i in range(copies)]
+    pipeline = IngestionPipeline(fake_client, "BenchmarkIngestion")
+    stats = pipeline.run(files)
+    return {key: value for key, value in stats.items() if key != "failed_files"} | {
+        "files": copies,
+        "failed_files": len(stats["failed_files"]),
+    }
+
+
+def _query_texts(pdf_path: str, count: int, seed: int = 1):
+    from src.utils.document_processing import DocumentProcessor
+
+    rng = random.Random(seed)
+    processor = DocumentProcessor(file_path=pdf_path)
+    pages = list(processor.iter_pages(0, 5))
+    words = [word for page in pages for word in page["page_content"].split()]
+    return [" ".join(rng.sample(words, 6)) + f" {i}?" for i in range(count)]
+
+
+async def _load(app, queries, concurrency: int, top_k: int):
+    import httpx
+
+    latencies = []
+    statuses = {}
+    next_query = iter(queries)
+
+    async def worker(client):
+        for query in next_query:
+            start = time.perf_counter()
+            response = await client.post("/query", json={"query": query, "top_k": top_k, "min_score": 0.0})
+            latencies.append((time.perf_counter() - start) * 1000)
+            status = str(response.json().get("statusCode", response.status_code))
+            statuses[status] = statuses.get(status, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, statuses, elapsed
+
+
+def bench_query(pdf_path: str, fake_client, requests: int, concurrency: int, top_k: int) -> dict:
+    from fastapi import FastAPI
+    from src.db.ingestion import IngestionPipeline
+    from src.routes import router
+
+    IngestionPipeline(fake_client, "DemoCollection").run([(pdf_path, os.path.basename(pdf_path))])
+    app = FastAPI()
+    app.include_router(router)
+
+    queries = _query_texts(pdf_path, requests)
+
+    async def run():
+        # One event loop for both passes: the stage executor's semaphores are bound to it
+        await _load(app, [f"warm-up {query}" for query in queries[:concurrency]], concurrency, top_k)
+        return await _load(app, queries, concurrency, top_k)
+
+    latencies, statuses, elapsed = asyncio.run(run())
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+    }
+
+
+def bench_citations(pdf_path: str, fake_client, requests: int, top_k: int) -> dict:
+    """
+    Times citation attribution for answers made of sentences copied from
+    the context chunks plus one unrelated sentence, and checks that the
+    copied sentences are attributed to the page they came from.
+    """
+    from src.db.ingestion import IngestionPipeline
+    from src.services.citations import citation_builder
+    from src.services.context_builder import context_builder
+    from src.services.rag_services import _search
+    from src.utils.document_processing import DocumentProcessor
+
+    IngestionPipeline(fake_client, "DemoCollection").run([(pdf_path, os.path.basename(pdf_path))])
+    processor = DocumentProcessor(file_path=None)
+    rng = random.Random(2)
+    latencies, sentences = [], []
+    correct = attributed = copied = 0
+    for query in _query_texts(pdf_path, requests):
+        docs, _ = _search(processor, query, processor.embed_query(query), top_k, "vector", None, 0.0)
+        used = context_builder.build(docs)[1]["docs_used"]
+        if not used:
+            continue
+        parts, expected = [], []
+        for doc in rng.sample(used, min(3, len(used))):
+            spans = citation_builder.sentence_spans(doc["chunk_text"])
+            if spans:
+                start, end = rng.choice(spans)
+                parts.append(doc["chunk_text"][start:end])
+                expected.append((doc["metadata"]["filename"], doc["metadata"]["page_number"]))
+        parts.append("Please contact the office if anything is unclear.")
+        answer = " ".join(parts)
+
+        start = time.perf_counter()
+        citations = citation_builder.cite(answer, used, processor)
+        latencies.append((time.perf_counter() - start) * 1000)
+        sentences.append(len(citation_builder.sentence_spans(answer)))
+
+        offsets = []
+        offset = 0
+        for part in parts[:-1]:
+            offsets.append(offset)
+            offset += len(part) + 1
+        pages = {
+            span[0]: (citation["filename"], citation["page_number"])
+            for citation in citations for span in citation["answer_spans"]
+        }
+        for position, page in zip(offsets, expected):
+            copied += 1
+            if position in pages:
+                attributed += 1
+                correct += pages[position] == page
+
+    return {
+        "answers": len(latencies),
+        "mean_sentences": round(statistics.fmean(sentences), 2) if sentences else 0,
+        "p50_ms": round(percentile(latencies, 0.50), 3) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95), 3) if latencies else None,
+        "attributed": round(attributed / copied, 4) if copied else None,
+        "accuracy": round(correct / attributed, 4) if attributed else None,
+    }
+
+
+def bench_cold_start(pdf_path: str, args) -> dict:
+    # A fresh interpreter, so nothing is imported or loaded yet
+    with tempfile.TemporaryDirectory(prefix="rag-cold-start-") as output_dir:
+        output = os.path.join(output_dir, "cold_start.json")
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.cold_start",
+            "--pdf", pdf_path,
+            "--output", output,
+            "--backend", args.backend,
+            "--embeddings", args.embeddings,
+            "--embed-ms-per-text", str(args.embed_ms_per_text),
+            "--weaviate-latency-ms", str(args.weaviate_latency_ms),
+            "--llm-latency-ms", str(args.llm_latency_ms),
+            "--llm-ms-per-token", str(args.llm_ms_per_token),
+        ], check=True, stdout=sys.stderr, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """Returns the tracked metrics that got worse than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, metrics in TRACKED_METRICS.items():
+        current, previous = results.get(name) or {}, baseline.get(name) or {}
+        for metric, higher_is_better in metrics.items():
+            now, before = current.get(metric), previous.get(metric)
+            if not isinstance(now, (int, float)) or not isinstance(before, (int, float)) or not before:
+                continue
+            change = (now - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({
+                    "benchmark": name, "metric": metric, "baseline": before, "current": now,
+                    "change": round(change, 4),
+                })
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--pdf", help="PDF to benchmark with (default: a generated one)")
+    parser.add_argument("--pages", type=int, default=100, help="Pages of the generated PDF")
+    parser.add_argument("--ingest-copies", type=int, default=4, help="Copies of the PDF ingested together")
+    parser.add_argument("--backend", choices=("weaviate", "faiss"), default="weaviate",
+                        help="Vector store; 'weaviate' uses the in-process fake")
+    parser.add_argument("--embeddings", choices=("fake", "real"), default="fake",
+                        help="'real' loads the sentence-transformers model (must be cached locally when offline)")
+    parser.add_argument("--embed-batch-sizes", type=int, nargs="+", default=[32, 64, 256])
+    parser.add_argument("--embed-ms-per-text", type=float, default=0.0)
+    parser.add_argument("--weaviate-latency-ms", type=float, default=2.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-ms-per-token", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0,
+                        help="Share of Gemini calls failing with a 429, retried by the LLM gateway")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache enabled")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as data_dir:
+        _configure_environment(data_dir, args)
+        fake_client = _install_fakes(args)
+
+        pdf_path = args.pdf
+        if pdf_path is None:
+            pdf_path = os.path.join(data_dir, "benchmark.pdf")
+            generate_pdf(pdf_path, args.pages)
+
+        results = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+            }
+        }
+        runners = {
+            "parse_split": lambda: bench_parse_split(pdf_path),
+            "chunking": lambda: bench_chunking(pdf_path),
+            "embedding": lambda: bench_embedding(pdf_path, args.embed_batch_sizes),
+            "ingestion": lambda: bench_ingestion(pdf_path, args.ingest_copies, fake_client),
+            "query": lambda: bench_query(pdf_path, fake_client, args.requests, args.concurrency, args.top_k),
+            "citations": lambda: bench_citations(pdf_path, fake_client, args.requests, args.top_k),
+            "cold_start": lambda: bench_cold_start(pdf_path, args),
+        }
+        for name in BENCHMARKS:
+            if name in args.only:
+                print(f"Running {name} benchmark...", file=sys.stderr)
+                results[name] = runners[name]()
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance)
+        exit_code = 1 if results["regressions"] else 0
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,69 @@
-from src.config.collection_init import initialize_demo_collection
+import time
 
-# Ensure collection is initialized before app starts
-initialize_demo_collection()
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
+from src.config.settings import settings
+from src.config.weaviate_db import close_weaviate_client, get_weaviate_client
+from src.core.lifecycle import app_lifecycle
+from src.db.ingestion import parse_pool
+from src.db.jobs import get_job_worker
+from src.db.vector_store import get_vector_store
 from src.routes import router
+from src.services.llm_service import LLMService
+from src.services.rag_services import stage_executor
+from src.services.reranker import reranker
+from src.services.tenants import tenant_registry
+from src.utils.document_processing import DocumentProcessor
+
+app_lifecycle.record_import(time.perf_counter() - _import_started)
+
+
+def _warm_vector_store():
+    # Connects the shared client and makes sure every tenant's collection
+    # exists, with the self-provided vectors ingestion writes
+    client = get_weaviate_client() if settings.VECTOR_STORE_BACKEND == "weaviate" else None
+    for tenant in tenant_registry.all():
+        get_vector_store(client, tenant.collection).ensure_collection()
+
+
+def _warm_embedding_model():
+    # Loads the model (and the embedding cache) and runs one forward pass
+    DocumentProcessor().embed_query("warm-up")
 
-app = FastAPI()
+
+def _warmup_steps():
+    steps = [
+        ("vector_store", _warm_vector_store),
+        ("embedding_model", _warm_embedding_model),
+        ("llm_client", LLMService),
+    ]
+    if settings.RERANK_ENABLED:
+        steps.append(("reranker", lambda: reranker.warmup(wait=True)))
+    return steps
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: the server accepts connections right away and
+    # /ready reports when the clients and models are ready
+    app_lifecycle.start(_warmup_steps())
+    # Resume unfinished ingestion jobs and start the background workers
+    get_job_worker().start()
+    yield
+    # Running jobs write to SQLite and the vector store: let them finish before the clients close
+    get_job_worker().stop(settings.JOB_SHUTDOWN_TIMEOUT_SECONDS)
+    stage_executor.shutdown()
+    parse_pool.shutdown()
+    close_weaviate_client()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    import uvicorn
+
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
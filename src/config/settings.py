@@ -8,7 +8,135 @@ class Settings:
     GEMINI_LLM_MODEL = os.getenv("GEMINI_LLM_MODEL")
     WEAVIATE_URL = os.getenv("WEAVIATE_URL")
     WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY")
-    WEAVIATE_CLASS_NAME = os.getenv("WEAVIATE_CLASS_NAME")
-    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+    WEAVIATE_CLASS_NAME = os.getenv("WEAVIATE_CLASS_NAME") or "DemoCollection"
+
+    # Tenants besides the default one (comma-separated ids), each with its own collection
+    TENANTS = [tenant.strip() for tenant in os.getenv("TENANTS", "").split(",") if tenant.strip()]
+    TENANT_QUERY_CONCURRENCY = int(os.getenv("TENANT_QUERY_CONCURRENCY", "16"))
+    TENANT_INGEST_JOBS = int(os.getenv("TENANT_INGEST_JOBS", "1"))
+
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL") or "all-MiniLM-L6-v2"
+
+    # Embedding engine: "torch", "onnx" or "onnx-int8" (ONNX Runtime, int8-quantized)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")
+    EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", os.path.join("data", "onnx"))
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # 0 = backend default
+    EMBEDDING_DYNAMIC_BATCHING = os.getenv("EMBEDDING_DYNAMIC_BATCHING", "true").lower() == "true"
+    EMBEDDING_DYNAMIC_BATCH_SIZE = int(os.getenv("EMBEDDING_DYNAMIC_BATCH_SIZE", "32"))
+    EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "2"))
+
+    # Shared Weaviate connection pool
+    WEAVIATE_POOL_SIZE = int(os.getenv("WEAVIATE_POOL_SIZE", "2"))
+    WEAVIATE_HEALTH_CHECK_SECONDS = float(os.getenv("WEAVIATE_HEALTH_CHECK_SECONDS", "30"))
+    WEAVIATE_CONNECT_ATTEMPTS = int(os.getenv("WEAVIATE_CONNECT_ATTEMPTS", "4"))
+    WEAVIATE_BACKOFF_SECONDS = float(os.getenv("WEAVIATE_BACKOFF_SECONDS", "0.5"))
+    WEAVIATE_MAX_BACKOFF_SECONDS = float(os.getenv("WEAVIATE_MAX_BACKOFF_SECONDS", "8"))
+
+    # Vector store backend: "weaviate" or "faiss"
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "weaviate").lower()
+    FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", os.path.join("data", "faiss"))
+    FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")  # flat, ivf or hnsw
+    FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "1024"))
+    FAISS_IVF_NPROBE = int(os.getenv("FAISS_IVF_NPROBE", "16"))
+    FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_HNSW_EF_SEARCH = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+    # Rebuild an HNSW index once this fraction of its vectors are deleted
+    FAISS_HNSW_COMPACT_RATIO = float(os.getenv("FAISS_HNSW_COMPACT_RATIO", "0.2"))
+
+    # Minimum query/chunk cosine similarity for a chunk to be sent to the LLM
+    DEFAULT_MIN_SCORE = float(os.getenv("DEFAULT_MIN_SCORE", "0.3"))
+
+    # Cross-encoder reranking of the retrieved candidates
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "10000"))
+    RERANK_CONCURRENCY = int(os.getenv("RERANK_CONCURRENCY", "2"))
+
+    # LLM context assembly
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+    CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.95"))
+    CONTEXT_MIN_PASSAGE_TOKENS = int(os.getenv("CONTEXT_MIN_PASSAGE_TOKENS", "64"))
+    CONTEXT_CHARS_PER_TOKEN = int(os.getenv("CONTEXT_CHARS_PER_TOKEN", "4"))
+
+    # Page citations: answer sentences matched to the context chunks by embedding similarity
+    CITATIONS_ENABLED = os.getenv("CITATIONS_ENABLED", "true").lower() == "true"
+    CITATION_MIN_SIMILARITY = float(os.getenv("CITATION_MIN_SIMILARITY", "0.3"))
+    CITATION_MIN_SENTENCE_CHARS = int(os.getenv("CITATION_MIN_SENTENCE_CHARS", "20"))
+
+    # Conversation sessions: follow-up rewriting, chunk reuse and bounded history
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "5000"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+    SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "10"))
+    SESSION_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "3"))
+    SESSION_HISTORY_TOKENS = int(os.getenv("SESSION_HISTORY_TOKENS", "300"))
+    SESSION_REUSE_SIMILARITY = float(os.getenv("SESSION_REUSE_SIMILARITY", "0.8"))
+    SESSION_TOPIC_TERMS = int(os.getenv("SESSION_TOPIC_TERMS", "8"))
+
+    # Hybrid retrieval: weight of the vector ranking (1.0 = pure vector, 0.0 = pure BM25)
+    HYBRID_ALPHA = float(os.getenv("HYBRID_ALPHA", "0.5"))
+
+    # Query pipeline concurrency
+    QUERY_EXECUTOR_WORKERS = int(os.getenv("QUERY_EXECUTOR_WORKERS", "32"))
+    EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+    VECTOR_SEARCH_CONCURRENCY = int(os.getenv("VECTOR_SEARCH_CONCURRENCY", "16"))
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "32"))
+
+    # Batch query endpoint
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "256"))
+    BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+
+    # LLM gateway: Gemini quota (0 = unlimited), retries and circuit breaker
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "1000"))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+    LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "10"))
+    LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+    LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+    LLM_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_MAX_BACKOFF_SECONDS", "8"))
+    LLM_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS", "30"))
+    LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+    # Ingestion pipeline
+    INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(os.cpu_count() or 2)))
+    INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "256"))
+    INGEST_PAGES_PER_TASK = int(os.getenv("INGEST_PAGES_PER_TASK", "16"))
+    UPLOAD_SPOOL_CHUNK_SIZE = int(os.getenv("UPLOAD_SPOOL_CHUNK_SIZE", str(1024 * 1024)))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+    # Chunking: sizes in tokens, estimated from characters
+    CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", "375"))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+    CHUNK_CHARS_PER_TOKEN = int(os.getenv("CHUNK_CHARS_PER_TOKEN", "4"))
+
+    # Layout-aware PDF extraction: reads text blocks in reading order and drops
+    # header/footer lines that repeat in the page margins across the document
+    PDF_LAYOUT_AWARE = os.getenv("PDF_LAYOUT_AWARE", "false").lower() == "true"
+    PDF_MARGIN_RATIO = float(os.getenv("PDF_MARGIN_RATIO", "0.1"))
+    PDF_BOILERPLATE_SAMPLE_PAGES = int(os.getenv("PDF_BOILERPLATE_SAMPLE_PAGES", "24"))
+    PDF_BOILERPLATE_MIN_RATIO = float(os.getenv("PDF_BOILERPLATE_MIN_RATIO", "0.5"))
+
+    # Background ingestion jobs
+    JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join("data", "jobs.sqlite3"))
+    JOBS_UPLOAD_DIR = os.getenv("JOBS_UPLOAD_DIR", os.getenv("UPLOAD_FOLDER") or os.path.join("data", "uploads"))
+    INGEST_JOB_WORKERS = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+    # How long shutdown waits for running ingestion jobs before closing the clients
+    JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", "30"))
+    # Longest an ingestion embedding batch waits for in-flight query embeddings (0 = never yields)
+    INGEST_YIELD_MAX_WAIT_MS = float(os.getenv("INGEST_YIELD_MAX_WAIT_MS", "200"))
+    MANIFEST_DB_PATH = os.getenv("MANIFEST_DB_PATH", os.path.join("data", "manifest.sqlite3"))
+
+    # Persistent embedding cache
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join("data", "embedding_cache"))
+    EMBEDDING_CACHE_CAPACITY = int(os.getenv("EMBEDDING_CACHE_CAPACITY", "200000"))
+
+    # Semantic answer cache
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+    ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+    ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
 
 settings = Settings()
\ No newline at end of file
@@ -1,5 +1,11 @@
+import random
+import threading
+import time
+from typing import Any, Dict
+
 import weaviate
 from src.core.exceptions import WeaviateConnectionException
+from src.core.metrics import WEAVIATE_CONNECTIONS, WEAVIATE_POOL_CLIENTS
 from src.config.settings import settings
 from weaviate.classes.init import Auth
 
@@ -23,4 +29,161 @@ def weaviate_connection():
         print("Weaviate client is ready.")
         return client
     except Exception as e:
-        raise WeaviateConnectionException(str(e))
\ No newline at end of file
+        raise WeaviateConnectionException(str(e))
+
+
+class _PoolSlot:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client = None
+        self.checked_at = 0.0
+        # Earliest time to try connecting again after the last attempts failed
+        self.retry_after = 0.0
+
+
+class WeaviateConnectionPool:
+    """
+    Process-wide pool of Weaviate clients shared by the ingestion and query
+    paths.
+
+    Clients are opened on first use and handed out round-robin; a Weaviate
+    client is thread-safe, so callers share them rather than check them out.
+    A client that has not been checked for `health_check_seconds` is pinged
+    with `is_ready()` before it is reused and replaced if the check fails.
+    Connecting retries with jittered exponential backoff; once every attempt
+    failed the slot fails fast until the backoff has passed, so an outage
+    does not make each request wait out the whole retry schedule.
+    """
+
+    def __init__(self, size: int, health_check_seconds: float, connect_attempts: int,
+                 backoff_seconds: float, max_backoff_seconds: float):
+        self.size = max(size, 1)
+        self.health_check_seconds = health_check_seconds
+        self.connect_attempts = max(connect_attempts, 1)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._slots = [_PoolSlot() for _ in range(self.size)]
+        self._lock = threading.Lock()
+        self._next = 0
+        self.opened = 0
+        self.reused = 0
+        self.health_check_failures = 0
+        self.connect_failures = 0
+
+    def _count(self, event: str):
+        WEAVIATE_CONNECTIONS.labels(event).inc()
+        with self._lock:
+            if event == "opened":
+                self.opened += 1
+            elif event == "reused":
+                self.reused += 1
+            elif event == "health_check_failed":
+                self.health_check_failures += 1
+            elif event == "connect_failed":
+                self.connect_failures += 1
+
+    def _open_clients(self) -> int:
+        return sum(1 for slot in self._slots if slot.client is not None)
+
+    @staticmethod
+    def _healthy(client) -> bool:
+        try:
+            return bool(client.is_ready())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_client(client):
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing Weaviate client: {e}")
+
+    def _connect(self, slot: _PoolSlot):
+        if time.monotonic() < slot.retry_after:
+            raise WeaviateConnectionException(
+                f"Weaviate is unreachable; retrying in {slot.retry_after - time.monotonic():.1f}s."
+            )
+        delay = self.backoff_seconds
+        for attempt in range(1, self.connect_attempts + 1):
+            try:
+                client = weaviate_connection()
+            except WeaviateConnectionException as e:
+                self._count("connect_failed")
+                print(f"Weaviate connection attempt {attempt}/{self.connect_attempts} failed: {e}")
+                if attempt == self.connect_attempts:
+                    slot.retry_after = time.monotonic() + min(delay, self.max_backoff_seconds)
+                    raise
+                time.sleep(min(delay, self.max_backoff_seconds) * random.uniform(0.5, 1.0))
+                delay *= 2
+            else:
+                slot.retry_after = 0.0
+                return client
+
+    def acquire(self):
+        """Returns a healthy shared client, connecting or reconnecting as needed."""
+        with self._lock:
+            slot = self._slots[self._next]
+            self._next = (self._next + 1) % self.size
+        with slot.lock:
+            now = time.monotonic()
+            if slot.client is not None and now - slot.checked_at >= self.health_check_seconds:
+                if self._healthy(slot.client):
+                    slot.checked_at = now
+                else:
+                    self._count("health_check_failed")
+                    print("Weaviate client failed its health check; reconnecting.")
+                    self._close_client(slot.client)
+                    slot.client = None
+            if slot.client is None:
+                slot.client = self._connect(slot)
+                slot.checked_at = time.monotonic()
+                self._count("opened")
+            else:
+                self._count("reused")
+            WEAVIATE_POOL_CLIENTS.set(self._open_clients())
+            return slot.client
+
+    def close(self):
+        """Closes every open client; the pool reconnects if it is used again."""
+        for slot in self._slots:
+            with slot.lock:
+                client, slot.client = slot.client, None
+                slot.retry_after = 0.0
+            if client is not None:
+                self._close_client(client)
+                WEAVIATE_CONNECTIONS.labels("closed").inc()
+        WEAVIATE_POOL_CLIENTS.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open_clients": self._open_clients(),
+                "opened": self.opened,
+                "reused": self.reused,
+                "health_check_failures": self.health_check_failures,
+                "connect_failures": self.connect_failures,
+            }
+
+
+weaviate_pool = WeaviateConnectionPool(
+    size=settings.WEAVIATE_POOL_SIZE,
+    health_check_seconds=settings.WEAVIATE_HEALTH_CHECK_SECONDS,
+    connect_attempts=settings.WEAVIATE_CONNECT_ATTEMPTS,
+    backoff_seconds=settings.WEAVIATE_BACKOFF_SECONDS,
+    max_backoff_seconds=settings.WEAVIATE_MAX_BACKOFF_SECONDS,
+)
+
+
+def get_weaviate_client():
+    """
+    Returns a shared Weaviate client from the pool, connecting on first use,
+    so importing a module never opens a connection.
+    """
+    return weaviate_pool.acquire()
+
+
+def close_weaviate_client():
+    """Closes the pooled clients."""
+    weaviate_pool.close()
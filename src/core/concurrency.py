@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import Collection, Dict, Optional
+
+from src.config.settings import settings
+from src.core.metrics import STAGE_SECONDS
+
+
+class ForegroundGate:
+    """
+    Lets background work yield the CPU to latency-sensitive work.
+
+    Query stages run inside `foreground()`; ingestion calls `yield_to_foreground()`
+    before each embedding batch, which waits while foreground work is in flight,
+    but never longer than `max_wait_seconds`, so a bulk upload neither starves
+    queries nor stalls under a steady query load.
+    """
+
+    def __init__(self, max_wait_seconds: float):
+        self.max_wait_seconds = max_wait_seconds
+        self._active = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def foreground(self):
+        with self._condition:
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                if not self._active:
+                    self._condition.notify_all()
+
+    def yield_to_foreground(self) -> float:
+        """Waits until no foreground work is running (or the wait limit passed); returns the seconds waited."""
+        if self.max_wait_seconds <= 0:
+            return 0.0
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.max_wait_seconds
+        with self._condition:
+            while self._active:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        waited = time.perf_counter() - start
+        STAGE_SECONDS.labels("ingest_yield_wait").observe(waited)
+        return waited
+
+
+class StageExecutor:
+    """
+    Runs blocking pipeline stages (embedding, vector search, ...) on a shared,
+    bounded thread pool so they never block the event loop.
+
+    Each stage has its own concurrency limit, so a slow stage (e.g. the LLM)
+    cannot take every worker thread away from the cheap ones. The CPU-bound
+    `foreground` stages run inside `gate.foreground()`, so background
+    ingestion yields to them.
+    """
+
+    def __init__(self, max_workers: int, limits: Dict[str, int], foreground: Collection[str] = (), gate: Optional[ForegroundGate] = None):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-stage")
+        self._limits = dict(limits)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._foreground = set(foreground) if gate is not None else set()
+        self._gate = gate
+
+    def _semaphore(self, stage: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._limits.get(stage, 1))
+            self._semaphores[stage] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def limit(self, stage: str):
+        """Holds a slot of `stage` for natively async work (e.g. async LLM calls)."""
+        queued_at = time.perf_counter()
+        async with self._semaphore(stage):
+            STAGE_SECONDS.labels(f"{stage}_queue_wait").observe(time.perf_counter() - queued_at)
+            yield
+
+    async def run(self, stage: str, func, *args, **kwargs):
+        """Runs a blocking callable on the pool while holding a slot of `stage`."""
+        queued_at = time.perf_counter()
+        async with self._semaphore(stage):
+            STAGE_SECONDS.labels(f"{stage}_queue_wait").observe(time.perf_counter() - queued_at)
+            loop = asyncio.get_running_loop()
+            # Carry context variables (e.g. the tenant billed for the request) into the worker thread
+            context = contextvars.copy_context()
+            call = partial(context.run, func, *args, **kwargs)
+            if stage not in self._foreground:
+                return await loop.run_in_executor(self._executor, call)
+            with self._gate.foreground():
+                return await loop.run_in_executor(self._executor, call)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+foreground_gate = ForegroundGate(max_wait_seconds=settings.INGEST_YIELD_MAX_WAIT_MS / 1000)
@@ -1,3 +1,6 @@
+# Tenant of requests that do not name one; it keeps the WEAVIATE_CLASS_NAME collection
+DEFAULT_TENANT = "default"
+
 FALLBACK_MESSAGE = (
     "Sorry, I can only provide answers based on the available knowledge. "
     "For further inquiries, please contact the team directly at contact@apmedicalcouncil.in."
@@ -22,6 +22,12 @@ class WeaviateConnectionException(Exception):
 class LLMServiceAPIException(Exception):
     """Exception raised for errors in the LLM service."""
     pass
+class LLMUnavailableException(LLMServiceAPIException):
+    """Exception raised when the LLM is not called: circuit breaker open or quota exhausted."""
+    pass
+class UnknownTenantException(Exception):
+    """Exception raised when a request names a tenant this deployment does not host."""
+    pass
 class LLMServiceException(Exception):
     """General exception for LLM service errors."""
     pass
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.metrics import STARTUP_SECONDS
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+class AppLifecycle:
+    """
+    Startup state of the API process.
+
+    `start()` runs the registered warm-up steps (connecting clients, loading
+    models, ...) in a background thread so the server accepts connections
+    right away; `status()` is what the readiness probe reports. It also
+    records how long importing the app took and the time from startup to
+    the first successful answer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.import_seconds: Optional[float] = None
+        self.started_at: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.first_answer_seconds: Optional[float] = None
+
+    def record_import(self, seconds: float):
+        self.import_seconds = seconds
+        STARTUP_SECONDS.labels("import").set(seconds)
+
+    def start(self, steps: List[Tuple[str, Callable[[], Any]]]):
+        """Runs `steps`, a list of (component name, callable), once in a background thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.perf_counter()
+            for name, _ in steps:
+                self._components[name] = {"status": STATUS_PENDING, "seconds": None, "error": None}
+            self._thread = threading.Thread(target=self._warmup, args=(steps,), name="app-warmup", daemon=True)
+            self._thread.start()
+
+    def _warmup(self, steps: List[Tuple[str, Callable[[], Any]]]):
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                status, error = STATUS_FAILED, str(e) or type(e).__name__
+                print(f"Warm-up of {name} failed: {error}")
+            else:
+                status, error = STATUS_READY, None
+            seconds = round(time.perf_counter() - start, 3)
+            STARTUP_SECONDS.labels(f"warmup_{name}").set(seconds)
+            with self._lock:
+                self._components[name] = {"status": status, "seconds": seconds, "error": error}
+        self.warmup_seconds = time.perf_counter() - self.started_at
+        STARTUP_SECONDS.labels("warmup").set(self.warmup_seconds)
+        print(f"Warm-up finished in {self.warmup_seconds:.2f}s")
+
+    def record_answer(self):
+        """Notes the first successful answer after startup."""
+        if self.first_answer_seconds is None and self.started_at is not None:
+            with self._lock:
+                if self.first_answer_seconds is None:
+                    self.first_answer_seconds = time.perf_counter() - self.started_at
+                    STARTUP_SECONDS.labels("first_answer").set(self.first_answer_seconds)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._thread is not None and all(
+                component["status"] == STATUS_READY for component in self._components.values()
+            )
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until warm-up finished; returns whether every component is ready."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def status(self) -> Dict[str, Any]:
+        def _round(value):
+            return round(value, 3) if value is not None else None
+
+        with self._lock:
+            components = {name: dict(component) for name, component in self._components.items()}
+        return {
+            "ready": self.ready,
+            "components": components,
+            "import_seconds": _round(self.import_seconds),
+            "warmup_seconds": _round(self.warmup_seconds),
+            "time_to_first_answer_seconds": _round(self.first_answer_seconds),
+            "uptime_seconds": _round(time.perf_counter() - self.started_at) if self.started_at else None,
+        }
+
+
+app_lifecycle = AppLifecycle()
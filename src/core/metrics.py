@@ -0,0 +1,128 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+from src.core.constants import DEFAULT_TENANT
+
+# Covers sub-millisecond cache lookups up to multi-second Gemini calls and ingestion batches
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds", "Duration of query and ingestion stages.", ["stage"], buckets=_LATENCY_BUCKETS
+)
+STAGE_ERRORS = Counter(
+    "rag_stage_errors_total", "Exceptions raised inside a stage, by exception type.", ["stage", "error_type"]
+)
+CACHE_LOOKUPS = Counter("rag_cache_lookups_total", "Cache lookups by cache and result.", ["cache", "result"])
+LLM_TOKENS = Counter("rag_llm_tokens_total", "Gemini tokens, by direction (prompt or completion).", ["direction"])
+LLM_GATEWAY = Counter(
+    "rag_llm_gateway_total",
+    "LLM gateway events: calls, coalesced, throttled, retried, failed, rejected_circuit_open, rejected_rate_limit.",
+    ["event"],
+)
+LLM_CIRCUIT_STATE = Gauge("rag_llm_circuit_state", "LLM circuit breaker state: 0 closed, 1 half-open, 2 open.")
+SESSION_EVENTS = Counter(
+    "rag_session_events_total",
+    "Conversation session events: turns, rewritten, chunks_reused, expired, evicted.",
+    ["event"],
+)
+TENANT_USAGE = Counter(
+    "rag_tenant_usage_total",
+    "Usage by tenant: queries, llm_prompt_tokens, llm_completion_tokens, upload_jobs, pages_ingested, "
+    "chunks_ingested, vectors_stored, chunks_deleted.",
+    ["tenant", "kind"],
+)
+QUERIES = Counter("rag_queries_total", "Answered queries by entry point and status code.", ["endpoint", "status"])
+INGESTED = Counter("rag_ingested_total", "Ingested items by kind (pages, chunks, vectors, empty_pages).", ["kind"])
+WEAVIATE_CONNECTIONS = Counter(
+    "rag_weaviate_connections_total",
+    "Weaviate pool events: opened, reused, health_check_failed, connect_failed, closed.",
+    ["event"],
+)
+WEAVIATE_POOL_CLIENTS = Gauge("rag_weaviate_pool_clients", "Open clients in the Weaviate connection pool.")
+STARTUP_SECONDS = Gauge(
+    "rag_startup_seconds", "Cold start timings: import, warm-up (per component) and time to first answer.", ["phase"]
+)
+
+_usage_tenant: ContextVar[str] = ContextVar("usage_tenant", default=DEFAULT_TENANT)
+_usage: Dict[str, Dict[str, float]] = {}
+_usage_lock = threading.Lock()
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Times a stage: observes the `rag_stage_duration_seconds` histogram
+    and counts exceptions by type.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        STAGE_ERRORS.labels(stage, type(e).__name__).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def record_cache_lookup(cache: str, hits: int = 0, misses: int = 0):
+    if hits:
+        CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache, "miss").inc(misses)
+
+
+@contextmanager
+def usage_scope(tenant: str):
+    """Bills the usage recorded while the block runs (e.g. LLM tokens) to `tenant`."""
+    token = _usage_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        try:
+            _usage_tenant.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context
+            pass
+
+
+def record_usage(kind: str, amount: float = 1, tenant: Optional[str] = None):
+    """Adds to a tenant's usage; without `tenant`, to the tenant of the current `usage_scope`."""
+    if not amount:
+        return
+    tenant = tenant or _usage_tenant.get()
+    TENANT_USAGE.labels(tenant, kind).inc(amount)
+    with _usage_lock:
+        counters = _usage.setdefault(tenant, {})
+        counters[kind] = counters.get(kind, 0) + amount
+
+
+def usage_snapshot(tenant: str) -> Dict[str, float]:
+    with _usage_lock:
+        return dict(_usage.get(tenant, {}))
+
+
+def record_llm_usage(response):
+    """Counts prompt and completion tokens from a Gemini response's usage metadata."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+    completion_tokens = getattr(usage, "candidates_token_count", 0) or 0
+    if prompt_tokens:
+        LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels("completion").inc(completion_tokens)
+    record_usage("llm_prompt_tokens", prompt_tokens)
+    record_usage("llm_completion_tokens", completion_tokens)
+
+
+def render_metrics():
+    """Returns (body, content type) of the Prometheus text exposition."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -18,16 +18,22 @@ DOCUMENT_ANSWER_PROMPT = (
     "- If the answer is not found in any document, reply with: {fallback_message}\n"
     "- Do not include introductory phrases; answer the question directly.\n\n"
     "Context:\n{context}\n\n"
+    "{history}"
     "Question:\n{question}\n"
 )
 
+HISTORY_PROMPT = (
+    "Earlier conversation (only use it to understand what the question refers to):\n{turns}\n\n"
+)
+
 def get_system_prompt():
     return SYSTEM_PROMPT
 
-def get_document_answer_prompt(context, question, answer, fallback_message):
+def get_document_answer_prompt(context, question, answer, fallback_message, history=""):
     return DOCUMENT_ANSWER_PROMPT.format(
         context=context,
         question=question,
         answer=answer,
-        fallback_message=fallback_message
+        fallback_message=fallback_message,
+        history=HISTORY_PROMPT.format(turns=history) if history else "",
     )
\ No newline at end of file
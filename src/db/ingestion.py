@@ -0,0 +1,438 @@
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from collections import Counter
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.core.concurrency import foreground_gate
+from src.core.metrics import INGESTED, STAGE_SECONDS, span
+from src.utils.chunking import Chunk
+from src.utils.document_processing import DocumentProcessor
+
+_SENTINEL = object()
+
+
+def parse_and_split(
+    file_path: str,
+    filename: str,
+    start: int = 0,
+    stop: Optional[int] = None,
+    known_hashes: Optional[Dict[int, str]] = None,
+    boilerplate: Collection[str] = (),
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Parses pages [start, stop) of one PDF and splits them into chunks.
+    Runs inside a worker process, which opens the PDF itself; only the
+    pages and chunks of this page window are held in memory.
+
+    If the window has the same pages with the same content hashes as in
+    `known_hashes`, nothing is split.
+    With layout-aware extraction, margin blocks in `boilerplate` are removed.
+
+    Returns:
+        tuple: (number of pages parsed, list of {"page_number", "page_hash",
+        "chunks", "empty"} dicts, where "chunks" lists the `Chunk` records
+        starting on the page, or is None for an unchanged window, and "empty"
+        marks pages without extractable text)
+    """
+    processor = DocumentProcessor(file_path=file_path)
+    known_hashes = known_hashes or {}
+    pages = []
+    results = []
+    for page in processor.iter_pages(start, stop, boilerplate=boilerplate):
+        page["filename"] = filename
+        page_hash = processor.content_hash(page["page_content"])
+        pages.append(page)
+        results.append({
+            "page_number": page["page_number"],
+            "page_hash": page_hash,
+            "chunks": None,
+            "empty": processor.is_empty_page(page),
+        })
+
+    # Chunks can cross page boundaries, so a changed page re-splits its whole window;
+    # unchanged chunks keep their ids and are not embedded again
+    unchanged = len(known_hashes) == len(results) and all(
+        known_hashes.get(result["page_number"]) == result["page_hash"] for result in results
+    )
+    if not unchanged:
+        by_page: Dict[int, List[Chunk]] = {result["page_number"]: [] for result in results}
+        for chunk in processor.chunk_pages(pages):
+            by_page[chunk.page_number].append(chunk)
+        for result in results:
+            result["chunks"] = by_page[result["page_number"]]
+    return len(results), results
+
+
+class ParsePool:
+    """
+    Long-lived process pool the ingestion runs parse their page windows on.
+
+    Workers are spawned rather than forked: ingestion runs on the job
+    worker's thread while gRPC and torch threads are live, and forking then
+    can deadlock the child. The pool starts on first use, is replaced when
+    a worker process dies, and is shut down by the app lifespan.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def discard(self, pool: ProcessPoolExecutor):
+        """Drops a broken pool so the next run starts a fresh one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _StageThread(threading.Thread):
+    """Daemon thread that remembers the exception its target raised."""
+
+    def __init__(self, target, name: str):
+        super().__init__(target=self._run_target, name=name, daemon=True)
+        self._stage_target = target
+        self.error = None
+
+    def _run_target(self):
+        try:
+            self._stage_target()
+        except BaseException as e:
+            self.error = e
+
+
+class IngestionPipeline:
+    """
+    Staged, overlapping ingestion of PDF files into Weaviate.
+
+    1. parse/split: PDFs are cut into page windows that are parsed and split
+       on the shared `parse_pool`, with `parse_workers * 2` windows in flight.
+    2. embed: chunks are grouped into large batches and embedded with
+       `DocumentProcessor.create_embeddings`, one model batch at a time,
+       yielding to in-flight query embeddings in between.
+    3. insert: embedded chunks are streamed into Weaviate dynamic batching.
+
+    The stages are connected by bounded queues so they overlap while memory
+    stays bounded.
+
+    With a `manifest`, ingestion is incremental: chunks get deterministic
+    UUIDs from filename, page and content hash; unchanged pages are skipped,
+    only new chunks of changed pages are embedded, and chunks of pages that
+    changed or disappeared are deleted once the inserts succeeded.
+
+    Pages without extractable text (scans, blank pages) are skipped and
+    listed in `empty_pages`. A file that fails to parse is reported in
+    `failed_files` without aborting the other files. If `progress` is given it is called as
+    `progress(filename, pages_parsed=.., chunks_embedded=.., vectors_stored=..)`
+    with per-file increments, or `progress(filename, error=..)` on failure.
+    """
+
+    def __init__(
+        self,
+        weaviate_client,
+        class_name: str,
+        parse_workers: int = None,
+        embed_batch_size: int = None,
+        pages_per_task: int = None,
+        queue_size: int = 4,
+        progress: Optional[Callable[..., None]] = None,
+        manifest=None,
+    ):
+        self.weaviate_client = weaviate_client
+        self.class_name = class_name
+        self.parse_workers = parse_workers or settings.INGEST_PARSE_WORKERS
+        self.embed_batch_size = embed_batch_size or settings.INGEST_EMBED_BATCH_SIZE
+        self.pages_per_task = pages_per_task or settings.INGEST_PAGES_PER_TASK
+        self.processor = DocumentProcessor()
+        self._embed_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._insert_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self.progress = progress
+        self.pages_parsed = 0
+        self.chunks_created = 0
+        self.failed_files: Dict[str, str] = {}
+        self.empty_pages: Dict[str, List[int]] = {}
+        self.manifest = manifest
+        self.chunks_added = 0
+        self.chunks_updated = 0
+        self.chunks_skipped = 0
+        self._known_pages: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._page_counts: Dict[str, int] = {}
+        self._stale_ids: Dict[str, List[str]] = {}
+        self._manifest_updates: List[Tuple[str, int, str, List[str]]] = []
+
+    def _report(self, filename: str, **update):
+        if self.progress is not None:
+            try:
+                self.progress(filename, **update)
+            except Exception as e:
+                print(f"Ingestion progress callback failed: {e}")
+
+    def _report_counts(self, chunks: List[Dict[str, Any]], field: str):
+        for filename, count in Counter(chunk["metadata"].get("filename", "") for chunk in chunks).items():
+            self._report(filename, **{field: count})
+
+    def _page_windows(self, files: List[Tuple[str, str]]):
+        for file_path, filename in files:
+            try:
+                page_count = DocumentProcessor(file_path=file_path).count_pages()
+            except Exception as e:
+                self._fail_file(filename, e)
+                continue
+            self._page_counts[filename] = page_count
+            known = self.manifest.get_pages(self.class_name, filename) if self.manifest else {}
+            self._known_pages[filename] = known
+            boilerplate = frozenset()
+            if settings.PDF_LAYOUT_AWARE:
+                try:
+                    with span("ingest_find_boilerplate"):
+                        boilerplate = DocumentProcessor(file_path=file_path).find_boilerplate()
+                except Exception as e:
+                    self._fail_file(filename, e)
+                    continue
+            for start in range(0, page_count, self.pages_per_task):
+                stop = min(start + self.pages_per_task, page_count)
+                # Pages past the end of a shrunk file count too: their window has changed
+                known_hashes = {
+                    page_number: page["page_hash"]
+                    for page_number, page in known.items()
+                    if start < page_number <= start + self.pages_per_task
+                }
+                yield file_path, filename, start, stop, known_hashes, boilerplate
+
+    def _diff_pages(self, filename: str, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Compares parsed pages with the manifest and returns the chunks that need embedding."""
+        known = self._known_pages.get(filename, {})
+        to_embed = []
+        for page in pages:
+            previous = known.get(page["page_number"])
+            if page["chunks"] is None:
+                self.chunks_skipped += len(previous["chunk_ids"])
+                continue
+            chunk_ids = [chunk.uuid for chunk in page["chunks"]]
+            old_ids = set(previous["chunk_ids"]) if previous else set()
+            new_chunks = [chunk.to_dict() for chunk in page["chunks"] if chunk.uuid not in old_ids]
+            self.chunks_skipped += len(page["chunks"]) - len(new_chunks)
+            if previous:
+                self.chunks_updated += len(new_chunks)
+                self._stale_ids.setdefault(filename, []).extend(old_ids.difference(chunk_ids))
+            else:
+                self.chunks_added += len(new_chunks)
+            self._manifest_updates.append((filename, page["page_number"], page["page_hash"], chunk_ids))
+            to_embed.extend(new_chunks)
+        return to_embed
+
+    def _sync_removals(self) -> Tuple[int, List[Tuple[str, int]]]:
+        """Deletes chunks of changed or vanished pages of successfully ingested files."""
+        stale_ids: List[str] = []
+        removals: List[Tuple[str, int]] = []
+        for filename, page_count in self._page_counts.items():
+            if filename in self.failed_files:
+                continue
+            stale_ids.extend(self._stale_ids.get(filename, []))
+            for page_number, page in self._known_pages.get(filename, {}).items():
+                if page_number > page_count:
+                    stale_ids.extend(page["chunk_ids"])
+                    removals.append((filename, page_number))
+        deleted = self.processor.delete_objects_from_weaviate(stale_ids, self.weaviate_client, self.class_name)
+        return deleted, removals
+
+    def _fail_file(self, filename: str, error: Exception):
+        if filename not in self.failed_files:
+            self.failed_files[filename] = str(error) or type(error).__name__
+            self._report(filename, error=self.failed_files[filename])
+
+    def _parse_stage(self, files: List[Tuple[str, str]]):
+        try:
+            pending: List[Dict[str, Any]] = []
+            windows = self._page_windows(files)
+            pool = parse_pool.get()
+            in_flight = {}
+
+            def submit_next() -> bool:
+                for file_path, filename, start, stop, known_hashes, boilerplate in windows:
+                    if filename in self.failed_files:
+                        continue
+                    try:
+                        future = pool.submit(
+                            parse_and_split, file_path, filename, start, stop, known_hashes, boilerplate
+                        )
+                    except BrokenProcessPool as e:
+                        self._fail_file(filename, e)
+                        continue
+                    in_flight[future] = (filename, time.perf_counter())
+                    return True
+                return False
+
+            # Keep only a bounded number of page windows in flight
+            for _ in range(self.parse_workers * 2):
+                if not submit_next():
+                    break
+
+            while in_flight and not self._stop.is_set():
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename, submitted_at = in_flight.pop(future)
+                    # Includes the time the window waited for a free worker process
+                    STAGE_SECONDS.labels("ingest_parse_window").observe(time.perf_counter() - submitted_at)
+                    try:
+                        page_count, pages = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            parse_pool.discard(pool)
+                        self._fail_file(filename, e)
+                        submit_next()
+                        continue
+                    empty = [page["page_number"] for page in pages if page["empty"]]
+                    if empty:
+                        self.empty_pages.setdefault(filename, []).extend(empty)
+                    chunks = self._diff_pages(filename, pages)
+                    self._report(filename, pages_parsed=page_count)
+                    self.pages_parsed += page_count
+                    self.chunks_created += len(chunks)
+                    pending.extend(chunks)
+                    while len(pending) >= self.embed_batch_size:
+                        self._embed_queue.put(pending[:self.embed_batch_size])
+                        pending = pending[self.embed_batch_size:]
+                    submit_next()
+
+            for future in in_flight:
+                future.cancel()
+            if pending and not self._stop.is_set():
+                self._embed_queue.put(pending)
+        finally:
+            self._embed_queue.put(_SENTINEL)
+
+    def _embed_stage(self):
+        try:
+            while True:
+                batch = self._embed_queue.get()
+                if batch is _SENTINEL or self._stop.is_set():
+                    break
+                with span("ingest_embed_batch"):
+                    step = settings.EMBEDDING_BATCH_SIZE
+                    for offset in range(0, len(batch), step):
+                        # Model-sized slices, so queries wait for at most one slice
+                        foreground_gate.yield_to_foreground()
+                        sub_batch = batch[offset:offset + step]
+                        embeddings = self.processor.create_embeddings(
+                            sub_batch,
+                            batch_size=step,
+                            show_progress_bar=False,
+                        )
+                        for chunk, embedding in zip(sub_batch, embeddings):
+                            chunk["embedding"] = embedding
+                self._report_counts(batch, "chunks_embedded")
+                self._insert_queue.put(batch)
+        finally:
+            self._insert_queue.put(_SENTINEL)
+
+    def _embedded_chunks(self):
+        while True:
+            batch = self._insert_queue.get()
+            if batch is _SENTINEL:
+                return
+            yield from batch
+            # Handed over to the Weaviate batcher, failures surface via failed_objects
+            self._report_counts(batch, "vectors_stored")
+
+    def _drain(self, q: "queue.Queue"):
+        # Unblock an upstream stage that is waiting on a full queue
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+
+    def run(self, files: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Ingests `files`, a list of (file_path, filename) tuples.
+
+        Returns:
+            dict: pages/chunks/vectors counts, added/updated/skipped/deleted
+            chunk counts and pages/s, chunks/s throughput.
+        """
+        start = time.perf_counter()
+        self.processor.create_weaviate_collection(self.weaviate_client, self.class_name)
+
+        parse_thread = _StageThread(lambda: self._parse_stage(files), name="ingest-parse")
+        embed_thread = _StageThread(self._embed_stage, name="ingest-embed")
+        parse_thread.start()
+        embed_thread.start()
+        try:
+            # Spans the whole overlapped run: inserts finish after the last parse and embed batch
+            with span("ingest_insert"):
+                vectors_stored = self.processor.add_objects_to_weaviate(
+                    self._embedded_chunks(), self.weaviate_client, self.class_name
+                )
+        finally:
+            self._stop.set()
+            while parse_thread.is_alive() or embed_thread.is_alive():
+                self._drain(self._embed_queue)
+                self._drain(self._insert_queue)
+                parse_thread.join(timeout=0.1)
+                embed_thread.join(timeout=0.1)
+
+        for stage in (parse_thread, embed_thread):
+            if stage.error is not None:
+                raise stage.error
+
+        with span("ingest_delete"):
+            chunks_deleted, removals = self._sync_removals()
+        if self.manifest is not None:
+            with span("ingest_manifest"):
+                self.manifest.apply(
+                    self.class_name,
+                    [update for update in self._manifest_updates if update[0] not in self.failed_files],
+                    removals,
+                )
+
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels("ingest_total").observe(elapsed)
+        INGESTED.labels("pages").inc(self.pages_parsed)
+        INGESTED.labels("chunks").inc(self.chunks_created)
+        INGESTED.labels("empty_pages").inc(sum(len(pages) for pages in self.empty_pages.values()))
+        INGESTED.labels("vectors").inc(vectors_stored)
+        stats = {
+            "pages_processed": self.pages_parsed,
+            "chunks_processed": self.chunks_created,
+            "vectors_stored": vectors_stored,
+            "chunks_added": self.chunks_added,
+            "chunks_updated": self.chunks_updated,
+            "chunks_skipped": self.chunks_skipped,
+            "chunks_deleted": chunks_deleted,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.pages_parsed / elapsed, 2) if elapsed else 0.0,
+            "chunks_per_second": round(self.chunks_created / elapsed, 2) if elapsed else 0.0,
+            "failed_files": dict(self.failed_files),
+            "empty_pages": {filename: sorted(pages) for filename, pages in self.empty_pages.items()},
+        }
+        for filename, pages in stats["empty_pages"].items():
+            print(f"Skipped {len(pages)} page(s) without text in {filename}: {pages}")
+        print(
+            f"Ingested {stats['pages_processed']} pages / {stats['chunks_processed']} chunks in "
+            f"{stats['elapsed_seconds']}s ({stats['pages_per_second']} pages/s, {stats['chunks_per_second']} chunks/s)"
+        )
+        return stats
+
+
+parse_pool = ParsePool(settings.INGEST_PARSE_WORKERS)
@@ -0,0 +1,392 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.core.constants import DEFAULT_TENANT
+from src.core.metrics import record_usage, span
+from src.db.upload import ingest_files
+from src.services.tenants import tenant_registry
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_COMPLETED_WITH_ERRORS = "completed_with_errors"
+JOB_FAILED = "failed"
+
+FILE_QUEUED = "queued"
+FILE_PROCESSING = "processing"
+FILE_COMPLETED = "completed"
+FILE_FAILED = "failed"
+
+_COUNTERS = ("pages_parsed", "chunks_embedded", "vectors_stored")
+
+
+def _unique_name(filename: str, taken) -> str:
+    """`filename`, or "name (2).pdf", "name (3).pdf", ... if another file of the job already has it."""
+    if filename not in taken:
+        return filename
+    stem, extension = os.path.splitext(filename)
+    copy = 2
+    while f"{stem} ({copy}){extension}" in taken:
+        copy += 1
+    return f"{stem} ({copy}){extension}"
+
+
+class JobStore:
+    """
+    SQLite-backed store of ingestion jobs and their per-file progress, so job
+    state survives an API restart.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    tenant TEXT NOT NULL DEFAULT 'default',
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    error TEXT,
+                    result TEXT
+                );
+                CREATE TABLE IF NOT EXISTS job_files (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    pages_parsed INTEGER NOT NULL DEFAULT 0,
+                    chunks_embedded INTEGER NOT NULL DEFAULT 0,
+                    vectors_stored INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    PRIMARY KEY (job_id, position)
+                );
+                """
+            )
+            file_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(job_files)")}
+            if "position" not in file_columns:
+                # Databases keyed files by name: rebuild the table keyed by upload position
+                self._conn.executescript(
+                    """
+                    ALTER TABLE job_files RENAME TO job_files_by_name;
+                    CREATE TABLE job_files (
+                        job_id TEXT NOT NULL,
+                        position INTEGER NOT NULL,
+                        filename TEXT NOT NULL,
+                        path TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        pages_parsed INTEGER NOT NULL DEFAULT 0,
+                        chunks_embedded INTEGER NOT NULL DEFAULT 0,
+                        vectors_stored INTEGER NOT NULL DEFAULT 0,
+                        error TEXT,
+                        PRIMARY KEY (job_id, position)
+                    );
+                    INSERT INTO job_files
+                        SELECT job_id, rowid, filename, path, status, pages_parsed, chunks_embedded, vectors_stored, error
+                        FROM job_files_by_name;
+                    DROP TABLE job_files_by_name;
+                    """
+                )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "tenant" not in columns:
+                # Databases created before tenants: their jobs belong to the default tenant
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'")
+
+    def create_job(self, job_id: str, files: List[tuple], tenant: str = DEFAULT_TENANT):
+        """
+        Registers a new queued job of `tenant` for `files`, a list of
+        (file_path, filename) tuples; files are kept in upload order.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, tenant, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, tenant, JOB_QUEUED, now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_files (job_id, position, filename, path, status) VALUES (?, ?, ?, ?, ?)",
+                [(job_id, position, filename, path, FILE_QUEUED) for position, (path, filename) in enumerate(files)],
+            )
+
+    def set_job_status(self, job_id: str, status: str, error: Optional[str] = None, result: Optional[dict] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, result = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(result) if result is not None else None, time.time(), job_id),
+            )
+
+    def set_file_status(self, job_id: str, status: str, filename: Optional[str] = None, only_from: Optional[str] = None):
+        """Sets the status of one file, or of every file of the job (optionally only those in `only_from`)."""
+        query = "UPDATE job_files SET status = ? WHERE job_id = ?"
+        params: List[Any] = [status, job_id]
+        if filename is not None:
+            query += " AND filename = ?"
+            params.append(filename)
+        if only_from is not None:
+            query += " AND status = ?"
+            params.append(only_from)
+        with self._lock, self._conn:
+            self._conn.execute(query, params)
+
+    def update_file_progress(self, job_id: str, filename: str, error: Optional[str] = None, **increments: int):
+        with self._lock, self._conn:
+            if error is not None:
+                self._conn.execute(
+                    "UPDATE job_files SET status = ?, error = ? WHERE job_id = ? AND filename = ?",
+                    (FILE_FAILED, error, job_id, filename),
+                )
+            counters = {name: increments[name] for name in _COUNTERS if increments.get(name)}
+            if counters:
+                assignments = ", ".join(f"{name} = {name} + ?" for name in counters)
+                self._conn.execute(
+                    f"UPDATE job_files SET {assignments} WHERE job_id = ? AND filename = ?",
+                    (*counters.values(), job_id, filename),
+                )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def reset_progress(self, job_id: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_files SET status = ?, pages_parsed = 0, chunks_embedded = 0, vectors_stored = 0, error = NULL "
+                "WHERE job_id = ?",
+                (FILE_QUEUED, job_id),
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            files = self._conn.execute(
+                "SELECT filename, status, pages_parsed, chunks_embedded, vectors_stored, error "
+                "FROM job_files WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        return {
+            "job_id": job["id"],
+            "tenant": job["tenant"],
+            "status": job["status"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+            "error": job["error"],
+            "result": json.loads(job["result"]) if job["result"] else None,
+            "files": [dict(row) for row in files],
+        }
+
+    def get_files(self, job_id: str) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, filename FROM job_files WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return [(row["path"], row["filename"]) for row in rows]
+
+    def unfinished_jobs(self) -> List[Tuple[str, str]]:
+        """(job id, tenant) of the queued and running jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, tenant FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchall()
+        return [(row["id"], row["tenant"]) for row in rows]
+
+
+class IngestionJobWorker:
+    """
+    Background worker threads that run queued ingestion jobs one after another.
+
+    Uploaded files are kept in a per-job directory until the job finishes,
+    so jobs that were queued or running when the API stopped are picked up
+    again on the next `start()`.
+
+    Jobs are queued per tenant and workers take them round-robin across
+    tenants, running at most `jobs_per_tenant` of a tenant at a time, so one
+    tenant's bulk upload cannot hold every worker while others wait.
+    """
+
+    def __init__(self, store: JobStore, upload_dir: str, workers: int = 1, jobs_per_tenant: int = 1):
+        self.store = store
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self.jobs_per_tenant = max(jobs_per_tenant, 1)
+        self._pending: "OrderedDict[str, deque]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._stopping = False
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def job_dir(self, job_id: str) -> str:
+        return os.path.join(self.upload_dir, job_id)
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            with self._condition:
+                self._stopping = False
+                # The store is the source of truth: jobs queued before start() are in it too
+                self._pending.clear()
+            for job_id, tenant in self.store.unfinished_jobs():
+                self.store.reset_progress(job_id)
+                self.store.set_job_status(job_id, JOB_QUEUED)
+                self._enqueue(job_id, tenant)
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"ingest-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float) -> bool:
+        """
+        Stops taking jobs and waits up to `timeout` seconds for the running
+        ones to finish. Returns False if some are still running; they stay
+        `running` in the store and are picked up again on the next `start()`.
+        """
+        with self._lock:
+            with self._condition:
+                self._stopping = True
+                self._condition.notify_all()
+            deadline = time.monotonic() + timeout
+            for thread in self._threads:
+                thread.join(max(deadline - time.monotonic(), 0))
+            alive = [thread for thread in self._threads if thread.is_alive()]
+            self._threads = alive
+        if alive:
+            print(f"{len(alive)} ingestion job(s) still running after {timeout}s; they resume on the next start.")
+        return not alive
+
+    def _enqueue(self, job_id: str, tenant: str):
+        with self._condition:
+            self._pending.setdefault(tenant, deque()).append(job_id)
+            self._condition.notify()
+
+    def _next_job(self) -> Optional[Tuple[str, str]]:
+        """
+        Takes the next job of the first tenant (in round-robin order) below its
+        running limit; None once the worker is stopping.
+        """
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return None
+                for tenant, jobs in self._pending.items():
+                    if self._running.get(tenant, 0) < self.jobs_per_tenant:
+                        job_id = jobs.popleft()
+                        if jobs:
+                            self._pending.move_to_end(tenant)
+                        else:
+                            del self._pending[tenant]
+                        self._running[tenant] = self._running.get(tenant, 0) + 1
+                        return job_id, tenant
+                self._condition.wait()
+
+    def _job_done(self, tenant: str):
+        with self._condition:
+            self._running[tenant] -= 1
+            self._condition.notify_all()
+
+    def submit(self, uploaded_files, tenant: str = DEFAULT_TENANT) -> str:
+        """
+        Saves the uploaded files into a new job directory and queues the job.
+
+        Args:
+            uploaded_files: List of FastAPI UploadFile objects
+            tenant: Id of the tenant the files are ingested for
+
+        Returns:
+            str: The job id
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        files = []
+        with span("upload_spool"):
+            for position, uploaded_file in enumerate(uploaded_files):
+                filename = _unique_name(os.path.basename(uploaded_file.filename), {name for _, name in files})
+                # One directory per upload position, so same-named files do not overwrite each other
+                file_dir = os.path.join(job_dir, str(position))
+                os.makedirs(file_dir, exist_ok=True)
+                file_path = os.path.join(file_dir, filename)
+                with open(file_path, "wb") as f:
+                    shutil.copyfileobj(uploaded_file.file, f, settings.UPLOAD_SPOOL_CHUNK_SIZE)
+                files.append((file_path, filename))
+        self.store.create_job(job_id, files, tenant)
+        record_usage("upload_jobs", tenant=tenant)
+        self._enqueue(job_id, tenant)
+        return job_id
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            job_id, tenant = job
+            try:
+                self._process(job_id, tenant)
+            finally:
+                self._job_done(tenant)
+
+    def _process(self, job_id: str, tenant: str):
+        self.store.set_job_status(job_id, JOB_RUNNING)
+        self.store.set_file_status(job_id, FILE_PROCESSING)
+
+        def progress(filename: str, **update):
+            self.store.update_file_progress(job_id, filename, **update)
+
+        try:
+            with span("ingest"):
+                stats = ingest_files(
+                    self.store.get_files(job_id), progress=progress, tenant=tenant_registry.get(tenant)
+                )
+        except Exception as e:
+            self.store.set_file_status(job_id, FILE_FAILED, only_from=FILE_PROCESSING)
+            self.store.set_job_status(job_id, JOB_FAILED, error=str(e) or type(e).__name__)
+            print(f"Ingestion job {job_id} failed: {e}")
+        else:
+            self.store.set_file_status(job_id, FILE_COMPLETED, only_from=FILE_PROCESSING)
+            status = JOB_COMPLETED_WITH_ERRORS if stats["failed_files"] else JOB_COMPLETED
+            self.store.set_job_status(job_id, status, result=stats)
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+
+_job_store: Optional[JobStore] = None
+_job_worker: Optional[IngestionJobWorker] = None
+_jobs_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Returns the process-wide job store, opening its database on first use,
+    so importing this module never creates files.
+    """
+    global _job_store
+    with _jobs_lock:
+        if _job_store is None:
+            _job_store = JobStore(settings.JOBS_DB_PATH)
+        return _job_store
+
+
+def get_job_worker() -> IngestionJobWorker:
+    """Returns the process-wide job worker; the app lifespan starts and stops it."""
+    global _job_worker
+    store = get_job_store()
+    with _jobs_lock:
+        if _job_worker is None:
+            _job_worker = IngestionJobWorker(
+                store, settings.JOBS_UPLOAD_DIR, workers=settings.INGEST_JOB_WORKERS,
+                jobs_per_tenant=settings.TENANT_INGEST_JOBS,
+            )
+        return _job_worker
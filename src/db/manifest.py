@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config.settings import settings
+
+
+class IngestManifest:
+    """
+    Local SQLite manifest of ingested documents.
+
+    For every (collection, filename, page_number) it records the content hash
+    of the page text and the deterministic Weaviate UUIDs of its chunks, so a
+    re-upload can skip unchanged pages and delete chunks that are gone.
+    """
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingested_pages (
+                    collection TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    page_number INTEGER NOT NULL,
+                    page_hash TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (collection, filename, page_number)
+                )
+                """
+            )
+
+    def get_pages(self, collection: str, filename: str) -> Dict[int, Dict[str, object]]:
+        """Returns {page_number: {"page_hash": str, "chunk_ids": [str]}} for one document."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_number, page_hash, chunk_ids FROM ingested_pages WHERE collection = ? AND filename = ?",
+                (collection, filename),
+            ).fetchall()
+        return {
+            page_number: {"page_hash": page_hash, "chunk_ids": json.loads(chunk_ids)}
+            for page_number, page_hash, chunk_ids in rows
+        }
+
+    def apply(
+        self,
+        collection: str,
+        updates: Iterable[Tuple[str, int, str, List[str]]],
+        removals: Iterable[Tuple[str, int]] = (),
+    ):
+        """
+        Records ingested pages and forgets removed ones in a single transaction.
+
+        Args:
+            updates: (filename, page_number, page_hash, chunk_ids) tuples
+            removals: (filename, page_number) tuples
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ingested_pages "
+                "(collection, filename, page_number, page_hash, chunk_ids, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (collection, filename, page_number, page_hash, json.dumps(chunk_ids), now)
+                    for filename, page_number, page_hash, chunk_ids in updates
+                ],
+            )
+            self._conn.executemany(
+                "DELETE FROM ingested_pages WHERE collection = ? AND filename = ? AND page_number = ?",
+                [(collection, filename, page_number) for filename, page_number in removals],
+            )
+
+
+_ingest_manifest: Optional[IngestManifest] = None
+_ingest_manifest_lock = threading.Lock()
+
+
+def get_ingest_manifest() -> IngestManifest:
+    """
+    Returns the process-wide manifest, opening its database on first use,
+    so importing this module never creates files.
+    """
+    global _ingest_manifest
+    with _ingest_manifest_lock:
+        if _ingest_manifest is None:
+            _ingest_manifest = IngestManifest(settings.MANIFEST_DB_PATH)
+        return _ingest_manifest
@@ -1,59 +1,34 @@
-import tempfile
-import os
-
-from src.utils.document_processing import DocumentProcessor
-from src.config.weaviate_db import weaviate_connection
-from src.core.exceptions import DocumentProcessingException
-from src.schemas.responses import DocumentProcessSuccessResponse
-
-def process_uploaded_files(uploaded_files) -> dict:
+from src.db.ingestion import IngestionPipeline
+from src.db.manifest import get_ingest_manifest
+from src.config.settings import settings
+from src.config.weaviate_db import get_weaviate_client
+from src.core.metrics import record_usage
+from src.services.tenants import Tenant, tenant_registry
+
+def ingest_files(files, progress=None, tenant: Tenant = None) -> dict:
     """
-    Process uploaded PDF files:
-    1. Save files to temp directory
-    2. Load documents
-    3. Convert to embeddings
-    4. Store in Weaviate vector database
+    Runs the ingestion pipeline over PDFs already saved on disk.
 
     Args:
-        uploaded_files: List of FastAPI UploadFile objects
+        files: List of (file_path, filename) tuples
+        progress: Optional per-file progress callback, see `IngestionPipeline`
+        tenant: Tenant whose collection receives the files (default tenant if omitted)
 
     Returns:
-        dict: Result containing success status and metadata
+        dict: Pipeline statistics (pages, chunks, vectors, throughput, failed files)
     """
-    try:
-        weaviate_client = weaviate_connection()
-        from src.config.settings import settings
-        class_name = settings.WEAVIATE_CLASS_NAME or "DemoCollection"
-        embedding_model = settings.EMBEDDING_MODEL or "Snowflake/snowflake-arctic-embed-l-v2.0"
-
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            file_paths = []
-            for uploaded_file in uploaded_files:
-                file_path = os.path.join(tmpdirname, uploaded_file.filename)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.file.read())
-                file_paths.append(file_path)
-
-            # Process each file
-            all_chunks = []
-            for file_path in file_paths:
-                rag = DocumentProcessor(file_path=file_path)
-                pages = rag.load_documents() or []
-                chunks = rag.split_chunks(pages)
-                all_chunks.extend(chunks)
-
-            # Create Weaviate collection if needed
-            processor = DocumentProcessor()
-            processor.create_weaviate_collection(weaviate_client, class_name)
-            # Add objects to Weaviate (let Weaviate handle vectorization)
-            vectors_stored = processor.add_objects_to_weaviate(all_chunks, weaviate_client, class_name)
-
-            return DocumentProcessSuccessResponse(
-                success=True,
-                message="PDF documents processed and stored successfully",
-                documents_processed=len(all_chunks),
-                vectors_stored=vectors_stored,
-            ).dict()
-            
-    except Exception as e:
-        raise DocumentProcessingException()
+    tenant = tenant or tenant_registry.default
+    weaviate_client = get_weaviate_client() if settings.VECTOR_STORE_BACKEND == "weaviate" else None
+
+    stats = IngestionPipeline(
+        weaviate_client, tenant.collection, progress=progress, manifest=get_ingest_manifest()
+    ).run(files)
+
+    record_usage("pages_ingested", stats["pages_processed"], tenant=tenant.id)
+    record_usage("chunks_ingested", stats["chunks_processed"], tenant=tenant.id)
+    record_usage("vectors_stored", stats["vectors_stored"], tenant=tenant.id)
+    record_usage("chunks_deleted", stats["chunks_deleted"], tenant=tenant.id)
+    # Cached answers may be stale now that the collection has changed
+    if stats["vectors_stored"] or stats["chunks_deleted"]:
+        tenant.answer_cache.invalidate()
+    return stats
@@ -0,0 +1,614 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from weaviate.classes.config import Configure, Property, DataType
+from weaviate.classes.query import Filter, HybridFusion, MetadataQuery
+
+from src.config.settings import settings
+from src.core.exceptions import WeaviateUpsertException, WeaviateQueryException
+
+
+class VectorStore:
+    """
+    Interface of the chunk stores behind `DocumentProcessor`.
+
+    Chunks are dicts with "uuid", "chunk_text", "metadata" (filename,
+    page_number) and, when added, "embedding".
+
+    Search results are dicts with "chunk_text", "vector" (the stored chunk
+    vector, when available) and "metadata" holding filename, page_number and
+    "score", the cosine similarity between the query and the chunk. Hybrid
+    results also carry the "fusion_score" they were ranked by.
+    """
+
+    def ensure_collection(self):
+        raise NotImplementedError
+
+    def add(self, embed_docs: Iterable[Dict[str, Any]]) -> int:
+        """Adds (or replaces, by uuid) embedded chunks and returns how many were added."""
+        raise NotImplementedError
+
+    def delete(self, object_ids: List[str]) -> int:
+        """Deletes chunks by uuid and returns how many were removed."""
+        raise NotImplementedError
+
+    def search(self, query_vector: List[float], top_k: int = 5) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Returns the `top_k` nearest chunks and the filename of the best one."""
+        raise NotImplementedError
+
+    def search_many(
+        self, query_vectors: List[List[float]], top_k: int = 5
+    ) -> List[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """`search` for several query vectors; stores with a native multi-query search override it."""
+        return [self.search(query_vector, top_k) for query_vector in query_vectors]
+
+    def hybrid_search(
+        self, query: str, query_vector: List[float], top_k: int = 5, alpha: float = 0.5
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Fuses keyword (BM25) and vector rankings. `alpha` weights the vector
+        side: 1.0 is pure vector search, 0.0 pure keyword search.
+        """
+        raise NotImplementedError
+
+
+def cosine_similarity(a, b) -> float:
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b) / norm) if norm else 0.0
+
+
+def reciprocal_rank_fusion(rankings: List[List[Any]], weights: List[float], k: int = 60) -> List[Tuple[Any, float]]:
+    """
+    Weighted reciprocal-rank fusion of several rankings of ids.
+
+    Returns (id, fused score) pairs, best first.
+    """
+    fused: Dict[Any, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking):
+            fused[item] = fused.get(item, 0.0) + weight / (k + rank + 1)
+    return sorted(fused.items(), key=lambda pair: pair[1], reverse=True)
+
+
+class WeaviateVectorStore(VectorStore):
+    def __init__(self, weaviate_client, class_name: str):
+        self.weaviate_client = weaviate_client
+        self.class_name = class_name
+
+    def ensure_collection(self):
+        """Creates the chunk collection with self-provided vectors if it does not exist yet."""
+        try:
+            if self.weaviate_client.collections.exists(self.class_name):
+                return
+            self.weaviate_client.collections.create(
+                self.class_name,
+                properties=[
+                    Property(name="chunk_text", data_type=DataType.TEXT),
+                    Property(name="filename", data_type=DataType.TEXT),
+                    Property(name="page_number", data_type=DataType.INT),
+                ],
+                vector_config=Configure.Vectors.self_provided(),
+            )
+        except Exception as e:
+            raise WeaviateUpsertException(str(e))
+
+    def add(self, embed_docs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserts embedded chunks with Weaviate's dynamic batching, which sizes
+        batches from server load and sends them concurrently. `embed_docs` may
+        be a lazy iterable, so inserts can start while upstream stages still run.
+        """
+        if embed_docs is None:
+            return 0
+        collection = self.weaviate_client.collections.use(self.class_name)
+        total_added = 0
+        with collection.batch.dynamic() as batch:
+            for doc in embed_docs:
+                batch.add_object(
+                    properties={
+                        "chunk_text": doc["chunk_text"],
+                        "filename": doc["metadata"].get("filename", ""),
+                        "page_number": doc["metadata"].get("page_number", 0),
+                    },
+                    uuid=doc.get("uuid"),
+                    vector=doc["embedding"]    # Insert your embedding
+                )
+                total_added += 1
+        failed_objects = collection.batch.failed_objects
+        if failed_objects:
+            raise WeaviateUpsertException(
+                f"{len(failed_objects)} of {total_added} objects failed to insert: {failed_objects[0].message}"
+            )
+        return total_added
+
+    def delete(self, object_ids: List[str], batch_size: int = 500) -> int:
+        if not object_ids:
+            return 0
+        try:
+            collection = self.weaviate_client.collections.use(self.class_name)
+            deleted = 0
+            for i in range(0, len(object_ids), batch_size):
+                result = collection.data.delete_many(
+                    where=Filter.by_id().contains_any(object_ids[i:i + batch_size])
+                )
+                deleted += result.successful
+            return deleted
+        except Exception as e:
+            raise WeaviateUpsertException(str(e))
+
+    def search(self, query_vector: List[float], top_k: int = 5):
+        try:
+            collection = self.weaviate_client.collections.use(self.class_name)
+            response = collection.query.near_vector(
+                query_vector,
+                limit=top_k,
+                include_vector=True,
+                return_metadata=MetadataQuery(distance=True),
+            )
+            return self._to_docs(response.objects, query_vector)
+        except Exception as e:
+            raise WeaviateQueryException(str(e))
+
+    def hybrid_search(self, query: str, query_vector: List[float], top_k: int = 5, alpha: float = 0.5):
+        try:
+            collection = self.weaviate_client.collections.use(self.class_name)
+            response = collection.query.hybrid(
+                query=query,
+                vector=query_vector,
+                alpha=alpha,
+                limit=top_k,
+                fusion_type=HybridFusion.RANKED,
+                include_vector=True,
+                return_metadata=MetadataQuery(score=True),
+            )
+            return self._to_docs(response.objects, query_vector)
+        except Exception as e:
+            raise WeaviateQueryException(str(e))
+
+    @staticmethod
+    def _object_vector(obj) -> Optional[List[float]]:
+        vector = getattr(obj, "vector", None)
+        # Collections with named vectors return {name: vector}
+        if isinstance(vector, dict):
+            vector = next(iter(vector.values()), None)
+        return list(vector) if vector else None
+
+    @classmethod
+    def _to_docs(cls, objects, query_vector: List[float]):
+        docs = []
+        best_filename = None
+        for obj in objects or []:
+            # Defensive: skip if obj is None or doesn't have 'properties' dict
+            properties = getattr(obj, 'properties', None)
+            if obj is None or not isinstance(properties, dict):
+                continue
+            chunk_text = properties.get("chunk_text", "")
+            filename = properties.get("filename", "")
+            page_number = properties.get("page_number", "")
+            vector = cls._object_vector(obj)
+            object_metadata = getattr(obj, "metadata", None)
+            distance = getattr(object_metadata, "distance", None)
+            if distance is not None:
+                # Cosine distance -> cosine similarity
+                score = 1.0 - distance
+            else:
+                score = cosine_similarity(query_vector, vector) if vector else 0.0
+            metadata = {"filename": filename, "page_number": page_number, "score": score}
+            fusion_score = getattr(object_metadata, "score", None)
+            if fusion_score is not None:
+                metadata["fusion_score"] = fusion_score
+            docs.append({
+                "chunk_text": chunk_text,
+                "vector": vector,
+                "metadata": metadata
+            })
+            if best_filename is None:
+                best_filename = filename
+        return docs, best_filename
+
+
+class FaissVectorStore(VectorStore):
+    """
+    In-process FAISS store with on-disk persistence.
+
+    Vectors are L2-normalized and searched by inner product (cosine). The
+    index is one of:
+    - "flat": exact search (IndexFlatIP)
+    - "ivf": inverted lists (IndexIVFFlat); the store stays flat until it holds
+      enough vectors to train FAISS_IVF_NLIST lists, then rebuilds as IVF
+    - "hnsw": graph search (IndexHNSWFlat)
+
+    The index file is memory-mapped when loaded, and re-read fully only when
+    it is first written to. Chunk text and metadata live in a SQLite sidecar
+    keyed by the int64 FAISS id. Deleted ids are tombstoned in the sidecar
+    and filtered out of results. HNSW cannot remove vectors, so its index is
+    rebuilt from the live vectors once tombstones pass
+    FAISS_HNSW_COMPACT_RATIO of it.
+
+    The index is written to disk once per add()/delete() call, from a
+    snapshot taken under the store lock, so queries don't wait on the write.
+
+    The sidecar also holds an FTS5 inverted index of the chunk text, built
+    as chunks are added, which provides BM25 ranking for hybrid search.
+    """
+
+    def __init__(self, directory: str, index_type: str = "flat"):
+        import faiss
+
+        self._faiss = faiss
+        self.directory = directory
+        self.index_type = index_type.lower()
+        self.index_path = os.path.join(directory, "index.faiss")
+        self._lock = threading.RLock()
+        self._persist_lock = threading.Lock()
+        self._index = None
+        self._mmapped = False
+        self._dirty = False
+        self._version = 0
+        self._persisted_version = 0
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(os.path.join(directory, "metadata.sqlite3"), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    uuid TEXT UNIQUE,
+                    chunk_text TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    page_number INTEGER NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            has_fts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'"
+            ).fetchone()
+            if not has_fts:
+                self._conn.execute("CREATE VIRTUAL TABLE chunks_fts USING fts5(chunk_text)")
+                self._conn.execute(
+                    "INSERT INTO chunks_fts (rowid, chunk_text) SELECT id, chunk_text FROM chunks WHERE deleted = 0"
+                )
+        # Only HNSW keeps the vectors of deleted chunks in the index
+        self._tombstones = 0
+        if self.index_type == "hnsw":
+            self._tombstones = self._conn.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 1").fetchone()[0]
+
+        if os.path.exists(self.index_path):
+            self._index = faiss.read_index(self.index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            self._mmapped = True
+            self._configure_search(self._index)
+
+    def _configure_search(self, index):
+        params = self._faiss.ParameterSpace()
+        if isinstance(index, self._faiss.IndexIVF):
+            params.set_index_parameter(index, "nprobe", settings.FAISS_IVF_NPROBE)
+        elif self.index_type == "hnsw":
+            params.set_index_parameter(index, "efSearch", settings.FAISS_HNSW_EF_SEARCH)
+
+    def _new_index(self, dim: int):
+        faiss = self._faiss
+        if self.index_type == "hnsw":
+            index = faiss.IndexIDMap2(faiss.IndexHNSWFlat(dim, settings.FAISS_HNSW_M, faiss.METRIC_INNER_PRODUCT))
+        else:
+            # IVF starts out flat until there is enough data to train it (see _rebuild_locked)
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self._configure_search(index)
+        return index
+
+    def _ivf_index(self, vectors: np.ndarray):
+        faiss = self._faiss
+        dim = vectors.shape[1]
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, settings.FAISS_IVF_NLIST, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        # Lets results return their stored vectors via reconstruct()
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        self._configure_search(index)
+        return index
+
+    def _writable_index(self, dim: Optional[int] = None):
+        if self._index is None and dim is not None:
+            self._index = self._new_index(dim)
+        elif self._mmapped:
+            self._index = self._faiss.read_index(self.index_path)
+            self._mmapped = False
+            self._configure_search(self._index)
+        return self._index
+
+    def _live_vectors(self, index) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and stored vectors of the chunks in `index` that are not deleted in the sidecar."""
+        live = np.asarray(
+            [row[0] for row in self._conn.execute("SELECT id FROM chunks WHERE deleted = 0")], dtype=np.int64
+        )
+        if isinstance(index, self._faiss.IndexIDMap2):
+            ids = self._faiss.vector_to_array(index.id_map)
+            keep = np.isin(ids, live)
+            return ids[keep], index.index.reconstruct_n(0, index.ntotal)[keep]
+        ids, vectors = [], []
+        for chunk_id in live.tolist():
+            try:
+                vectors.append(index.reconstruct(chunk_id))
+            except RuntimeError:
+                continue
+            ids.append(chunk_id)
+        return np.asarray(ids, dtype=np.int64), np.asarray(vectors, dtype=np.float32).reshape(-1, index.d)
+
+    def _rebuild_locked(self) -> List[int]:
+        """
+        Rebuilds the index when it is due: IVF once there are ~39 training
+        points per list, HNSW once tombstones pass the compaction ratio.
+        Returns the tombstoned ids dropped from the index.
+        """
+        faiss = self._faiss
+        index = self._index
+        if index is None or self._mmapped:
+            return []
+        purged: List[int] = []
+        if self.index_type == "ivf":
+            nlist = index.nlist if isinstance(index, faiss.IndexIVF) else 0
+            if nlist >= settings.FAISS_IVF_NLIST or index.ntotal < 39 * settings.FAISS_IVF_NLIST:
+                return []
+            ids, vectors = self._live_vectors(index)
+            rebuilt = self._ivf_index(vectors)
+        elif self.index_type == "hnsw":
+            if not self._tombstones or self._tombstones < settings.FAISS_HNSW_COMPACT_RATIO * index.ntotal:
+                return []
+            purged = [row[0] for row in self._conn.execute("SELECT id FROM chunks WHERE deleted = 1")]
+            ids, vectors = self._live_vectors(index)
+            rebuilt = self._new_index(index.d)
+            self._tombstones = 0
+        else:
+            return []
+        if len(ids):
+            rebuilt.add_with_ids(vectors, ids)
+        self._index = rebuilt
+        self._dirty = True
+        return purged
+
+    def _persist(self):
+        """Snapshots the index under the store lock and writes it to disk outside of it."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._version += 1
+            version, data = self._version, self._faiss.serialize_index(self._index)
+        with self._persist_lock:
+            # A newer snapshot may already be on disk
+            if version <= self._persisted_version:
+                return
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                data.tofile(f)
+            os.replace(tmp_path, self.index_path)
+            self._persisted_version = version
+
+    def _flush(self):
+        """Rebuilds the index if due and persists it; runs once per add()/delete() call."""
+        with self._lock:
+            purged = self._rebuild_locked()
+        self._persist()
+        if purged:
+            # Only drop the sidecar rows once the compacted index is on disk
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(chunk_id,) for chunk_id in purged])
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32))
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def ensure_collection(self):
+        return
+
+    def add(self, embed_docs: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        if embed_docs is None:
+            return 0
+        total_added = 0
+        batch: List[Dict[str, Any]] = []
+        try:
+            for doc in embed_docs:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    total_added += self._add_batch(batch)
+                    batch = []
+            if batch:
+                total_added += self._add_batch(batch)
+        finally:
+            self._flush()
+        return total_added
+
+    def _add_batch(self, docs: List[Dict[str, Any]]) -> int:
+        # Identical chunks (repeated text, same-named files) share a content-derived
+        # uuid; like Weaviate, keep the last one instead of breaking the UNIQUE column
+        by_uuid = {doc["uuid"]: doc for doc in docs if doc.get("uuid")}
+        docs = [doc for doc in docs if not doc.get("uuid") or by_uuid[doc["uuid"]] is doc]
+        vectors = self._normalize([doc["embedding"] for doc in docs])
+        with self._lock:
+            # Re-adding an existing uuid replaces the previous vector
+            self._delete_locked([doc["uuid"] for doc in docs if doc.get("uuid")])
+            ids = []
+            with self._conn:
+                for doc in docs:
+                    cursor = self._conn.execute(
+                        "INSERT INTO chunks (uuid, chunk_text, filename, page_number) VALUES (?, ?, ?, ?)",
+                        (
+                            doc.get("uuid"),
+                            doc["chunk_text"],
+                            doc["metadata"].get("filename", ""),
+                            doc["metadata"].get("page_number", 0),
+                        ),
+                    )
+                    ids.append(cursor.lastrowid)
+                self._conn.executemany(
+                    "INSERT INTO chunks_fts (rowid, chunk_text) VALUES (?, ?)",
+                    [(chunk_id, doc["chunk_text"]) for chunk_id, doc in zip(ids, docs)],
+                )
+            index = self._writable_index(vectors.shape[1])
+            index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+            self._dirty = True
+        return len(docs)
+
+    def delete(self, object_ids: List[str]) -> int:
+        with self._lock:
+            deleted = self._delete_locked(object_ids)
+        self._flush()
+        return deleted
+
+    def _delete_locked(self, object_ids: List[str]) -> int:
+        if not object_ids:
+            return 0
+        ids = []
+        for i in range(0, len(object_ids), 500):
+            batch = object_ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            ids.extend(row[0] for row in self._conn.execute(
+                f"SELECT id FROM chunks WHERE deleted = 0 AND uuid IN ({placeholders})", batch
+            ).fetchall())
+        if not ids:
+            return 0
+        with self._conn:
+            # Free the uuid so the chunk can be added again under a new id
+            self._conn.executemany(
+                "UPDATE chunks SET deleted = 1, uuid = NULL WHERE id = ?", [(chunk_id,) for chunk_id in ids]
+            )
+            self._conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", [(chunk_id,) for chunk_id in ids])
+        index = self._writable_index()
+        if index is None:
+            return len(ids)
+        if self.index_type == "hnsw":
+            self._tombstones += len(ids)
+        else:
+            index.remove_ids(np.asarray(ids, dtype=np.int64))
+            self._dirty = True
+        return len(ids)
+
+    def _vector_rankings(self, query_vectors: List[List[float]], top_k: int) -> List[List[Tuple[int, float]]]:
+        """Searches all query vectors with a single index.search over the query matrix."""
+        with self._lock:
+            index = self._index
+            if index is None or index.ntotal == 0:
+                return [[] for _ in query_vectors]
+            queries = self._normalize(query_vectors)
+            # Over-fetch to make up for tombstoned vectors
+            fetch = min(index.ntotal, top_k + self._tombstones)
+            scores, ids = index.search(queries, fetch)
+        return [
+            [(int(i), float(score)) for i, score in zip(row_ids, row_scores) if i != -1]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+
+    def _vector_ranking(self, query_vector: List[float], top_k: int) -> List[Tuple[int, float]]:
+        return self._vector_rankings([query_vector], top_k)[0]
+
+    def _keyword_ranking(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        rows = self._conn.execute(
+            "SELECT rowid, bm25(chunks_fts) AS rank FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match, top_k),
+        ).fetchall()
+        # FTS5 bm25() is lower-is-better; flip it so higher is better like the vector scores
+        return [(int(rowid), -float(rank)) for rowid, rank in rows]
+
+    def _reconstruct(self, chunk_id: int) -> Optional[List[float]]:
+        try:
+            with self._lock:
+                return self._index.reconstruct(chunk_id).tolist()
+        except Exception:
+            return None
+
+    def _load_docs(self, hits: List[Tuple[int, float]], top_k: int, query_vector: List[float], fused: bool = False):
+        if not hits:
+            return [], None
+        placeholders = ",".join("?" * len(hits))
+        rows = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                f"SELECT id, chunk_text, filename, page_number FROM chunks WHERE deleted = 0 AND id IN ({placeholders})",
+                [i for i, _ in hits],
+            ).fetchall()
+        }
+        docs = []
+        for chunk_id, score in hits:
+            if chunk_id not in rows:
+                continue
+            chunk_text, filename, page_number = rows[chunk_id]
+            vector = self._reconstruct(chunk_id)
+            metadata = {"filename": filename, "page_number": page_number, "score": score}
+            if fused:
+                metadata["fusion_score"] = score
+                metadata["score"] = cosine_similarity(query_vector, vector) if vector else 0.0
+            docs.append({
+                "chunk_text": chunk_text,
+                "vector": vector,
+                "metadata": metadata,
+            })
+            if len(docs) == top_k:
+                break
+        return docs, docs[0]["metadata"]["filename"] if docs else None
+
+    def search(self, query_vector: List[float], top_k: int = 5):
+        try:
+            return self._load_docs(self._vector_ranking(query_vector, top_k), top_k, query_vector)
+        except Exception as e:
+            raise WeaviateQueryException(str(e))
+
+    def search_many(self, query_vectors: List[List[float]], top_k: int = 5):
+        if not query_vectors:
+            return []
+        try:
+            rankings = self._vector_rankings(query_vectors, top_k)
+            return [
+                self._load_docs(hits, top_k, query_vector)
+                for hits, query_vector in zip(rankings, query_vectors)
+            ]
+        except Exception as e:
+            raise WeaviateQueryException(str(e))
+
+    def hybrid_search(self, query: str, query_vector: List[float], top_k: int = 5, alpha: float = 0.5):
+        try:
+            # Fuse deeper candidate lists than top_k so each side can promote the other's misses
+            depth = max(top_k * 4, 20)
+            vector_ids = [chunk_id for chunk_id, _ in self._vector_ranking(query_vector, depth)]
+            keyword_ids = [chunk_id for chunk_id, _ in self._keyword_ranking(query, depth)]
+            fused = reciprocal_rank_fusion([vector_ids, keyword_ids], [alpha, 1.0 - alpha])
+            return self._load_docs(fused, top_k, query_vector, fused=True)
+        except Exception as e:
+            raise WeaviateQueryException(str(e))
+
+
+_faiss_stores: Dict[str, FaissVectorStore] = {}
+_faiss_stores_lock = threading.Lock()
+
+
+def get_vector_store(weaviate_client, class_name: str) -> VectorStore:
+    """
+    Returns the vector store configured by `VECTOR_STORE_BACKEND` for
+    `class_name`. FAISS stores are opened once per process and shared.
+    """
+    if settings.VECTOR_STORE_BACKEND == "faiss":
+        with _faiss_stores_lock:
+            store = _faiss_stores.get(class_name)
+            if store is None:
+                store = FaissVectorStore(
+                    os.path.join(settings.FAISS_INDEX_DIR, class_name),
+                    index_type=settings.FAISS_INDEX_TYPE,
+                )
+                _faiss_stores[class_name] = store
+            return store
+    return WeaviateVectorStore(weaviate_client, class_name)
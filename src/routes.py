@@ -1,30 +1,217 @@
-from fastapi import APIRouter, UploadFile, File
-from src.schemas.responses import QueryRequest, QuerySuccessResponse
-from src.db.upload import process_uploaded_files
-from src.services.rag_services import get_rag_response
+import json
+
+from fastapi import APIRouter, Depends, Path, Request, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from src.schemas.responses import QueryRequest, QuerySuccessResponse, BatchQueryRequest, BatchQueryResponse, UploadJobResponse, JobStatusResponse
+from src.config.settings import settings
+from src.config.weaviate_db import weaviate_pool
+from src.core.exceptions import UnknownTenantException
+from src.core.lifecycle import app_lifecycle
+from src.core.metrics import render_metrics
+from src.db.jobs import get_job_store, get_job_worker, JOB_QUEUED
+from src.services.rag_services import get_rag_response_async, get_rag_responses_batch_async, stream_rag_response, retrieval_latency
+from src.services.context_builder import context_builder
+from src.services.llm_gateway import llm_gateway
+from src.services.reranker import reranker
+from src.services.sessions import session_store
+from src.services.tenants import Tenant, tenant_registry
+from src.utils.document_processing import DocumentProcessor
 
 router = APIRouter()
+# Document routes, served for the default tenant at the root and for every
+# tenant under /tenants/{tenant_id}
+tenant_router = APIRouter()
+
+def _tenant(tenant_id: str) -> Tenant:
+    try:
+        return tenant_registry.get(tenant_id)
+    except UnknownTenantException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+def tenant_path(tenant_id: str = Path(..., description="Id of the tenant")) -> Tenant:
+    """
+    Resolve the /tenants/{tenant_id} prefix, rejecting unknown tenants before the route runs.
+    """
+    return _tenant(tenant_id)
+
+def get_tenant(request: Request) -> Tenant:
+    """
+    Resolve the tenant of a request from its path only: the tenant of the
+    /tenants/{tenant_id} prefix, the default tenant on the root routes.
+    """
+    tenant_id = request.path_params.get("tenant_id")
+    return _tenant(tenant_id) if tenant_id is not None else tenant_registry.default
 
-@router.post("/upload")
-async def upload_files(uploaded_files: list[UploadFile] = File(...)):
+@tenant_router.post("/upload")
+async def upload_files(uploaded_files: list[UploadFile] = File(...), tenant: Tenant = Depends(get_tenant)):
     """
-    Upload and process PDF files, returning processing result.
+    Queue PDF files for background ingestion and return the job id.
+    Progress can be followed at /jobs/{job_id}.
     """
     # Only allow PDF files
     for file in uploaded_files:
         if file.content_type != "application/pdf":
             return {"error": f"File {file.filename} is not a PDF."}
-    result = process_uploaded_files(uploaded_files)
-    return result
+    job_id = await run_in_threadpool(get_job_worker().submit, uploaded_files, tenant.id)
+    return UploadJobResponse(
+        message="PDF documents queued for processing",
+        job_id=job_id,
+        status=JOB_QUEUED,
+    )
+
+@tenant_router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, tenant: Tenant = Depends(get_tenant)):
+    """
+    Return the state of an ingestion job with per-file progress.
+    """
+    job = await run_in_threadpool(get_job_store().get_job, job_id)
+    if job is None or job["tenant"] != tenant.id:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return job
 
-@router.post("/query", response_model=QuerySuccessResponse)
-async def query_rag_service(request: QueryRequest):
+@tenant_router.post("/query", response_model=QuerySuccessResponse)
+async def query_rag_service(request: QueryRequest, tenant: Tenant = Depends(get_tenant)):
     """
-    Query the RAG service and return the response.
+    Query the RAG service and return the response. Pass a `session_id` to
+    ask follow-up questions about earlier answers.
     """
-    response = get_rag_response(
+    response = await get_rag_response_async(
         query=request.query,
         top_k=request.top_k if request.top_k is not None else 5,
-        min_score=request.min_score if request.min_score is not None else 0.0
+        min_score=request.min_score if request.min_score is not None else 0.0,
+        search_mode=request.search_mode,
+        alpha=request.alpha,
+        rerank=request.rerank,
+        session_id=request.session_id,
+        tenant=tenant
     )
     return response
+
+@tenant_router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_rag_service_batch(request: BatchQueryRequest, tenant: Tenant = Depends(get_tenant)):
+    """
+    Answer many queries in one request, e.g. for evaluation or FAQ prefill
+    jobs. Returns one result per query, in order, and a stage timing breakdown.
+    """
+    if len(request.queries) > settings.BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_QUERIES} queries are allowed per batch.",
+        )
+    responses, timings = await get_rag_responses_batch_async(
+        queries=request.queries,
+        top_k=request.top_k,
+        min_score=request.min_score,
+        search_mode=request.search_mode,
+        alpha=request.alpha,
+        rerank=request.rerank,
+        tenant=tenant
+    )
+    return BatchQueryResponse(
+        message=f"Processed {len(responses)} queries",
+        results=[response.model_dump() for response in responses],
+        timings=timings,
+    )
+
+@tenant_router.post("/query/stream")
+async def query_rag_service_stream(request: QueryRequest, tenant: Tenant = Depends(get_tenant)):
+    """
+    Query the RAG service and stream the answer as Server-Sent Events.
+    """
+    async def event_stream():
+        async for event, data in stream_rag_response(
+            query=request.query,
+            top_k=request.top_k if request.top_k is not None else 5,
+            min_score=request.min_score if request.min_score is not None else 0.0,
+            search_mode=request.search_mode,
+            alpha=request.alpha,
+            rerank=request.rerank,
+            session_id=request.session_id,
+            tenant=tenant
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+@tenant_router.delete("/sessions/{session_id}")
+async def end_session(session_id: str, tenant: Tenant = Depends(get_tenant)):
+    """
+    Forget a conversation session and its history.
+    """
+    if not session_store.drop(tenant.session_key(session_id)):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found.")
+    return {"session_id": session_id, "deleted": True}
+
+@tenant_router.get("/cache/stats")
+async def cache_stats(tenant: Tenant = Depends(get_tenant)):
+    """
+    Return hit/miss counters of the tenant's semantic answer cache and of the
+    shared embedding cache, and the session store (rewritten follow-ups,
+    reused chunks).
+    """
+    embedding_cache = DocumentProcessor._embedding_cache
+    return {
+        "answer_cache": tenant.answer_cache.stats(),
+        "embedding_cache": await run_in_threadpool(embedding_cache.stats) if embedding_cache else None,
+        "sessions": session_store.stats(),
+    }
+
+@tenant_router.get("/usage")
+async def tenant_usage(tenant: Tenant = Depends(get_tenant)):
+    """
+    Return the tenant's collection and usage: queries, LLM calls and tokens,
+    ingested pages, chunks and stored vectors, upload jobs.
+    """
+    return tenant.stats()
+
+@router.get("/tenants")
+async def list_tenants():
+    """
+    List the tenants of this deployment with their collections and usage.
+    """
+    return {"tenants": [tenant.stats() for tenant in tenant_registry.all()]}
+
+@router.get("/retrieval/stats")
+async def retrieval_stats():
+    """
+    Return recent retrieval latency percentiles by search mode, reranker
+    counters, the tokens saved by context compression, Weaviate connection
+    reuse and the LLM gateway (coalesced calls, retries, circuit state).
+    """
+    return {
+        **retrieval_latency.stats(),
+        "rerank": reranker.stats(),
+        "context": context_builder.stats(),
+        "weaviate_pool": weaviate_pool.stats(),
+        "llm": llm_gateway.stats(),
+    }
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Expose stage latency histograms, cache, token, query and error counters
+    in the Prometheus text format.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@router.get("/health")
+async def health():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once the clients are connected and the models are
+    warm, 503 while warm-up is still running or a component failed.
+    Also reports import time, warm-up time and time to first answer.
+    """
+    status = app_lifecycle.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+router.include_router(tenant_router)
+router.include_router(tenant_router, prefix="/tenants/{tenant_id}", dependencies=[Depends(tenant_path)])
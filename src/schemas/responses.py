@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
+from src.config.settings import settings
+
 # Response Models
 class ErrorResponse(BaseModel):
     statusCode: int
@@ -14,6 +16,40 @@ class DocumentProcessSuccessResponse(BaseModel):
     message: str
     documents_processed: int
     vectors_stored: int
+    pages_processed: int = 0
+    elapsed_seconds: float = 0.0
+    pages_per_second: float = 0.0
+    chunks_per_second: float = 0.0
+    chunks_added: int = 0
+    chunks_updated: int = 0
+    chunks_skipped: int = 0
+    chunks_deleted: int = 0
+    empty_pages: dict[str, list[int]] = Field(default_factory=dict, description="Pages skipped for having no extractable text, by file.")
+
+class UploadJobResponse(BaseModel):
+    statusCode: int = 202
+    success: bool = True
+    message: str
+    job_id: str
+    status: str
+
+class JobFileStatus(BaseModel):
+    filename: str
+    status: str
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    vectors_stored: int = 0
+    error: Optional[str] = None
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    tenant: str = "default"
+    status: str
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    files: list[JobFileStatus] = []
 
 class QueryNotFoundResponse(BaseModel):
     statusCode: int = 404
@@ -21,6 +57,15 @@ class QueryNotFoundResponse(BaseModel):
     message: str
     query: str
     answer: str
+    session_id: Optional[str] = None
+    standalone_query: Optional[str] = None
+
+class Citation(BaseModel):
+    filename: Optional[str] = None
+    page_number: Optional[int] = None
+    score: float = Field(0.0, description="Best similarity between the query and a chunk of this page.")
+    support: Optional[float] = Field(None, description="Best similarity between an answer sentence and a chunk of this page; null when no sentence is attributed to it.")
+    answer_spans: list[list[int]] = Field(default_factory=list, description="[start, end) character offsets of the answer sentences attributed to this page.")
 
 class QuerySuccessResponse(BaseModel):
     statusCode: int = 200
@@ -29,9 +74,36 @@ class QuerySuccessResponse(BaseModel):
     query: str
     answer: str
     source_url: Optional[str] = None
+    context_tokens: Optional[int] = None
+    context_tokens_saved: Optional[int] = None
+    citations: list[Citation] = []
+    session_id: Optional[str] = None
+    standalone_query: Optional[str] = Field(None, description="The follow-up rewritten into the query used for retrieval, when it was rewritten.")
 
 # Request Model
 class QueryRequest(BaseModel):
     query: str = Field(..., examples=["What online services did APMC provide?"])
     top_k: int = 5
-    min_score: float = 0.8
+    min_score: float = Field(
+        default_factory=lambda: settings.DEFAULT_MIN_SCORE,
+        description="Minimum cosine similarity between the query and a chunk for the chunk to be used.",
+    )
+    search_mode: Literal["vector", "hybrid"] = "vector"
+    alpha: Optional[float] = Field(None, ge=0.0, le=1.0, description="Hybrid weighting: 1.0 is pure vector, 0.0 pure keyword search.")
+    rerank: Optional[bool] = Field(None, description="Rerank over-fetched candidates with the cross-encoder; defaults to RERANK_ENABLED.")
+    session_id: Optional[str] = Field(None, max_length=128, description="Client-chosen conversation id; follow-ups in a session are resolved against its earlier turns.")
+
+class BatchQueryRequest(BaseModel):
+    queries: list[str] = Field(..., min_length=1, examples=[["What online services did APMC provide?"]])
+    top_k: int = 5
+    min_score: float = Field(default_factory=lambda: settings.DEFAULT_MIN_SCORE)
+    search_mode: Literal["vector", "hybrid"] = "vector"
+    alpha: Optional[float] = Field(None, ge=0.0, le=1.0)
+    rerank: Optional[bool] = None
+
+class BatchQueryResponse(BaseModel):
+    statusCode: int = 200
+    success: bool = True
+    message: str
+    results: list[dict]
+    timings: dict
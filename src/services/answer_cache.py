@@ -0,0 +1,129 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from src.config.settings import settings
+from src.core.metrics import CACHE_LOOKUPS
+
+
+class _CacheEntry:
+    __slots__ = ("vector", "params", "value", "expires_at")
+
+    def __init__(self, vector: np.ndarray, params: Hashable, value: Any, expires_at: float):
+        self.vector = vector
+        self.params = params
+        self.value = value
+        self.expires_at = expires_at
+
+
+class SemanticAnswerCache:
+    """
+    LRU + TTL cache of final RAG answers.
+
+    Lookups first try an exact match on the normalized query text and then a
+    near-duplicate match by cosine similarity on the query embedding. Entries
+    are only matched against entries created with the same retrieval params
+    (e.g. top_k), since those change the answer.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[tuple, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lower-cases, collapses whitespace and drops trailing punctuation."""
+        return re.sub(r"\s+", " ", query).strip().lower().rstrip("?!. ")
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _purge_expired(self, now: float):
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def get_exact(self, query: str, params: Hashable = None) -> Optional[Any]:
+        key = (self.normalize(query), params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            CACHE_LOOKUPS.labels("answer", "exact_hit").inc()
+            return entry.value
+
+    def get_similar(self, vector, params: Hashable = None) -> Optional[Any]:
+        """Returns the closest cached answer above the similarity threshold, counting a miss otherwise."""
+        query_vector = self._unit(vector)
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            keys: List[tuple] = [key for key, entry in self._entries.items() if entry.params == params]
+            if keys:
+                matrix = np.stack([self._entries[key].vector for key in keys])
+                similarities = matrix @ query_vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.semantic_hits += 1
+                    CACHE_LOOKUPS.labels("answer", "semantic_hit").inc()
+                    return self._entries[keys[best]].value
+            self.misses += 1
+            CACHE_LOOKUPS.labels("answer", "miss").inc()
+            return None
+
+    def put(self, query: str, vector, value: Any, params: Hashable = None):
+        key = (self.normalize(query), params)
+        entry = _CacheEntry(self._unit(vector), params, value, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Drops every cached answer, e.g. after new chunks were ingested."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity_threshold,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+answer_cache = SemanticAnswerCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+)
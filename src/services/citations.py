@@ -0,0 +1,94 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+# Sentences end at ., ! or ? followed by whitespace, or at a line break (list items)
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\s*\n\s*")
+
+
+class CitationBuilder:
+    """
+    Attributes the sentences of an answer to the pages of its context.
+
+    Every answer sentence is embedded (one batched call to the local
+    embedding model) and matched to the context chunk with the most similar
+    stored vector; it is attributed to that chunk's page when the cosine
+    similarity reaches `min_similarity`. The chunk vectors come back with
+    the search results, so no chunk is re-embedded and the LLM is not
+    called again. Chunks returned without a vector are embedded through the
+    embedding cache that ingestion filled.
+    """
+
+    def __init__(self, min_similarity: float, min_sentence_chars: int):
+        self.min_similarity = min_similarity
+        self.min_sentence_chars = min_sentence_chars
+
+    def sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """[start, end) offsets of the sentences of `text` long enough to attribute."""
+        spans = []
+        start = 0
+        for match in [*_SENTENCE_BREAK.finditer(text), None]:
+            end = match.start() if match else len(text)
+            sentence = text[start:end].strip()
+            if len(sentence) >= self.min_sentence_chars:
+                offset = start + text[start:end].index(sentence)
+                spans.append((offset, offset + len(sentence)))
+            if match:
+                start = match.end()
+        return spans
+
+    def _chunk_matrix(self, docs: List[Dict[str, Any]], doc_processor) -> np.ndarray:
+        vectors = [doc.get("vector") for doc in docs]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, doc_processor.embed_passages([docs[i]["chunk_text"] for i in missing])):
+                vectors[i] = vector
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def cite(self, answer: str, docs: List[Dict[str, Any]], doc_processor) -> List[Dict[str, Any]]:
+        """
+        Returns one citation per page of `docs` (the chunks the answer was
+        generated from): filename, page_number, the best retrieval score of
+        its chunks, `support` (the best similarity of a sentence attributed
+        to it, None when none is) and the `answer_spans` attributed to it.
+        Cited pages come first, in the order the answer cites them.
+        """
+        citations: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        for doc in docs:
+            metadata = doc["metadata"]
+            key = (metadata.get("filename"), metadata.get("page_number"))
+            citation = citations.setdefault(key, {
+                "filename": key[0], "page_number": key[1], "score": 0.0, "support": None, "answer_spans": [],
+            })
+            citation["score"] = max(citation["score"], float(metadata.get("score", 0.0)))
+
+        spans = self.sentence_spans(answer)
+        if spans and docs:
+            sentence_vectors = doc_processor.embed_sentences([answer[start:end] for start, end in spans])
+            similarities = sentence_vectors @ self._chunk_matrix(docs, doc_processor).T
+            best = similarities.argmax(axis=1)
+            for span_index, doc_index in enumerate(best):
+                similarity = float(similarities[span_index, doc_index])
+                if similarity < self.min_similarity:
+                    continue
+                metadata = docs[doc_index]["metadata"]
+                citation = citations[(metadata.get("filename"), metadata.get("page_number"))]
+                citation["answer_spans"].append(list(spans[span_index]))
+                citation["support"] = round(max(citation["support"] or 0.0, similarity), 4)
+
+        ordered = list(citations.values())
+        # Stable sort: uncited pages keep their retrieval order after the cited ones
+        ordered.sort(key=lambda citation: citation["answer_spans"][0][0] if citation["answer_spans"] else len(answer) + 1)
+        return ordered
+
+
+citation_builder = CitationBuilder(
+    min_similarity=settings.CITATION_MIN_SIMILARITY,
+    min_sentence_chars=settings.CITATION_MIN_SENTENCE_CHARS,
+)
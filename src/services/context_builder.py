@@ -0,0 +1,205 @@
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.settings import settings
+from src.db.vector_store import cosine_similarity
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for Gemini prompts (about four characters per token)."""
+    return math.ceil(len(text) / settings.CONTEXT_CHARS_PER_TOKEN) if text else 0
+
+
+def _format_doc(position: int, doc: Dict[str, Any]) -> str:
+    metadata = doc["metadata"]
+    return (
+        f"DOCUMENT {position}:\nTitle: {metadata.get('filename')}\nCategory: {metadata.get('page_number')}\n"
+        f"Relevance Score: {metadata.get('score', 0):.2f}\nContent:\n{doc['chunk_text']}"
+    )
+
+
+def format_context(docs: List[Dict[str, Any]]) -> str:
+    """Prepares the context for the LLM from retrieved documents."""
+    return "\n\n" + "\n\n---\n\n".join(_format_doc(i + 1, doc) for i, doc in enumerate(docs))
+
+
+def _overlap(left: str, right: str, max_overlap: int, min_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is also a prefix of `right`."""
+    if len(left) < min_overlap or len(right) < min_overlap:
+        return 0
+    tail = left[-max_overlap:]
+    probe = right[:min_overlap]
+    index = tail.find(probe)
+    while index != -1:
+        if right.startswith(tail[index:]):
+            return len(tail) - index
+        index = tail.find(probe, index + 1)
+    return 0
+
+
+class ContextBuilder:
+    """
+    Turns the retrieved chunks into a compact LLM context.
+
+    Chunks are taken in relevance order: near-duplicates of a better chunk
+    are dropped, neighbouring chunks of the same page whose text overlaps
+    (the splitter repeats up to `max_overlap` characters) are merged into one
+    passage, and passages are added until `token_budget` is reached. The last
+    passage that does not fit is cut at a sentence or word boundary.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        duplicate_threshold: float,
+        max_overlap: int = 200,
+        min_overlap: int = 20,
+    ):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.max_overlap = max_overlap
+        self.min_overlap = min_overlap
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.duplicates_dropped = 0
+        self.chunks_merged = 0
+        self.passages_truncated = 0
+
+    def _is_duplicate(self, doc: Dict[str, Any], kept: List[Dict[str, Any]]) -> bool:
+        text = " ".join(doc["chunk_text"].split())
+        vector = doc.get("vector")
+        for other in kept:
+            if text == " ".join(other["chunk_text"].split()):
+                return True
+            other_vector = other.get("vector")
+            if vector is not None and other_vector is not None:
+                if cosine_similarity(vector, other_vector) >= self.duplicate_threshold:
+                    return True
+        return False
+
+    def _merge(self, passage: Dict[str, Any], doc: Dict[str, Any]) -> bool:
+        """Appends or prepends `doc` to `passage` when their texts overlap."""
+        text, other = passage["chunk_text"], doc["chunk_text"]
+        overlap = _overlap(text, other, self.max_overlap, self.min_overlap)
+        if overlap:
+            passage["chunk_text"] = text + other[overlap:]
+            return True
+        overlap = _overlap(other, text, self.max_overlap, self.min_overlap)
+        if overlap:
+            passage["chunk_text"] = other + text[overlap:]
+            return True
+        return False
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        limit = max_tokens * settings.CONTEXT_CHARS_PER_TOKEN
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        boundary = max(cut.rfind(". "), cut.rfind("\n"))
+        if boundary < limit // 2:
+            boundary = cut.rfind(" ")
+        return cut[:boundary + 1].rstrip() if boundary > 0 else cut
+
+    def build(self, docs: List[Dict[str, Any]]) -> Tuple[str, Dict[str, int]]:
+        """
+        Builds the context for `docs` (best first).
+
+        Returns:
+            (context, stats) where stats reports the chunks dropped and merged
+            and the estimated tokens before and after compression, and lists
+            under "docs_used" the chunks whose text made it into the context.
+        """
+        kept: List[Dict[str, Any]] = []
+        duplicates = 0
+        for doc in docs:
+            if self._is_duplicate(doc, kept):
+                duplicates += 1
+            else:
+                kept.append(doc)
+
+        passages: List[Dict[str, Any]] = []
+        merged = 0
+        for doc in kept:
+            metadata = doc["metadata"]
+            page = (metadata.get("filename"), metadata.get("page_number"))
+            target: Optional[Dict[str, Any]] = next(
+                (passage for passage in passages
+                 if (passage["metadata"].get("filename"), passage["metadata"].get("page_number")) == page
+                 and self._merge(passage, doc)),
+                None,
+            )
+            if target is not None:
+                target["docs"].append(doc)
+                merged += 1
+            else:
+                passages.append({"chunk_text": doc["chunk_text"], "metadata": dict(metadata), "docs": [doc]})
+
+        blocks: List[str] = []
+        used = estimate_tokens("\n\n")
+        truncated = 0
+        separator = estimate_tokens("\n\n---\n\n")
+        for passage in passages:
+            block = _format_doc(len(blocks) + 1, passage)
+            cost = estimate_tokens(block) + (separator if blocks else 0)
+            if used + cost <= self.token_budget:
+                blocks.append(block)
+                used += cost
+                continue
+            header_cost = cost - estimate_tokens(passage["chunk_text"])
+            remaining = self.token_budget - used - header_cost
+            if remaining >= settings.CONTEXT_MIN_PASSAGE_TOKENS or not blocks:
+                text = self._truncate(passage["chunk_text"], max(remaining, 0))
+                # Nothing of it fits: a header without text would only mislead the LLM
+                if text.strip():
+                    passage["chunk_text"] = text
+                    blocks.append(_format_doc(len(blocks) + 1, passage))
+                    truncated += 1
+            break
+
+        context = "\n\n" + "\n\n---\n\n".join(blocks)
+        tokens_before = estimate_tokens(format_context(docs))
+        tokens_after = estimate_tokens(context)
+        stats = {
+            "chunks_in": len(docs),
+            "passages_out": len(blocks),
+            "duplicates_dropped": duplicates,
+            "chunks_merged": merged,
+            "passages_truncated": truncated,
+            "passages_dropped": len(passages) - len(blocks),
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": max(tokens_before - tokens_after, 0),
+            "docs_used": [doc for passage in passages[:len(blocks)] for doc in passage["docs"]],
+        }
+        with self._lock:
+            self.requests += 1
+            self.tokens_in += tokens_before
+            self.tokens_out += tokens_after
+            self.duplicates_dropped += duplicates
+            self.chunks_merged += merged
+            self.passages_truncated += truncated
+        return context, stats
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            saved = self.tokens_in - self.tokens_out
+            return {
+                "requests": self.requests,
+                "token_budget": self.token_budget,
+                "tokens_before": self.tokens_in,
+                "tokens_after": self.tokens_out,
+                "tokens_saved": saved,
+                "saved_ratio": saved / self.tokens_in if self.tokens_in else 0.0,
+                "duplicates_dropped": self.duplicates_dropped,
+                "chunks_merged": self.chunks_merged,
+                "passages_truncated": self.passages_truncated,
+            }
+
+
+context_builder = ContextBuilder(
+    token_budget=settings.CONTEXT_TOKEN_BUDGET,
+    duplicate_threshold=settings.CONTEXT_DUPLICATE_THRESHOLD,
+)
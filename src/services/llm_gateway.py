@@ -0,0 +1,392 @@
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from src.config.settings import settings
+from src.core.exceptions import LLMServiceAPIException, LLMUnavailableException
+from src.core.metrics import LLM_CIRCUIT_STATE, LLM_GATEWAY, STAGE_SECONDS
+from src.services.context_builder import estimate_tokens
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_HALF_OPEN = "half_open"
+CIRCUIT_OPEN = "open"
+_CIRCUIT_GAUGE = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+# Exception class names and messages of throttling, timeouts and server-side errors
+_RETRYABLE_ERRORS = (
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "TimeoutError", "ConnectionError",
+)
+# Status codes and phrases as whole words, so e.g. "id 45001" or "invalid timeout value" don't match
+_RETRYABLE_MESSAGES = re.compile(
+    r"\b(?:429|5\d\d)\b|\bresource[ _]exhausted\b|\bquota\b|\brate limit|\bunavailable\b"
+    r"|\boverloaded\b|\bdeadline exceeded\b|\btimed out\b",
+    re.IGNORECASE,
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an LLM call failed for a transient reason (throttling, outage, timeout), so a retry may succeed."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if any(name in type(error).__name__ for name in _RETRYABLE_ERRORS):
+        return True
+    return _RETRYABLE_MESSAGES.search(str(error)) is not None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `per_minute / 60` tokens per second, holding at
+    most `burst_seconds` worth of tokens. `reserve()` takes tokens even when
+    the bucket runs dry and returns how long the caller must wait, so callers
+    are served in arrival order without polling.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(amount, self.capacity)
+            return max(-self._tokens / self.rate, 0.0)
+
+    def refund(self, amount: float):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + min(amount, self.capacity))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects
+    calls for `reset_seconds`; then lets a single trial call through
+    (half-open) and closes again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        self.state = state
+        LLM_CIRCUIT_STATE.set(_CIRCUIT_GAUGE[state])
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CIRCUIT_OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._set_state(CIRCUIT_HALF_OPEN)
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release(self):
+        """
+        Gives back the half-open trial slot of a call that ended without an
+        outcome (rejected by the rate limit, cancelled); a no-op otherwise.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            if self.state != CIRCUIT_CLOSED:
+                self._set_state(CIRCUIT_CLOSED)
+                print("LLM circuit breaker closed.")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != CIRCUIT_OPEN:
+                    print(f"LLM circuit breaker opened after {self.failures} failed calls.")
+                self._set_state(CIRCUIT_OPEN)
+                self._opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """
+    The one way to Gemini: every LLM call of the process goes through it.
+
+    - Single flight: concurrent calls with an identical prompt share one
+      Gemini request.
+    - Rate limit: request and token buckets sized to the Gemini quota
+      (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, prompt tokens
+      estimated); a call that could not start before its deadline is
+      rejected instead of queued.
+    - Retries: throttling, server errors and timeouts are retried with
+      full-jitter exponential backoff, each attempt bounded by
+      LLM_ATTEMPT_TIMEOUT_SECONDS and all of them by LLM_DEADLINE_SECONDS.
+    - Circuit breaker: after LLM_BREAKER_FAILURES consecutive calls failed
+      all their attempts, calls fail fast with `LLMUnavailableException` (answered
+      with FALLBACK_MESSAGE) until a trial call succeeds.
+
+    Calls are passed in as `call(prompt, timeout)`, so the gateway works
+    with any client, including the local fakes of the benchmarks.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        burst_seconds: float,
+        max_attempts: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float,
+        attempt_timeout_seconds: float,
+        deadline_seconds: float,
+        breaker: CircuitBreaker,
+    ):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_attempts = max(max_attempts, 1)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.attempt_timeout_seconds = attempt_timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.breaker = breaker
+        self._in_flight: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def _count(self, event: str):
+        LLM_GATEWAY.labels(event).inc()
+        with self._lock:
+            self._counts[event] = self._counts.get(event, 0) + 1
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    # Admission: breaker and rate limit
+
+    def _admit(self):
+        """
+        Checks the breaker, once per call rather than per attempt: a half-open
+        trial keeps its slot through its retries. Callers must `release()` the
+        breaker when the call ends, whatever the outcome.
+        """
+        if not self.breaker.allow():
+            self._count("rejected_circuit_open")
+            raise LLMUnavailableException("The LLM circuit breaker is open.")
+
+    def _reserve(self, prompt_tokens: int, deadline: float) -> float:
+        """Reserves quota for one attempt; returns how long to wait before making it."""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(prompt_tokens))
+        if time.monotonic() + wait >= deadline:
+            self.requests.refund(1)
+            self.tokens.refund(prompt_tokens)
+            self._count("rejected_rate_limit")
+            raise LLMUnavailableException("The Gemini quota is exhausted for now.")
+        if wait > 0:
+            self._count("throttled")
+            STAGE_SECONDS.labels("llm_rate_limit_wait").observe(wait)
+        return wait
+
+    def _attempt_timeout(self, deadline: float) -> float:
+        return max(min(self.attempt_timeout_seconds, deadline - time.monotonic()), 0.001)
+
+    def _failed(self, error: Exception, attempt: int, deadline: float) -> float:
+        """
+        Handles a failed attempt: returns the backoff before the next one, or
+        records the outcome of the call with the breaker and raises.
+        """
+        if not is_retryable(error):
+            # A client error says nothing about an outage either way: leave the breaker as it is
+            raise error
+        delay = self._backoff(attempt)
+        if attempt + 1 >= self.max_attempts or time.monotonic() + delay >= deadline:
+            # Only calls that exhausted their retries count towards opening the breaker
+            self.breaker.record_failure()
+            self._count("failed")
+            raise LLMServiceAPIException(f"Gemini call failed after {attempt + 1} attempt(s): {error}")
+        self._count("retried")
+        print(f"Gemini call failed ({error}); retrying in {delay:.2f}s")
+        return delay
+
+    # Synchronous calls
+
+    def call(self, prompt: str, call: Callable[[str, float], str]) -> str:
+        """Runs `call(prompt, timeout)` with coalescing, rate limiting, retries and the breaker."""
+        key = self._key(prompt)
+        with self._lock:
+            leader = self._in_flight.get(key)
+            if leader is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+        if leader is not None:
+            self._count("coalesced")
+            return leader.result()
+
+        try:
+            result = self._call_with_retries(prompt, call)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _call_with_retries(self, prompt: str, call: Callable[[str, float], str]) -> str:
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        prompt_tokens = estimate_tokens(prompt)
+        self._admit()
+        try:
+            for attempt in range(self.max_attempts):
+                wait = self._reserve(prompt_tokens, deadline)
+                if wait:
+                    time.sleep(wait)
+                try:
+                    result = call(prompt, self._attempt_timeout(deadline))
+                except Exception as e:
+                    time.sleep(self._failed(e, attempt, deadline))
+                else:
+                    self.breaker.record_success()
+                    return result
+        finally:
+            self.breaker.release()
+
+    # Async calls
+
+    async def call_async(self, prompt: str, call: Callable[[str, float], Awaitable[str]]) -> str:
+        """Async variant of `call`; `call(prompt, timeout)` returns an awaitable."""
+        key = (id(asyncio.get_running_loop()), self._key(prompt))
+        while True:
+            leader = self._in_flight.get(key)
+            if leader is None:
+                break
+            self._count("coalesced")
+            try:
+                return await asyncio.shield(leader)
+            except asyncio.CancelledError:
+                # The leading request was cancelled, not this one: try again ourselves
+                if not leader.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._call_with_retries_async(prompt, call)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; without followers it must not be logged as never retrieved
+            future.exception()
+            raise
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _call_with_retries_async(self, prompt: str, call: Callable[[str, float], Awaitable[str]]) -> str:
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        prompt_tokens = estimate_tokens(prompt)
+        self._admit()
+        try:
+            for attempt in range(self.max_attempts):
+                wait = self._reserve(prompt_tokens, deadline)
+                if wait:
+                    await asyncio.sleep(wait)
+                timeout = self._attempt_timeout(deadline)
+                try:
+                    result = await asyncio.wait_for(call(prompt, timeout), timeout)
+                except Exception as e:
+                    await asyncio.sleep(self._failed(e, attempt, deadline))
+                else:
+                    self.breaker.record_success()
+                    return result
+        finally:
+            # Also on cancellation (client disconnect), which `except Exception` does not see
+            self.breaker.release()
+
+    async def stream_async(self, prompt: str, stream: Callable[[str, float], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Streams `stream(prompt, timeout)` under the rate limit and breaker.
+        An attempt is retried only if it failed before its first fragment;
+        streams are not coalesced.
+        """
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_seconds
+        prompt_tokens = estimate_tokens(prompt)
+        self._admit()
+        try:
+            for attempt in range(self.max_attempts):
+                wait = self._reserve(prompt_tokens, deadline)
+                if wait:
+                    await asyncio.sleep(wait)
+                started = False
+                try:
+                    async for fragment in stream(prompt, self._attempt_timeout(deadline)):
+                        started = True
+                        yield fragment
+                except Exception as e:
+                    if started:
+                        if is_retryable(e):
+                            self.breaker.record_failure()
+                        raise
+                    await asyncio.sleep(self._failed(e, attempt, deadline))
+                else:
+                    self.breaker.record_success()
+                    return
+        finally:
+            self.breaker.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "in_flight_prompts": len(self._in_flight),
+            **counts,
+        }
+
+
+llm_gateway = LLMGateway(
+    requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+    burst_seconds=settings.LLM_BURST_SECONDS,
+    max_attempts=settings.LLM_MAX_ATTEMPTS,
+    backoff_seconds=settings.LLM_BACKOFF_SECONDS,
+    max_backoff_seconds=settings.LLM_MAX_BACKOFF_SECONDS,
+    attempt_timeout_seconds=settings.LLM_ATTEMPT_TIMEOUT_SECONDS,
+    deadline_seconds=settings.LLM_DEADLINE_SECONDS,
+    breaker=CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_RESET_SECONDS),
+)
@@ -2,6 +2,10 @@ from src.core.exceptions import LLMServiceAPIException
 from src.config.settings import settings
 from src.core.prompts import get_document_answer_prompt
 from src.core.constants import FALLBACK_MESSAGE
+from src.core.metrics import STAGE_SECONDS, record_llm_usage, span
+from src.services.llm_gateway import llm_gateway
+
+import time
 
 import google.generativeai as genai
 
@@ -17,15 +21,78 @@ class LLMService:
             cls._client = genai.GenerativeModel(settings.GEMINI_LLM_MODEL)
         return cls._instance
 
-    def generate_answer(self, context: str, question: str) -> str:
+    def _generate(self, prompt: str, timeout: float) -> str:
+        with span("llm_generate"):
+            response = self._client.generate_content(
+                contents=prompt,
+                request_options={"timeout": timeout}
+            )
+        record_llm_usage(response)
+        return response.text.strip()
+
+    async def _generate_async(self, prompt: str, timeout: float) -> str:
+        with span("llm_generate"):
+            response = await self._client.generate_content_async(
+                contents=prompt,
+                request_options={"timeout": timeout}
+            )
+        record_llm_usage(response)
+        return response.text.strip()
+
+    async def _stream_async(self, prompt: str, timeout: float):
+        start = time.perf_counter()
+        first_fragment = True
+        with span("llm_stream"):
+            response = await self._client.generate_content_async(
+                contents=prompt,
+                stream=True,
+                request_options={"timeout": timeout}
+            )
+            async for chunk in response:
+                text = getattr(chunk, "text", "")
+                if text:
+                    if first_fragment:
+                        STAGE_SECONDS.labels("llm_first_token").observe(time.perf_counter() - start)
+                        first_fragment = False
+                    yield text
+        record_llm_usage(response)
+
+    def generate_answer(self, context: str, question: str, history: str = "") -> str:
         """
-        Generates an answer using the Gemini 2.5 Flash LLM model.
+        Generates an answer using the Gemini 2.5 Flash LLM model, through
+        the LLM gateway (coalescing, rate limit, retries, circuit breaker).
+        `history` is the earlier conversation of a session, if any.
         """
         try:
-            formatted_prompt = get_document_answer_prompt(context, question, "", FALLBACK_MESSAGE)
-            response = self._client.generate_content(
-                contents=formatted_prompt
-            )
-            return response.text.strip()
+            formatted_prompt = get_document_answer_prompt(context, question, "", FALLBACK_MESSAGE, history)
+            return llm_gateway.call(formatted_prompt, self._generate)
+        except LLMServiceAPIException:
+            raise
+        except Exception as e:
+            raise LLMServiceAPIException(str(e))
+
+    async def generate_answer_async(self, context: str, question: str, history: str = "") -> str:
+        """
+        Async variant of `generate_answer` using Gemini's non-blocking client,
+        so the event loop keeps serving other requests while Gemini generates.
+        """
+        try:
+            formatted_prompt = get_document_answer_prompt(context, question, "", FALLBACK_MESSAGE, history)
+            return await llm_gateway.call_async(formatted_prompt, self._generate_async)
+        except LLMServiceAPIException:
+            raise
+        except Exception as e:
+            raise LLMServiceAPIException(str(e))
+
+    async def generate_answer_stream_async(self, context: str, question: str, history: str = ""):
+        """
+        Streams the answer from Gemini, yielding text fragments as they are produced.
+        """
+        try:
+            formatted_prompt = get_document_answer_prompt(context, question, "", FALLBACK_MESSAGE, history)
+            async for fragment in llm_gateway.stream_async(formatted_prompt, self._stream_async):
+                yield fragment
+        except LLMServiceAPIException:
+            raise
         except Exception as e:
             raise LLMServiceAPIException(str(e))
@@ -1,8 +1,9 @@
 import google.generativeai as genai
-from src.core.exceptions import LLMServiceUnexpectedException
+from src.core.exceptions import LLMServiceUnexpectedException, LLMUnavailableException
 from src.config.settings import settings
 from src.core.prompts import get_document_answer_prompt
 from src.core.constants import FALLBACK_MESSAGE
+from src.services.llm_gateway import llm_gateway
 
 class GeminiLLMService:
     _instance = None
@@ -15,12 +16,17 @@ class GeminiLLMService:
             cls._client = genai.GenerativeModel(settings.GEMINI_LLM_MODEL)
         return cls._instance
 
+    def _generate(self, prompt: str, timeout: float) -> str:
+        response = self._client.generate_content(contents=prompt, request_options={"timeout": timeout})
+        return response.text.strip()
+
     def generate_answer(self, context: str, question: str) -> str:
         try:
             formatted_prompt = get_document_answer_prompt(context, question, "", FALLBACK_MESSAGE)
-            response = self._client.generate_content(contents=formatted_prompt)
-            return response.text.strip()
+            return llm_gateway.call(formatted_prompt, self._generate)
+        except LLMUnavailableException:
+            raise
         except Exception as e:
             raise LLMServiceUnexpectedException(str(e))
 
-gemini_llm_service = GeminiLLMService()
\ No newline at end of file
+gemini_llm_service = GeminiLLMService()
@@ -1,94 +1,648 @@
-from src.schemas.responses import QueryNotFoundResponse, QuerySuccessResponse
+from src.schemas.responses import Citation, QueryNotFoundResponse, QuerySuccessResponse
 from src.utils.document_processing import DocumentProcessor
 from src.services.llm_service import LLMService
+from src.services.citations import citation_builder
+from src.services.sessions import session_store
+from src.services.tenants import Tenant, tenant_registry
+from src.services.context_builder import context_builder
+from src.services.reranker import reranker
+from src.core.concurrency import StageExecutor, foreground_gate
+from src.core.lifecycle import app_lifecycle
+from src.core.metrics import QUERIES, STAGE_ERRORS, record_usage, span, usage_scope
+from src.config.settings import settings
+from collections import deque
+import asyncio
+import functools
 import re
-
-llm_service = LLMService()
+import threading
+import time
 
 from src.core.constants import FALLBACK_MESSAGE
-from src.config.weaviate_db import weaviate_connection
+from src.core.exceptions import LLMUnavailableException
+from src.config.weaviate_db import get_weaviate_client
+
+# Bounded pool for the blocking stages of the async query path
+stage_executor = StageExecutor(
+	max_workers=settings.QUERY_EXECUTOR_WORKERS,
+	limits={
+		"embed": settings.EMBED_CONCURRENCY,
+		"vector_search": settings.VECTOR_SEARCH_CONCURRENCY,
+		"rerank": settings.RERANK_CONCURRENCY,
+		"llm": settings.LLM_CONCURRENCY,
+	},
+	# CPU-bound query stages; ingestion embedding yields to them
+	foreground=("embed", "rerank"),
+	gate=foreground_gate,
+)
+
+def _weaviate_client():
+	"""The shared Weaviate client; the in-process FAISS backend needs none."""
+	return get_weaviate_client() if settings.VECTOR_STORE_BACKEND == "weaviate" else None
+
+
+URL_PATTERN = r"https?://[\w\.-]+(?:/[\w\./\-\?=&%]*)?"
+
+SEARCH_MODES = ("vector", "hybrid")
+
+
+class RetrievalLatency:
+	"""Keeps the most recent retrieval latencies per search mode."""
+
+	def __init__(self, window: int = 1000):
+		self._samples = {mode: deque(maxlen=window) for mode in SEARCH_MODES}
+		self._counts = {mode: 0 for mode in SEARCH_MODES}
+		self._lock = threading.Lock()
+
+	def record(self, mode: str, seconds: float):
+		with self._lock:
+			self._samples[mode].append(seconds)
+			self._counts[mode] += 1
+
+	@staticmethod
+	def _percentile_ms(ordered, q: float):
+		if not ordered:
+			return None
+		return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+	def stats(self):
+		with self._lock:
+			result = {}
+			for mode, samples in self._samples.items():
+				ordered = sorted(samples)
+				result[mode] = {
+					"count": self._counts[mode],
+					"p50_ms": self._percentile_ms(ordered, 0.50),
+					"p95_ms": self._percentile_ms(ordered, 0.95),
+					"p99_ms": self._percentile_ms(ordered, 0.99),
+				}
+			return result
+
+
+retrieval_latency = RetrievalLatency()
+
+
+def _not_found_response(query: str) -> QueryNotFoundResponse:
+	return QueryNotFoundResponse(
+		statusCode=404,
+		success=False,
+		message="Information not found",
+		query=query,
+		answer=FALLBACK_MESSAGE,
+	)
+
+
+def _error_response(query: str, error: Exception) -> QueryNotFoundResponse:
+	STAGE_ERRORS.labels("query", type(error).__name__).inc()
+	if isinstance(error, LLMUnavailableException):
+		# Breaker open or quota exhausted: fail fast with the fallback answer (never cached)
+		return QueryNotFoundResponse(
+			statusCode=503,
+			success=False,
+			message=str(error),
+			query=query,
+			answer=FALLBACK_MESSAGE,
+		)
+	return QueryNotFoundResponse(
+		statusCode=500,
+		success=False,
+		message=str(error),
+		query=query,
+		answer="Error occurred while processing your query.",
+	)
+
+
+def _build_context(docs):
+	"""
+	Compresses the retrieved chunks into the token-budgeted LLM context;
+	the savings are counted in `context_builder.stats()`.
+	"""
+	with span("prompt_build"):
+		context, stats = context_builder.build(docs)
+	return context, stats
+
+
+def _with_context_stats(response, stats):
+	response.context_tokens = stats["tokens_after"]
+	response.context_tokens_saved = stats["tokens_saved"]
+	return response
+
+
+def _build_answer_response(query: str, final_answer: str, highest_url) -> QuerySuccessResponse:
+	"""Strips URLs out of the LLM answer and picks the `source_url`."""
+	found_urls = re.findall(URL_PATTERN, final_answer)
+	answer_without_urls = re.sub(URL_PATTERN, '', final_answer).strip()
+
+	response = QuerySuccessResponse(
+		statusCode=200,
+		success=True,
+		message="Answer retrieved successfully",
+		query=query,
+		answer=answer_without_urls,
+	)
+
+	if final_answer.strip() == FALLBACK_MESSAGE.strip():
+		response.source_url = None
+		return response
+
+	if found_urls:
+		response.source_url = found_urls[0]
+	else:
+		is_valid_url = (
+			highest_url and 
+			highest_url != "NA" and 
+			isinstance(highest_url, str) and 
+			(str(highest_url).startswith("http://") or str(highest_url).startswith("https://"))
+		)
+		if is_valid_url:
+			response.source_url = highest_url
+		else:
+			response.source_url = None
+	return response
+
 
-weaviate_client = weaviate_connection()
-weaviate_class = "DemoCollection"  # Placeholder: replace with actual class name
+def _cite(response, context_stats):
+	"""
+	Attaches page citations, attributing answer sentences to the context
+	chunks by embedding similarity (no LLM call). A failure only costs the
+	citations, never the answer.
+	"""
+	if not settings.CITATIONS_ENABLED or response.answer.strip() == FALLBACK_MESSAGE.strip():
+		return response
+	try:
+		with span("citations"):
+			citations = citation_builder.cite(response.answer, context_stats["docs_used"], DocumentProcessor(file_path=None))
+		response.citations = [Citation(**citation) for citation in citations]
+	except Exception as e:
+		STAGE_ERRORS.labels("citations", type(e).__name__).inc()
+		print(f"Could not attribute citations for '{response.query}': {e}")
+	return response
+
+
+def _search(doc_processor: DocumentProcessor, query: str, query_vector, top_k: int, search_mode: str, alpha, min_score: float, collection: str = None):
+	"""
+	Runs the vector or hybrid search in `collection` (the default tenant's if
+	omitted), records its latency by mode and drops chunks whose similarity
+	to the query is below `min_score`.
+	"""
+	if search_mode not in SEARCH_MODES:
+		raise ValueError(f"Unknown search_mode '{search_mode}', expected one of {SEARCH_MODES}.")
+	start = time.perf_counter()
+	with span("retrieval"):
+		result = _run_search(doc_processor, query, query_vector, top_k, search_mode, alpha, collection or tenant_registry.default.collection)
+	retrieval_latency.record(search_mode, time.perf_counter() - start)
+	return _apply_min_score(*result, min_score)
+
+
+def _run_search(doc_processor: DocumentProcessor, query: str, query_vector, top_k: int, search_mode: str, alpha, collection: str):
+	if search_mode == "hybrid":
+		return doc_processor.hybrid_search(
+			query,
+			query_vector,
+			weaviate_client=_weaviate_client(),
+			class_name=collection,
+			top_k=top_k,
+			alpha=settings.HYBRID_ALPHA if alpha is None else alpha,
+		)
+	return doc_processor.search_by_vector(
+		query_vector,
+		weaviate_client=_weaviate_client(),
+		class_name=collection,
+		top_k=top_k,
+	)
+
+
+def _apply_min_score(docs, highest_url, min_score: float):
+	"""Keeps only chunks scoring at least `min_score`; the best source follows the best kept chunk."""
+	kept = [doc for doc in docs if doc["metadata"].get("score", 0.0) >= min_score]
+	if len(kept) == len(docs):
+		return docs, highest_url
+	return kept, kept[0]["metadata"].get("filename") if kept else None
+
+
+def _rerank(query: str, docs, highest_url, top_k: int):
+	"""Keeps the `top_k` over-fetched candidates the cross-encoder ranks best."""
+	with span("rerank"):
+		docs = reranker.rerank(query, docs, top_k)
+	return docs, docs[0]["metadata"].get("filename") if docs else highest_url
+
+
+def _fetch_k(top_k: int, rerank: bool) -> int:
+	"""Number of candidates to retrieve: reranking over-fetches and keeps the best `top_k`."""
+	return max(settings.RERANK_CANDIDATES, top_k) if rerank else top_k
 
-def get_rag_response(query: str, top_k: int = 5, min_score: float = 0.8):
+
+def _from_cache(cached: QuerySuccessResponse, query: str) -> QuerySuccessResponse:
+	"""Returns a cached answer re-labelled with the query that was actually asked."""
+	return cached.model_copy(update={"query": query})
+
+
+def _record_query(endpoint: str, status_code: int):
+	QUERIES.labels(endpoint, str(status_code)).inc()
+	record_usage("queries")
+	if status_code == 200:
+		app_lifecycle.record_answer()
+
+
+def _timed_query(endpoint: str):
+	"""
+	Times one query as the `query_total` stage, then counts it.
+	The query is billed to its `tenant` (the default tenant if omitted), and
+	async queries wait for one of the tenant's query slots.
+	"""
+	def decorator(func):
+		if asyncio.iscoroutinefunction(func):
+			@functools.wraps(func)
+			async def wrapper(query, *args, tenant: Tenant = None, **kwargs):
+				tenant = tenant or tenant_registry.default
+				with usage_scope(tenant.id):
+					with span("query_total"):
+						async with tenant.query_slot():
+							response = await func(query, *args, tenant=tenant, **kwargs)
+					_record_query(endpoint, response.statusCode)
+				return response
+		else:
+			@functools.wraps(func)
+			def wrapper(query, *args, tenant: Tenant = None, **kwargs):
+				tenant = tenant or tenant_registry.default
+				with usage_scope(tenant.id):
+					with span("query_total"):
+						response = func(query, *args, tenant=tenant, **kwargs)
+					_record_query(endpoint, response.statusCode)
+				return response
+		return wrapper
+	return decorator
+
+
+@_timed_query("sync")
+def get_rag_response(query: str, top_k: int = 5, min_score: float = settings.DEFAULT_MIN_SCORE, search_mode: str = "vector", alpha: float = None, rerank: bool = None, tenant: Tenant = None):
 	"""
 	Orchestrates the RAG process to get a final answer from the LLM.
 
 	Returns a JSON-serializable dict. When a source URL is available it is
-	included under the `source_url` key.
+	included under the `source_url` key; `citations` lists the pages the
+	answer was generated from, with the answer sentences each one supports.
 	"""
 	try:
+		rerank = settings.RERANK_ENABLED if rerank is None else rerank
+		cache_params = (top_k, min_score, search_mode, alpha, rerank)
+		cached = tenant.answer_cache.get_exact(query, cache_params)
+		if cached is not None:
+			return _from_cache(cached, query)
+
 		# 1. Retrieve relevant document chunks and highest scored vector website
 		doc_processor = DocumentProcessor(file_path=None)  # file_path not needed for retrieval
-		docs, highest_url = doc_processor.retrieve_relevant_chunks(
-			query=query,
-			weaviate_client=weaviate_client,
-			class_name=weaviate_class,
-			top_k=top_k,
-		)
+		query_vector = doc_processor.embed_query(query)
+		cached = tenant.answer_cache.get_similar(query_vector, cache_params)
+		if cached is not None:
+			return _from_cache(cached, query)
 
-		# 2. Handle the case where no relevant information is found
-		if not docs:
-			return QueryNotFoundResponse(
-				statusCode=404,
-				success=False,
-				message="Information not found",
-				query=query,
-				answer=FALLBACK_MESSAGE,
-			)
+		docs, highest_url = _search(doc_processor, query, query_vector, _fetch_k(top_k, rerank), search_mode, alpha, min_score, tenant.collection)
+		if rerank:
+			docs, highest_url = _rerank(query, docs, highest_url, top_k)
 
-		# 3. Prepare the context for the LLM from retrieved documents
-		formatted_docs = []
-		for i, doc in enumerate(docs):
-			title = doc["metadata"].get("filename")
-			category = doc["metadata"].get("page_number")
-			score = doc["metadata"].get("score", 0)
+		# 2. Nothing cleared min_score: answer with the fallback without calling the LLM
+		if not docs:
+			return _not_found_response(query)
 
-			formatted_doc = f"DOCUMENT {i+1}:\nTitle: {title}\nCategory: {category}\nRelevance Score: {score:.2f}\nContent:\n{doc['chunk_text']}"
-			formatted_docs.append(formatted_doc)
-		context = "\n\n" + "\n\n---\n\n".join(formatted_docs)
+		# 3. Prepare the token-budgeted context for the LLM from retrieved documents
+		context, context_stats = _build_context(docs)
 
 		# 4. Generate the final answer using the LLM
-		final_answer = llm_service.generate_answer(context=context, question=query)
+		final_answer = LLMService().generate_answer(context=context, question=query)
 
-		# Extract URL from answer if present and remove from answer
-		url_pattern = r"https?://[\w\.-]+(?:/[\w\./\-\?=&%]*)?"
-		found_urls = re.findall(url_pattern, final_answer)
-		answer_without_urls = re.sub(url_pattern, '', final_answer).strip()
+		response = _with_context_stats(_build_answer_response(query, final_answer, highest_url), context_stats)
+		response = _cite(response, context_stats)
+		tenant.answer_cache.put(query, query_vector, response, cache_params)
+		return response
 
-		response = QuerySuccessResponse(
-			statusCode=200,
-			success=True,
-			message="Answer retrieved successfully",
-			query=query,
-			answer=answer_without_urls,
+	except Exception as e:
+		return _error_response(query, e)
+
+
+async def _lookup_or_retrieve_async(query: str, top_k: int, min_score: float, search_mode: str, alpha, rerank: bool, tenant: Tenant, previous=None):
+	"""
+	Checks the tenant's answer cache, embedding and searching its collection
+	off the event loop on a miss.
+	A follow-up close enough to the `previous` session turn reuses its chunks
+	instead of searching.
+
+	Returns (cached_response, query_vector, docs, highest_url); when the cache
+	hits only the first element is set.
+	"""
+	cache_params = (top_k, min_score, search_mode, alpha, rerank)
+	cached = tenant.answer_cache.get_exact(query, cache_params)
+	if cached is not None:
+		return _from_cache(cached, query), None, None, None
+
+	doc_processor = DocumentProcessor(file_path=None)
+	query_vector = await stage_executor.run("embed", doc_processor.embed_query, query)
+	cached = tenant.answer_cache.get_similar(query_vector, cache_params)
+	if cached is not None:
+		return _from_cache(cached, query), query_vector, None, None
+
+	reused = session_store.reuse_docs(previous, query_vector, cache_params, min_score)
+	if reused is not None:
+		return None, query_vector, reused, reused[0]["metadata"].get("filename")
+
+	docs, highest_url = await stage_executor.run(
+		"vector_search", _search, doc_processor, query, query_vector, _fetch_k(top_k, rerank), search_mode, alpha, min_score, tenant.collection
+	)
+	if rerank and docs:
+		docs, highest_url = await stage_executor.run("rerank", _rerank, query, docs, highest_url, top_k)
+	return None, query_vector, docs, highest_url
+
+
+def _cacheable(query: str, standalone: str, history: str) -> bool:
+	"""
+	Only answers to the standalone question itself are shared through the
+	answer cache: one shaped by a conversation must not reach other sessions.
+	"""
+	return not history and query == standalone
+
+
+def _session_turn(tenant: Tenant, session_id, query: str, standalone: str, response, query_vector=None, params=None, docs=None):
+	"""
+	Records an answered turn in its session and labels the response with the
+	question as asked. Returns a copy: the response may be in the answer cache.
+	"""
+	if not session_id:
+		return response
+	if response.statusCode in (200, 404):
+		session_store.record(tenant.session_key(session_id), query, standalone, response.answer, query_vector, params, docs)
+	return response.model_copy(update={
+		"query": query,
+		"session_id": session_id,
+		"standalone_query": standalone if standalone != query else None,
+	})
+
+
+@_timed_query("query")
+async def get_rag_response_async(query: str, top_k: int = 5, min_score: float = settings.DEFAULT_MIN_SCORE, search_mode: str = "vector", alpha: float = None, rerank: bool = None, session_id: str = None, tenant: Tenant = None):
+	"""
+	Non-blocking variant of `get_rag_response`.
+
+	The embedding and vector search stages run on the bounded stage executor,
+	and the answer is generated with the async Gemini client, so a single
+	worker can keep many questions in flight at once.
+
+	With a `session_id`, a follow-up is rewritten into a standalone query
+	for retrieval and caching, may reuse the previous turn's chunks, and is
+	answered with the recent conversation in the prompt.
+	"""
+	standalone = query
+	try:
+		# 1. Embed the query and search the vector database off the event loop
+		rerank = settings.RERANK_ENABLED if rerank is None else rerank
+		params = (top_k, min_score, search_mode, alpha, rerank)
+		previous = session_store.last_turn(tenant.session_key(session_id))
+		standalone = session_store.rewrite(query, previous)
+		cached, query_vector, docs, highest_url = await _lookup_or_retrieve_async(standalone, top_k, min_score, search_mode, alpha, rerank, tenant, previous)
+		if cached is not None:
+			return _session_turn(tenant, session_id, query, standalone, cached, query_vector, params)
+
+		# 2. Nothing cleared min_score: answer with the fallback without calling the LLM
+		if not docs:
+			return _session_turn(tenant, session_id, query, standalone, _not_found_response(standalone), query_vector, params)
+
+		# 3. Prepare the context and generate the answer without blocking
+		context, context_stats = _build_context(docs)
+		history = session_store.history(tenant.session_key(session_id))
+		async with stage_executor.limit("llm"):
+			final_answer = await LLMService().generate_answer_async(context=context, question=query, history=history)
+
+		response = _with_context_stats(_build_answer_response(standalone, final_answer, highest_url), context_stats)
+		response = await stage_executor.run("embed", _cite, response, context_stats)
+		if _cacheable(query, standalone, history):
+			tenant.answer_cache.put(standalone, query_vector, response, params)
+		return _session_turn(tenant, session_id, query, standalone, response, query_vector, params, docs)
+
+	except Exception as e:
+		return _session_turn(tenant, session_id, query, standalone, _error_response(query, e))
+
+
+async def stream_rag_response(query: str, top_k: int = 5, min_score: float = settings.DEFAULT_MIN_SCORE, search_mode: str = "vector", alpha: float = None, rerank: bool = None, session_id: str = None, tenant: Tenant = None):
+	"""
+	Streams the RAG answer as (event, data) pairs.
+
+	Emits a single `metadata` event with the retrieved sources, then one
+	`token` event per fragment generated by the LLM, and finally a `done`
+	event carrying the full response (URLs stripped, `source_url` and the
+	page `citations` set).
+	Cached answers are sent straight away as a `done` event. Sessions work
+	as for `get_rag_response_async`, and so do tenants: the stream holds one
+	of the tenant's query slots until it ends.
+	"""
+	tenant = tenant or tenant_registry.default
+	status_code = 500
+	with usage_scope(tenant.id):
+		with span("query_total"):
+			async with tenant.query_slot():
+				async for event, data in _stream_events(query, top_k, min_score, search_mode, alpha, rerank, session_id, tenant):
+					if event == "done":
+						status_code = data.get("statusCode", 200)
+					yield event, data
+		_record_query("stream", status_code)
+
+
+async def _stream_events(query: str, top_k: int, min_score: float, search_mode: str, alpha, rerank, session_id, tenant: Tenant):
+	standalone = query
+	try:
+		rerank = settings.RERANK_ENABLED if rerank is None else rerank
+		params = (top_k, min_score, search_mode, alpha, rerank)
+		previous = session_store.last_turn(tenant.session_key(session_id))
+		standalone = session_store.rewrite(query, previous)
+		cached, query_vector, docs, highest_url = await _lookup_or_retrieve_async(standalone, top_k, min_score, search_mode, alpha, rerank, tenant, previous)
+		if cached is not None:
+			yield "done", _session_turn(tenant, session_id, query, standalone, cached, query_vector, params).model_dump()
+			return
+
+		if not docs:
+			yield "done", _session_turn(tenant, session_id, query, standalone, _not_found_response(standalone), query_vector, params).model_dump()
+			return
+
+		yield "metadata", {
+			"query": query,
+			"standalone_query": standalone if standalone != query else None,
+			"sources": [doc["metadata"] for doc in docs],
+		}
+
+		context, context_stats = _build_context(docs)
+		fragments = []
+		history = session_store.history(tenant.session_key(session_id))
+		async with stage_executor.limit("llm"):
+			async for fragment in LLMService().generate_answer_stream_async(context=context, question=query, history=history):
+				fragments.append(fragment)
+				yield "token", {"text": fragment}
+
+		final_answer = "".join(fragments).strip()
+		response = _with_context_stats(_build_answer_response(standalone, final_answer, highest_url), context_stats)
+		response = await stage_executor.run("embed", _cite, response, context_stats)
+		if _cacheable(query, standalone, history):
+			tenant.answer_cache.put(standalone, query_vector, response, params)
+		yield "done", _session_turn(tenant, session_id, query, standalone, response, query_vector, params, docs).model_dump()
+
+	except Exception as e:
+		yield "done", _session_turn(tenant, session_id, query, standalone, _error_response(query, e)).model_dump()
+
+
+async def _search_batch(doc_processor: DocumentProcessor, queries, query_vectors, top_k: int, min_score: float, search_mode: str, alpha, collection: str):
+	"""
+	Retrieves the candidates of several queries. Plain vector searches on
+	the FAISS backend go through one multi-query index search; otherwise the
+	searches fan out concurrently on the bounded `vector_search` stage.
+	"""
+	if search_mode == "vector" and settings.VECTOR_STORE_BACKEND == "faiss":
+		start = time.perf_counter()
+		results = await stage_executor.run(
+			"vector_search", doc_processor.search_by_vectors, query_vectors,
+			weaviate_client=_weaviate_client(), class_name=collection, top_k=top_k,
 		)
+		elapsed = (time.perf_counter() - start) / max(len(queries), 1)
+		for _ in queries:
+			retrieval_latency.record(search_mode, elapsed)
+		return [_apply_min_score(docs, highest_url, min_score) for docs, highest_url in results]
+	return await asyncio.gather(*(
+		stage_executor.run("vector_search", _search, doc_processor, query, query_vector, top_k, search_mode, alpha, min_score, collection)
+		for query, query_vector in zip(queries, query_vectors)
+	))
 
-		if final_answer.strip() == FALLBACK_MESSAGE.strip():
-			response.source_url = None
-			return response
 
-		if found_urls:
-			response.source_url = found_urls[0]
+async def get_rag_responses_batch_async(queries, top_k: int = 5, min_score: float = settings.DEFAULT_MIN_SCORE, search_mode: str = "vector", alpha: float = None, rerank: bool = None, tenant: Tenant = None):
+	"""
+	Answers many queries at once for `tenant` (the default tenant if
+	omitted), billing them to it. See `_answer_batch`.
+	"""
+	tenant = tenant or tenant_registry.default
+	with usage_scope(tenant.id):
+		record_usage("queries", len(queries))
+		return await _answer_batch(queries, top_k, min_score, search_mode, alpha, rerank, tenant)
+
+
+async def _answer_batch(queries, top_k: int, min_score: float, search_mode: str, alpha, rerank, tenant: Tenant):
+	"""
+	Answers many queries at once.
+
+	Cache misses are embedded in one batched model call, their searches run
+	concurrently, and the LLM calls are dispatched at most
+	`BATCH_LLM_CONCURRENCY` at a time, each holding one of the tenant's
+	query slots; the LLM gateway keeps them within the Gemini quota and
+	retries throttled calls.
+
+	Returns (responses, timings): one response per query, in order, and the
+	wall-clock milliseconds spent in every stage.
+	"""
+	rerank = settings.RERANK_ENABLED if rerank is None else rerank
+	cache_params = (top_k, min_score, search_mode, alpha, rerank)
+	timings = {}
+	counters = {"cache_hits": 0, "not_found": 0, "errors": 0, "llm_calls": 0}
+	started = time.perf_counter()
+	responses = [None] * len(queries)
+
+	def _stage_done(name: str, stage_start: float):
+		timings[f"{name}_ms"] = round((time.perf_counter() - stage_start) * 1000, 3)
+
+	# 1. Exact cache hits; repeated queries within the batch are answered once
+	pending = []
+	first_seen = {}
+	repeats = {}
+	for i, query in enumerate(queries):
+		cached = tenant.answer_cache.get_exact(query, cache_params)
+		if cached is not None:
+			responses[i] = _from_cache(cached, query)
+			counters["cache_hits"] += 1
+			continue
+		key = tenant.answer_cache.normalize(query)
+		if key in first_seen:
+			repeats[i] = first_seen[key]
 		else:
-			is_valid_url = (
-				highest_url and 
-				highest_url != "NA" and 
-				isinstance(highest_url, str) and 
-				(str(highest_url).startswith("http://") or str(highest_url).startswith("https://"))
+			first_seen[key] = i
+			pending.append(i)
+
+	# 2. One batched embedding call for the misses, then semantic cache hits
+	doc_processor = DocumentProcessor(file_path=None)
+	stage_start = time.perf_counter()
+	query_vectors = {}
+	if pending:
+		try:
+			vectors = await stage_executor.run("embed", doc_processor.embed_queries, [queries[i] for i in pending])
+		except Exception as e:
+			for i in pending:
+				responses[i] = _error_response(queries[i], e)
+			counters["errors"] += len(pending)
+			pending = []
+		else:
+			query_vectors = dict(zip(pending, vectors))
+	_stage_done("embed", stage_start)
+	remaining = []
+	for i in pending:
+		cached = tenant.answer_cache.get_similar(query_vectors[i], cache_params)
+		if cached is not None:
+			responses[i] = _from_cache(cached, queries[i])
+			counters["cache_hits"] += 1
+		else:
+			remaining.append(i)
+	pending = remaining
+
+	# 3. Concurrent retrieval (and optional rerank)
+	stage_start = time.perf_counter()
+	retrieved = {}
+	if pending:
+		try:
+			results = await _search_batch(
+				doc_processor, [queries[i] for i in pending], [query_vectors[i] for i in pending],
+				_fetch_k(top_k, rerank), min_score, search_mode, alpha, tenant.collection,
 			)
-			if is_valid_url:
-				response.source_url = highest_url
-			else:
-				response.source_url = None
+		except Exception as e:
+			for i in pending:
+				responses[i] = _error_response(queries[i], e)
+			counters["errors"] += len(pending)
+			results = []
+		retrieved = dict(zip(pending, results))
+	_stage_done("search", stage_start)
+
+	if rerank:
+		stage_start = time.perf_counter()
+		reranked = await asyncio.gather(*(
+			stage_executor.run("rerank", _rerank, queries[i], docs, highest_url, top_k)
+			for i, (docs, highest_url) in retrieved.items() if docs
+		))
+		retrieved.update(zip([i for i, (docs, _) in retrieved.items() if docs], reranked))
+		_stage_done("rerank", stage_start)
+
+	# 4. Bounded answer generation; the LLM gateway paces and retries the calls
+	batch_limit = asyncio.Semaphore(settings.BATCH_LLM_CONCURRENCY)
+
+	async def _answer(i: int, docs, highest_url):
+		query = queries[i]
+		if not docs:
+			counters["not_found"] += 1
+			return _not_found_response(query)
+		context, context_stats = _build_context(docs)
+		async with batch_limit, tenant.query_slot():
+			counters["llm_calls"] += 1
+			async with stage_executor.limit("llm"):
+				final_answer = await LLMService().generate_answer_async(context=context, question=query)
+		response = _with_context_stats(_build_answer_response(query, final_answer, highest_url), context_stats)
+		response = await stage_executor.run("embed", _cite, response, context_stats)
+		tenant.answer_cache.put(query, query_vectors[i], response, cache_params)
 		return response
 
-	except Exception as e:
-		return QueryNotFoundResponse(
-			statusCode=500,
-			success=False,
-			message=str(e),
-			query=query,
-			answer="Error occurred while processing your query.",
-		)
+	stage_start = time.perf_counter()
+	answers = await asyncio.gather(
+		*(_answer(i, docs, highest_url) for i, (docs, highest_url) in retrieved.items()),
+		return_exceptions=True,
+	)
+	for i, answer in zip(retrieved, answers):
+		if isinstance(answer, Exception):
+			counters["errors"] += 1
+			answer = _error_response(queries[i], answer)
+		responses[i] = answer
+	_stage_done("llm", stage_start)
+	for i, first in repeats.items():
+		responses[i] = _from_cache(responses[first], queries[i])
+	counters["repeated_queries"] = len(repeats)
+
+	timings["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+	for response in responses:
+		QUERIES.labels("batch", str(response.statusCode)).inc()
+	return responses, {**timings, **counters}
@@ -0,0 +1,169 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.config.settings import settings
+from src.core.metrics import record_cache_lookup, span
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores retrieved chunks with a small cross-encoder on the CPU.
+
+    All uncached (query, chunk) pairs of a request go through the model in a
+    single batched forward pass and the scores are kept in an LRU cache. The
+    model is loaded in a background thread on first use; until it is ready,
+    or when the estimated cost of the pass exceeds the latency budget, the
+    candidates that cannot be scored keep their retrieval order.
+    """
+
+    def __init__(self, model_name: str, budget_ms: float, cache_size: int):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.cache_size = cache_size
+        self._model = None
+        self._loading = False
+        self._scores: "OrderedDict[tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        # Moving average of the per-pair inference cost, used to plan within the budget
+        self._ms_per_pair: Optional[float] = None
+        self.requests = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.unscored = 0
+
+    def _load(self):
+        try:
+            from sentence_transformers import CrossEncoder
+
+            model = CrossEncoder(self.model_name, device="cpu")
+            with self._model_lock:
+                self._model = model
+        except Exception as e:
+            print(f"Could not load the reranker model {self.model_name}: {e}")
+        finally:
+            with self._model_lock:
+                self._loading = False
+
+    def warmup(self, wait: bool = False):
+        """Starts loading the model unless it is loaded or loading already."""
+        with self._model_lock:
+            start = self._model is None and not self._loading
+            if start:
+                self._loading = True
+        if start:
+            if wait:
+                self._load()
+                if self._model is None:
+                    raise RuntimeError(f"Could not load the reranker model {self.model_name}")
+            else:
+                threading.Thread(target=self._load, name="reranker-load", daemon=True).start()
+
+    @property
+    def ready(self) -> bool:
+        return self._model is not None
+
+    @staticmethod
+    def _key(query: str, chunk_text: str) -> tuple:
+        return (
+            " ".join(query.lower().split()),
+            hashlib.sha256(chunk_text.encode("utf-8")).hexdigest(),
+        )
+
+    def _cached_scores(self, keys: List[tuple]) -> List[Optional[float]]:
+        with self._lock:
+            scores = []
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                scores.append(score)
+            return scores
+
+    def _store_scores(self, items: Dict[tuple, float]):
+        with self._lock:
+            for key, score in items.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def rerank(self, query: str, docs: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Returns the `top_k` best docs for `query`.
+
+        Scored docs get a `rerank_score` in their metadata and are ordered by
+        it; docs left unscored (model not ready, over budget) follow them in
+        their original order.
+        """
+        if not docs:
+            return docs
+        self.warmup()
+        keys = [self._key(query, doc["chunk_text"]) for doc in docs]
+        scores = self._cached_scores(keys)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        cache_hits = len(docs) - len(missing)
+
+        if missing and self.ready:
+            # Candidates arrive best first, so a tight budget drops the tail. At least
+            # one pair is scored, so one slow pass (e.g. a cold first predict) cannot
+            # leave the estimate, and reranking, stuck at zero pairs
+            if self._ms_per_pair:
+                affordable = int(self.budget_ms / self._ms_per_pair)
+                missing = missing[:max(affordable, 1)]
+            if missing:
+                start = time.perf_counter()
+                with span("rerank_model"):
+                    predicted = self._model.predict(
+                        [(query, docs[i]["chunk_text"]) for i in missing],
+                        batch_size=len(missing),
+                        show_progress_bar=False,
+                    )
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                per_pair = elapsed_ms / len(missing)
+                self._ms_per_pair = per_pair if self._ms_per_pair is None else 0.8 * self._ms_per_pair + 0.2 * per_pair
+                for i, score in zip(missing, predicted):
+                    scores[i] = float(score)
+                self._store_scores({keys[i]: scores[i] for i in missing})
+
+        scored = [i for i, score in enumerate(scores) if score is not None]
+        unscored = [i for i, score in enumerate(scores) if score is None]
+        with self._lock:
+            self.requests += 1
+            self.cache_hits += cache_hits
+            self.pairs_scored += len(scored) - cache_hits
+            self.unscored += len(unscored)
+        record_cache_lookup("rerank", hits=cache_hits, misses=len(docs) - cache_hits)
+
+        order = sorted(scored, key=lambda i: scores[i], reverse=True) + unscored
+        reranked = []
+        for i in order[:top_k]:
+            doc = dict(docs[i])
+            if scores[i] is not None:
+                doc["metadata"] = {**doc["metadata"], "rerank_score": scores[i]}
+            reranked.append(doc)
+        return reranked
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "ready": self.ready,
+                "budget_ms": self.budget_ms,
+                "ms_per_pair": round(self._ms_per_pair, 3) if self._ms_per_pair else None,
+                "requests": self.requests,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "cache_entries": len(self._scores),
+                "unscored": self.unscored,
+            }
+
+
+reranker = CrossEncoderReranker(
+    model_name=settings.RERANK_MODEL,
+    budget_ms=settings.RERANK_BUDGET_MS,
+    cache_size=settings.RERANK_CACHE_SIZE,
+)
@@ -0,0 +1,249 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from src.config.settings import settings
+from src.core.metrics import SESSION_EVENTS
+from src.services.context_builder import estimate_tokens
+
+_WORD = re.compile(r"[\w'-]+")
+# Openings that only make sense as a continuation of the previous question
+_FOLLOW_UP_START = re.compile(r"^\s*(and|also|but|so|then|what about|how about|what else|same)\b", re.IGNORECASE)
+# Pronouns that, opening a question, point back at something named in an earlier turn
+_REFERENCES = {"it", "it's", "its", "that", "that's", "they", "them", "their", "he", "she", "him", "her"}
+_STOPWORDS = _REFERENCES | {
+    "this", "these", "those", "one", "ones", "above", "same", "former", "latter",
+    "a", "an", "the", "and", "or", "but", "so", "then", "also", "of", "for", "to", "in", "on", "at", "by",
+    "with", "from", "about", "as", "is", "are", "was", "were", "be", "been", "do", "does", "did", "can",
+    "could", "should", "would", "will", "shall", "may", "might", "must", "i", "me", "my", "we", "our",
+    "you", "your", "what", "which", "who", "whom", "whose", "when", "where", "why", "how", "if", "any",
+    "some", "all", "more", "else", "please", "tell", "much", "many", "there", "here", "get", "have", "has",
+}
+
+
+def _unit(vector) -> Optional[np.ndarray]:
+    if vector is None:
+        return None
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Turn:
+    __slots__ = ("query", "standalone", "answer", "vector", "params", "docs")
+
+    def __init__(self, query: str, standalone: str, answer: str, vector, params: Hashable, docs):
+        self.query = query
+        self.standalone = standalone
+        self.answer = answer
+        self.vector = vector
+        self.params = params
+        self.docs = docs
+
+
+class _Session:
+    __slots__ = ("turns", "expires_at")
+
+    def __init__(self, max_turns: int, expires_at: float):
+        self.turns: "deque[_Turn]" = deque(maxlen=max_turns)
+        self.expires_at = expires_at
+
+
+class SessionStore:
+    """
+    LRU + TTL store of conversation sessions, keyed by client-chosen ids.
+
+    Follow-up questions ("what about the fees for that?") are rewritten into
+    standalone retrieval queries locally, by appending the key terms of the
+    previous standalone query; no LLM call is made. When the rewritten query
+    embeds close to the previous turn's query (same retrieval params), that
+    turn's chunks are re-scored against the new query and reused instead of
+    searching again. Only the last turn keeps its chunks, and the history
+    sent to the LLM is capped at `history_turns` turns and `history_tokens`
+    tokens, so memory and prompt size stay bounded however long a
+    conversation runs.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        ttl_seconds: float,
+        max_turns: int,
+        history_turns: int,
+        history_tokens: int,
+        reuse_similarity: float,
+        topic_terms: int,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.history_turns = history_turns
+        self.history_tokens = history_tokens
+        self.reuse_similarity = reuse_similarity
+        self.topic_terms = topic_terms
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.rewrites = 0
+        self.reuses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _count(self, event: str):
+        SESSION_EVENTS.labels(event).inc()
+
+    def _live(self, session_id: str, now: float) -> Optional[_Session]:
+        session = self._sessions.get(session_id)
+        if session is not None and session.expires_at <= now:
+            del self._sessions[session_id]
+            self.expirations += 1
+            self._count("expired")
+            return None
+        return session
+
+    def last_turn(self, session_id: Optional[str]) -> Optional[_Turn]:
+        if not session_id:
+            return None
+        with self._lock:
+            session = self._live(session_id, time.monotonic())
+            return session.turns[-1] if session is not None and session.turns else None
+
+    def history(self, session_id: Optional[str]) -> str:
+        """The most recent turns that fit the history budget, oldest first."""
+        if not session_id:
+            return ""
+        with self._lock:
+            session = self._live(session_id, time.monotonic())
+            turns = list(session.turns)[-self.history_turns:] if session is not None and self.history_turns else []
+        lines: List[str] = []
+        used = 0
+        for turn in reversed(turns):
+            entry = f"User: {turn.query}\nAssistant: {turn.answer}"
+            cost = estimate_tokens(entry)
+            if used + cost > self.history_tokens:
+                # Keep the start of the turn that only partly fits, then stop
+                limit = (self.history_tokens - used) * settings.CONTEXT_CHARS_PER_TOKEN - len(" ...")
+                if limit >= 80:
+                    lines.append(entry[:limit].rsplit(" ", 1)[0] + " ...")
+                break
+            lines.append(entry)
+            used += cost
+        return "\n".join(reversed(lines))
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS and not word.isdigit()]
+
+    def is_follow_up(self, query: str) -> bool:
+        """
+        A continuation opening ("and for ...?"), a pronoun opening ("it is
+        due when?") or no more than one content word of its own ("what does
+        it cost?"). Pronouns further in are too often generic ("is there a
+        late fee?") to count.
+        """
+        words = _WORD.findall(query.lower())
+        return (
+            bool(_FOLLOW_UP_START.match(query))
+            or bool(words) and words[0] in _REFERENCES
+            or len(self._terms(query)) <= 1
+        )
+
+    def rewrite(self, query: str, previous: Optional[_Turn]) -> str:
+        """Turns a follow-up of `previous` into a standalone retrieval query; other queries are kept."""
+        if previous is None or not self.is_follow_up(query):
+            return query
+        present = set(self._terms(query))
+        topic: List[str] = []
+        for term in self._terms(previous.standalone):
+            if term not in present and term not in topic:
+                topic.append(term)
+        if not topic:
+            return query
+        with self._lock:
+            self.rewrites += 1
+        self._count("rewritten")
+        return f"{query.strip()} {' '.join(topic[:self.topic_terms])}"
+
+    def reuse_docs(self, previous: Optional[_Turn], query_vector, params: Hashable, min_score: float):
+        """
+        The previous turn's chunks re-scored for `query_vector`, best first,
+        or None when the queries are not similar enough (or the params
+        differ) and a new search is needed.
+        """
+        if previous is None or not previous.docs or previous.vector is None or previous.params != params:
+            return None
+        vector = _unit(query_vector)
+        if float(previous.vector @ vector) < self.reuse_similarity:
+            return None
+        docs = []
+        for doc in previous.docs:
+            if doc.get("vector") is None:
+                return None
+            score = float(_unit(doc["vector"]) @ vector)
+            if score >= min_score:
+                docs.append({**doc, "metadata": {**doc["metadata"], "score": score}})
+        if not docs:
+            return None
+        docs.sort(key=lambda doc: doc["metadata"]["score"], reverse=True)
+        with self._lock:
+            self.reuses += 1
+        self._count("chunks_reused")
+        return docs
+
+    def record(self, session_id: str, query: str, standalone: str, answer: str, query_vector, params: Hashable, docs=None):
+        """Appends a turn; only the newest turn keeps its chunks for reuse."""
+        if docs:
+            # float32 arrays instead of lists of Python floats: a quarter of the memory
+            docs = [
+                {**doc, "vector": np.asarray(doc["vector"], dtype=np.float32) if doc.get("vector") is not None else None}
+                for doc in docs
+            ]
+        turn = _Turn(query, standalone, answer, _unit(query_vector), params, docs or None)
+        now = time.monotonic()
+        with self._lock:
+            session = self._live(session_id, now)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self.max_turns, now)
+            if session.turns:
+                session.turns[-1].docs = None
+            session.turns.append(turn)
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(session_id)
+            self.turns += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+                self._count("evicted")
+        self._count("turns")
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "turns": self.turns,
+                "rewritten_queries": self.rewrites,
+                "chunks_reused": self.reuses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+session_store = SessionStore(
+    max_sessions=settings.SESSION_MAX_ENTRIES,
+    ttl_seconds=settings.SESSION_TTL_SECONDS,
+    max_turns=settings.SESSION_MAX_TURNS,
+    history_turns=settings.SESSION_HISTORY_TURNS,
+    history_tokens=settings.SESSION_HISTORY_TOKENS,
+    reuse_similarity=settings.SESSION_REUSE_SIMILARITY,
+    topic_terms=settings.SESSION_TOPIC_TERMS,
+)
@@ -0,0 +1,102 @@
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional
+
+from src.config.settings import settings
+from src.core.constants import DEFAULT_TENANT
+from src.core.exceptions import UnknownTenantException
+from src.core.metrics import STAGE_SECONDS, usage_snapshot
+from src.services.answer_cache import SemanticAnswerCache, answer_cache
+
+_TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,47}$")
+
+
+class Tenant:
+    """
+    A document set hosted on this deployment.
+
+    Each tenant has its own collection (so its own vectors, FAISS index and
+    manifest entries), answer cache partition and session namespace, a cap
+    on its in-flight queries and its own usage counters.
+    """
+
+    def __init__(self, tenant_id: str, collection: str, cache: SemanticAnswerCache, query_concurrency: int):
+        self.id = tenant_id
+        self.collection = collection
+        self.answer_cache = cache
+        self.query_concurrency = query_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def query_slot(self):
+        """Holds one of the tenant's query slots: a tenant flooding the API queues behind its own requests."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.query_concurrency)
+        queued_at = time.perf_counter()
+        async with self._semaphore:
+            STAGE_SECONDS.labels("tenant_queue_wait").observe(time.perf_counter() - queued_at)
+            yield
+
+    def session_key(self, session_id: Optional[str]) -> Optional[str]:
+        """Session ids are chosen by clients, so they are namespaced by tenant."""
+        return f"{self.id}:{session_id}" if session_id else None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "tenant": self.id,
+            "collection": self.collection,
+            "usage": usage_snapshot(self.id),
+            "answer_cache": self.answer_cache.stats(),
+        }
+
+
+class TenantRegistry:
+    """
+    The tenants of this deployment: the default tenant, which keeps the
+    `WEAVIATE_CLASS_NAME` collection and the shared answer cache, plus one
+    per id in TENANTS, stored in the collection `<WEAVIATE_CLASS_NAME>_<id>`.
+    """
+
+    def __init__(self, tenant_ids: Iterable[str], default_collection: str, query_concurrency: int):
+        self.default = Tenant(DEFAULT_TENANT, default_collection, answer_cache, query_concurrency)
+        self._tenants: Dict[str, Tenant] = {DEFAULT_TENANT: self.default}
+        collections = {default_collection: DEFAULT_TENANT}
+        for tenant_id in tenant_ids:
+            if not _TENANT_ID.match(tenant_id):
+                raise ValueError(f"Invalid tenant id {tenant_id!r}: use lowercase letters, digits, '-' and '_'")
+            if tenant_id in self._tenants:
+                continue
+            # Weaviate class names allow letters, digits and underscores only
+            collection = f"{default_collection}_{tenant_id.replace('-', '_')}"
+            if collection in collections:
+                raise ValueError(f"Tenants {collections[collection]!r} and {tenant_id!r} map to the same collection")
+            collections[collection] = tenant_id
+            self._tenants[tenant_id] = Tenant(
+                tenant_id,
+                collection,
+                SemanticAnswerCache(
+                    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+                    similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                ),
+                query_concurrency,
+            )
+
+    def get(self, tenant_id: Optional[str] = None) -> Tenant:
+        """The tenant named `tenant_id`, or the default tenant when it is empty."""
+        tenant = self._tenants.get(tenant_id or DEFAULT_TENANT)
+        if tenant is None:
+            raise UnknownTenantException(f"Tenant {tenant_id} not found.")
+        return tenant
+
+    def all(self) -> List[Tenant]:
+        return list(self._tenants.values())
+
+
+tenant_registry = TenantRegistry(
+    settings.TENANTS,
+    default_collection=settings.WEAVIATE_CLASS_NAME,
+    query_concurrency=settings.TENANT_QUERY_CONCURRENCY,
+)
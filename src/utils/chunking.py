@@ -0,0 +1,120 @@
+from bisect import bisect_right
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.config.settings import settings
+
+
+class Chunk:
+    """
+    A chunk as offsets into the text of the pages it was cut from.
+
+    Chunks of the same pages share one `source` string, so splitting copies
+    no text and a window of chunks pickles the text only once.
+    """
+
+    __slots__ = ("source", "start", "end", "filename", "page_number", "uuid")
+
+    def __init__(self, source: str, start: int, end: int, filename: str, page_number: int):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.filename = filename
+        self.page_number = page_number
+        self.uuid: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uuid": self.uuid,
+            "chunk_text": self.text,
+            "metadata": {"filename": self.filename, "page_number": self.page_number},
+        }
+
+
+class Chunker:
+    """
+    Splits pages into overlapping chunks of about `chunk_tokens` tokens.
+
+    Consecutive pages of a file are joined and split as one text, so a page
+    ending mid-paragraph continues into the next page instead of leaving a
+    short fragment; a chunk is attributed to the page it starts on. Cuts
+    prefer paragraph breaks (page breaks count as one), then line breaks,
+    then spaces, like LangChain's recursive splitter, but work on offsets
+    with `str.rfind` instead of building intermediate strings and
+    `Document`s. Token counts are estimated from characters, as for the LLM
+    context.
+    """
+
+    SEPARATORS = ("\n\n", "\n", " ")
+    PAGE_SEPARATOR = "\n\n"
+
+    def __init__(self, chunk_tokens: int, overlap_tokens: int, chars_per_token: int):
+        self.chunk_size = max(chunk_tokens * chars_per_token, 1)
+        self.overlap = min(overlap_tokens * chars_per_token, self.chunk_size // 2)
+        # Never cut before a chunk is a quarter full, or a stray break leaves tiny chunks
+        self.min_cut = self.chunk_size // 4
+
+    def _spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        n = len(text)
+        pos = 0
+        while pos < n and text[pos].isspace():
+            pos += 1
+        while pos < n:
+            limit = pos + self.chunk_size
+            if limit >= n:
+                cut = n
+            else:
+                cut = limit
+                for separator in self.SEPARATORS:
+                    i = text.rfind(separator, pos + self.min_cut, limit)
+                    if i != -1:
+                        cut = i
+                        break
+            end = cut
+            while end > pos and text[end - 1].isspace():
+                end -= 1
+            yield pos, end
+            if cut >= n:
+                return
+
+            # Start the next chunk `overlap` characters back, at a word boundary
+            start = max(cut - self.overlap, pos + 1)
+            if start < cut and not text[start - 1].isspace():
+                space = text.find(" ", start, cut)
+                start = space + 1 if space != -1 else cut
+            while start < n and text[start].isspace():
+                start += 1
+            pos = start
+
+    def split_pages(self, pages: Iterable[Dict[str, Any]]) -> List[Chunk]:
+        """Splits pages ({"page_content", "page_number", "filename"}); empty pages yield nothing."""
+        chunks: List[Chunk] = []
+        for filename, file_pages in groupby(pages, key=lambda page: page.get("filename")):
+            texts, starts, page_numbers = [], [], []
+            offset = 0
+            for page in file_pages:
+                text = (page.get("page_content") or "").strip()
+                if not text:
+                    continue
+                texts.append(text)
+                starts.append(offset)
+                page_numbers.append(page["page_number"])
+                offset += len(text) + len(self.PAGE_SEPARATOR)
+            if not texts:
+                continue
+            source = self.PAGE_SEPARATOR.join(texts)
+            for start, end in self._spans(source):
+                page_number = page_numbers[bisect_right(starts, start) - 1]
+                chunks.append(Chunk(source, start, end, filename, page_number))
+        return chunks
+
+
+chunker = Chunker(
+    chunk_tokens=settings.CHUNK_SIZE_TOKENS,
+    overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+    chars_per_token=settings.CHUNK_CHARS_PER_TOKEN,
+)
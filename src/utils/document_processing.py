@@ -1,141 +1,305 @@
+import hashlib
+import math
+import re
+import threading
 from typing import Optional
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Collection, Iterable, Iterator
 import fitz  # PyMuPDF
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from sentence_transformers import SentenceTransformer
-from weaviate.classes.config import Configure, Property, DataType
+import numpy as np
+from weaviate.util import generate_uuid5
+from src.config.settings import settings
+from src.db.vector_store import get_vector_store
+from src.utils.chunking import Chunk, chunker
+from src.utils.embedding_backends import DynamicBatcher, load_embedding_model, model_id
+from src.utils.embedding_cache import EmbeddingCache
+from src.core.metrics import span
 from src.core.exceptions import (
     NoContentToSplitException,
     RuntimeError,
-    EmbeddingModelException,
-    WeaviateUpsertException,
-    WeaviateQueryException
+    EmbeddingModelException
 )
 
 class DocumentProcessor:
+    MODEL_NAME = settings.EMBEDDING_MODEL
     _embedding_model = None  # Class-level cache
+    _embedding_model_lock = threading.Lock()
+    _embedding_cache = None
 
     def __init__(self, file_path: Optional[str] = None):
-        if DocumentProcessor._embedding_model is None:
-            DocumentProcessor._embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-        self.embedding_model = DocumentProcessor._embedding_model
         self.file_path = file_path
 
-    def load_documents(self):
-        """Loads a PDF document """
+    @property
+    def embedding_model(self):
+        # Loaded (and torch or onnxruntime imported) on first use, so importing this
+        # module stays cheap and parse-only workers never pay for the model
+        if DocumentProcessor._embedding_model is None:
+            with DocumentProcessor._embedding_model_lock:
+                if DocumentProcessor._embedding_model is None:
+                    model = load_embedding_model(
+                        self.MODEL_NAME,
+                        settings.EMBEDDING_BACKEND,
+                        threads=settings.EMBEDDING_THREADS,
+                        onnx_file=settings.EMBEDDING_ONNX_FILE,
+                    )
+                    if settings.EMBEDDING_DYNAMIC_BATCHING:
+                        model = DynamicBatcher(
+                            model, settings.EMBEDDING_DYNAMIC_BATCH_SIZE, settings.EMBEDDING_BATCH_WAIT_MS
+                        )
+                    DocumentProcessor._embedding_model = model
+        return DocumentProcessor._embedding_model
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return None
+        if DocumentProcessor._embedding_cache is None:
+            # Loads the model first: its lock is not reentrant
+            dim = self.embedding_model.get_sentence_embedding_dimension()
+            # Ingestion and query threads may get here together; a second instance
+            # would reopen a new memmap with "w+" and truncate the first one's vectors
+            with DocumentProcessor._embedding_model_lock:
+                if DocumentProcessor._embedding_cache is None:
+                    DocumentProcessor._embedding_cache = EmbeddingCache(
+                        directory=settings.EMBEDDING_CACHE_DIR,
+                        # Backends agree only within a tolerance, so each keeps its own vectors
+                        model_name=model_id(self.MODEL_NAME, settings.EMBEDDING_BACKEND),
+                        dim=dim,
+                        capacity=settings.EMBEDDING_CACHE_CAPACITY,
+                    )
+        return DocumentProcessor._embedding_cache
+
+    def _encode(self, texts: List[str], normalize: bool, batch_size: int = 32, show_progress_bar: bool = False) -> List[List[float]]:
+        """Encodes texts, only running the model for texts missing from the embedding cache."""
+        cache = self.embedding_cache
+        with span("embedding_cache_get"):
+            cached = cache.get_many(texts, normalize) if cache is not None else [None] * len(texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            with span("embed_model"):
+                encoded = self.embedding_model.encode(
+                    [texts[i] for i in missing],
+                    normalize_embeddings=normalize,
+                    show_progress_bar=show_progress_bar,
+                    batch_size=batch_size
+                )
+            if cache is not None:
+                with span("embedding_cache_put"):
+                    cache.put_many([texts[i] for i in missing], encoded, normalize)
+            for i, vector in zip(missing, encoded):
+                cached[i] = vector
+        return [vector.tolist() if hasattr(vector, "tolist") else list(vector) for vector in cached]
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def chunk_uuid(filename: str, page_number: int, chunk_text: str) -> str:
+        """Deterministic Weaviate UUID of a chunk: same file, page and content give the same id."""
+        return generate_uuid5(f"{filename}:{page_number}:{DocumentProcessor.content_hash(chunk_text)}")
+
+    def count_pages(self) -> int:
+        """Returns the page count of the PDF without extracting any text."""
+        try:
+            with fitz.open(self.file_path) as doc:
+                return doc.page_count
+        except Exception as e:
+            raise RuntimeError(f"Failed to load PDF: {e}")
+
+    @staticmethod
+    def _margin_key(text: str) -> str:
+        # Page numbers and dates change from page to page, the rest of a header does not
+        return re.sub(r"\d+", "#", " ".join(text.split()).lower())
+
+    @staticmethod
+    def _text_blocks(page) -> List[tuple]:
+        """Text blocks of a page in reading order: (x0, y0, x1, y1, text, block_no, block_type)."""
+        return [block for block in page.get_text("blocks", sort=True) if block[6] == 0 and block[4].strip()]
+
+    @staticmethod
+    def _in_margin(block: tuple, page_height: float) -> bool:
+        margin = page_height * settings.PDF_MARGIN_RATIO
+        return block[3] <= margin or block[1] >= page_height - margin
+
+    def find_boilerplate(self, sample_pages: Optional[int] = None) -> frozenset:
+        """
+        Finds header/footer lines: text blocks in the top or bottom margin
+        that repeat on at least PDF_BOILERPLATE_MIN_RATIO of up to
+        `sample_pages` evenly spaced pages. Returns their normalized keys.
+        """
+        sample_pages = sample_pages or settings.PDF_BOILERPLATE_SAMPLE_PAGES
+        try:
+            with fitz.open(self.file_path) as doc:
+                if doc.page_count < 3:
+                    return frozenset()
+                step = max(doc.page_count / sample_pages, 1)
+                sampled = sorted({int(i * step) for i in range(min(sample_pages, doc.page_count))})
+                counts: Dict[str, int] = {}
+                for i in sampled:
+                    page = doc.load_page(i)
+                    keys = {
+                        self._margin_key(block[4])
+                        for block in self._text_blocks(page)
+                        if self._in_margin(block, page.rect.height)
+                    }
+                    for key in keys:
+                        counts[key] = counts.get(key, 0) + 1
+        except Exception as e:
+            raise RuntimeError(f"Failed to load PDF: {e}")
+        min_pages = max(2, math.ceil(settings.PDF_BOILERPLATE_MIN_RATIO * len(sampled)))
+        return frozenset(key for key, count in counts.items() if count >= min_pages)
+
+    def _layout_text(self, page, boilerplate: Collection[str]) -> str:
+        height = page.rect.height
+        return "\n".join(
+            block[4].strip()
+            for block in self._text_blocks(page)
+            if not (self._in_margin(block, height) and self._margin_key(block[4]) in boilerplate)
+        )
+
+    def iter_pages(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        layout_aware: Optional[bool] = None,
+        boilerplate: Collection[str] = (),
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yields the pages in [start, stop) of a PDF document, one at a time.
+
+        With `layout_aware` (default: PDF_LAYOUT_AWARE) the text is assembled
+        from text blocks in reading order, leaving out margin blocks whose
+        key is in `boilerplate` (see `find_boilerplate`).
+        """
+        layout_aware = settings.PDF_LAYOUT_AWARE if layout_aware is None else layout_aware
         try:
             if self.file_path and self.file_path.lower().endswith(".pdf"):
                 with fitz.open(self.file_path) as doc:
-                    pages = []
-                    for i in range(doc.page_count):
+                    stop = doc.page_count if stop is None else min(stop, doc.page_count)
+                    for i in range(start, stop):
                         page = doc.load_page(i)
-                        raw_text = page.get_text("text")
-                        pages.append({
+                        raw_text = self._layout_text(page, boilerplate) if layout_aware else page.get_text("text")
+                        yield {
                             "page_content": raw_text,
                             "filename": self.file_path,
                             "page_number": i + 1
-                        })
-                return pages
+                        }
         except Exception as e:
             raise RuntimeError(f"Failed to load PDF: {e}")
 
+    def load_documents(self):
+        """Loads a PDF document """
+        if self.file_path and self.file_path.lower().endswith(".pdf"):
+            return list(self.iter_pages())
+
+    @staticmethod
+    def is_empty_page(page: Dict[str, Any]) -> bool:
+        """A page without extractable text, e.g. a scanned image or a blank page."""
+        return not page.get("page_content") or not page["page_content"].strip()
 
-    def split_chunks(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1500,
-            chunk_overlap=200,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        chunks = []
-        for doc in pages:
-            if not doc.get("page_content") or not doc["page_content"].strip():
-                raise NoContentToSplitException()
-            split_docs = text_splitter.create_documents(
-                [doc["page_content"]], metadatas=[{"filename": doc["filename"], "page_number": doc["page_number"]}]
-            )
-            for split_doc in split_docs:
-                chunks.append({
-                    "chunk_text": split_doc.page_content,
-                    "metadata": split_doc.metadata,
-                })
+    def chunk_pages(self, pages: Iterable[Dict[str, Any]]) -> List[Chunk]:
+        """
+        Splits consecutive pages with the shared chunker, so chunks can cross
+        page boundaries, and gives every chunk its deterministic UUID.
+        """
+        chunks = chunker.split_pages(pages)
+        for chunk in chunks:
+            chunk.uuid = self.chunk_uuid(chunk.filename, chunk.page_number, chunk.text)
         return chunks
+
+    def iter_chunks(self, pages: Iterable[Dict[str, Any]], window: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily splits pages into chunk dicts, `window` pages (default:
+        INGEST_PAGES_PER_TASK) at a time, so memory stays bounded. Empty
+        pages yield no chunks.
+        """
+        window = window or settings.INGEST_PAGES_PER_TASK
+        batch: List[Dict[str, Any]] = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) >= window:
+                yield from (chunk.to_dict() for chunk in self.chunk_pages(batch))
+                batch = []
+        if batch:
+            yield from (chunk.to_dict() for chunk in self.chunk_pages(batch))
+
+    def split_chunks(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(self.iter_chunks(pages))
     
-    def create_embeddings(self, chunks: List[Dict[str, Any]]):
+    def create_embeddings(self, chunks: List[Dict[str, Any]], batch_size: int = 32, show_progress_bar: bool = True):
         if not chunks:
             raise NoContentToSplitException()
         try:
-            embeddings = self.embedding_model.encode(
+            return self._encode(
                 [chunk["chunk_text"] for chunk in chunks],
-                normalize_embeddings=True,
-                show_progress_bar=True,
-                batch_size=32
+                normalize=True,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar,
             )
-
-            if hasattr(embeddings, "tolist"):
-                embeddings = embeddings.tolist()
-            return embeddings
         except Exception as e:
             raise EmbeddingModelException()
 
-    def add_objects_to_weaviate(self, embed_docs: List[Dict[str, Any]], weaviate_client, class_name: str) -> int:
-        if not embed_docs:
-            return 0
-        collection = weaviate_client.collections.use(class_name)
-        total_added = 0
-        with collection.batch.fixed_size(batch_size=200) as batch:
-            for doc in embed_docs:
-                batch.add_object(
-                    properties={
-                        "chunk_text": doc["chunk_text"],
-                        "filename": doc["metadata"].get("filename", ""),
-                        "page_number": doc["metadata"].get("page_number", 0),
-                    },
-                    vector=doc["embedding"]    # Insert your embedding
-                )
-                total_added += 1
-        return total_added
+    def create_weaviate_collection(self, weaviate_client, class_name: str):
+        """Creates the chunk collection in the configured vector store if it does not exist yet."""
+        get_vector_store(weaviate_client, class_name).ensure_collection()
 
-    def retrieve_relevant_chunks(self, query: str, weaviate_client, class_name: str, top_k: int = 5):
+    def add_objects_to_weaviate(self, embed_docs: Iterable[Dict[str, Any]], weaviate_client, class_name: str) -> int:
+        """
+        Adds embedded chunks to the configured vector store. `embed_docs` may
+        be a lazy iterable, so inserts can start while upstream stages still run.
+        """
+        return get_vector_store(weaviate_client, class_name).add(embed_docs)
+
+    def delete_objects_from_weaviate(self, object_ids: List[str], weaviate_client, class_name: str) -> int:
+        """Deletes chunks by UUID, returning how many were removed."""
+        return get_vector_store(weaviate_client, class_name).delete(object_ids)
+
+    def embed_query(self, query: str) -> List[float]:
+        try:
+            with span("embed_query"):
+                return self._encode([query], normalize=False)[0]
+        except Exception as e:
+            raise EmbeddingModelException(str(e))
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embeds several queries in one batched model call."""
         try:
-            collection = weaviate_client.collections.use(class_name)
-            query_vector = self.embedding_model.encode(query).tolist()
-
-            # Fix: Ensure limit is set before calling objects(), and handle GenerativeReturn
-            query_obj = collection.query.near_vector(query_vector)
-            if hasattr(query_obj, 'limit'):
-                query_obj = query_obj.limit(top_k)
-            if hasattr(query_obj, 'objects'):
-                response = query_obj.objects() if callable(query_obj.objects) else query_obj.objects
-            else:
-                response = query_obj
-
-            docs = []
-            best_filename = None
-            # Robustly handle response type
-            if isinstance(response, list):
-                iterable_response = response
-            # Remove .objects() call; use response directly
-            # If response is not a list, wrap in list
-            elif response is not None:
-                iterable_response = [response]
-            else:
-                iterable_response = []
-
-            for obj in iterable_response:
-                # Defensive: skip if obj is None or doesn't have 'properties' dict
-                properties = getattr(obj, 'properties', None)
-                if obj is None or not isinstance(properties, dict):
-                    continue
-                chunk_text = properties.get("chunk_text", "")
-                filename = properties.get("filename", "")
-                page_number = properties.get("page_number", "")
-                docs.append({
-                    "chunk_text": chunk_text,
-                    "metadata": {"filename": filename, "page_number": page_number}
-                })
-                if best_filename is None:
-                    best_filename = filename
-            return docs, best_filename
+            with span("embed_queries"):
+                return self._encode(queries, normalize=False, batch_size=settings.EMBEDDING_BATCH_SIZE)
         except Exception as e:
-            raise WeaviateQueryException(str(e))
+            raise EmbeddingModelException(str(e))
+
+    def embed_sentences(self, sentences: List[str]) -> np.ndarray:
+        """Embeds (normalized) answer sentences; they rarely repeat, so the embedding cache is skipped."""
+        try:
+            with span("embed_sentences"):
+                return np.asarray(self.embedding_model.encode(
+                    sentences, normalize_embeddings=True, show_progress_bar=False,
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                ), dtype=np.float32)
+        except Exception as e:
+            raise EmbeddingModelException(str(e))
+
+    def embed_passages(self, texts: List[str]) -> List[List[float]]:
+        """Normalized embeddings of chunk texts, served from the embedding cache filled at ingestion."""
+        try:
+            return self._encode(texts, normalize=True, batch_size=settings.EMBEDDING_BATCH_SIZE)
+        except Exception as e:
+            raise EmbeddingModelException(str(e))
+
+    def search_by_vector(self, query_vector: List[float], weaviate_client, class_name: str, top_k: int = 5):
+        with span("vector_search"):
+            return get_vector_store(weaviate_client, class_name).search(query_vector, top_k)
+
+    def search_by_vectors(self, query_vectors: List[List[float]], weaviate_client, class_name: str, top_k: int = 5):
+        with span("vector_search_batch"):
+            return get_vector_store(weaviate_client, class_name).search_many(query_vectors, top_k)
+
+    def hybrid_search(self, query: str, query_vector: List[float], weaviate_client, class_name: str, top_k: int = 5, alpha: float = 0.5):
+        """Keyword (BM25) + vector search; `alpha` = 1.0 is pure vector, 0.0 pure keyword."""
+        with span("hybrid_search"):
+            return get_vector_store(weaviate_client, class_name).hybrid_search(query, query_vector, top_k, alpha)
+
+    def retrieve_relevant_chunks(self, query: str, weaviate_client, class_name: str, top_k: int = 5):
+        query_vector = self.embed_query(query)
+        return self.search_by_vector(query_vector, weaviate_client, class_name, top_k)
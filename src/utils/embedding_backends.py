@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.config.settings import settings
+from src.core.exceptions import EmbeddingModelException
+
+BACKEND_TORCH = "torch"
+BACKEND_ONNX = "onnx"
+BACKEND_ONNX_INT8 = "onnx-int8"
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_ONNX_INT8)
+
+# Dynamic int8 quantization that runs on any x86-64 CPU with AVX2
+_INT8_QUANTIZATION = "avx2"
+_INT8_FILE_NAME = "onnx/model_quint8_avx2.onnx"
+
+
+def model_id(model_name: str, backend: str) -> str:
+    """Identifies the vectors a model/backend pair produces, e.g. for cache keys."""
+    return model_name if backend == BACKEND_TORCH else f"{model_name}@{backend}"
+
+
+def _onnx_model_kwargs(threads: int) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider"}
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        session_options.inter_op_num_threads = 1
+        kwargs["session_options"] = session_options
+    return kwargs
+
+
+def _load_int8(model_name: str, onnx_file: Optional[str], model_kwargs: Dict[str, Any]):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    try:
+        # Most sentence-transformers models on the Hub ship pre-quantized files
+        return SentenceTransformer(
+            model_name, device="cpu", backend="onnx",
+            model_kwargs={**model_kwargs, "file_name": onnx_file or _INT8_FILE_NAME},
+        )
+    except Exception as e:
+        print(f"No pre-quantized ONNX file for {model_name} ({e}); quantizing it locally.")
+
+    export_dir = os.path.join(settings.EMBEDDING_ONNX_DIR, model_name.replace("/", "__"))
+    if not os.path.exists(os.path.join(export_dir, _INT8_FILE_NAME)):
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, _INT8_QUANTIZATION, export_dir)
+    return SentenceTransformer(
+        export_dir, device="cpu", backend="onnx", model_kwargs={**model_kwargs, "file_name": _INT8_FILE_NAME}
+    )
+
+
+def load_embedding_model(model_name: str, backend: str, threads: int = 0, onnx_file: Optional[str] = None):
+    """
+    Loads a SentenceTransformer for `model_name` on the CPU.
+
+    Backends:
+        torch:     the PyTorch model
+        onnx:      the same weights exported to ONNX and run by ONNX Runtime
+        onnx-int8: dynamically int8-quantized ONNX weights
+
+    The ONNX backends need `pip install "sentence-transformers[onnx]"`.
+    `threads` caps the intra-op threads of the backend (0 keeps its default).
+    """
+    if backend not in BACKENDS:
+        raise EmbeddingModelException(f"Unknown embedding backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        if backend == BACKEND_TORCH:
+            if threads:
+                import torch
+
+                torch.set_num_threads(threads)
+            return SentenceTransformer(model_name, device="cpu")
+
+        model_kwargs = _onnx_model_kwargs(threads)
+        if backend == BACKEND_ONNX:
+            if onnx_file:
+                model_kwargs["file_name"] = onnx_file
+            return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        return _load_int8(model_name, onnx_file, model_kwargs)
+    except ImportError as e:
+        raise EmbeddingModelException(
+            f"The {backend} embedding backend is not installed ({e}); "
+            'install "sentence-transformers[onnx]" for the ONNX backends'
+        )
+
+
+class _EncodeRequest:
+    def __init__(self, texts: List[str], normalize: bool):
+        self.texts = texts
+        self.normalize = normalize
+        self.future: Future = Future()
+
+
+class DynamicBatcher:
+    """
+    Merges concurrent small `encode()` calls, such as the query embeddings of
+    parallel requests, into one forward pass.
+
+    A call waits at most `max_wait_ms` for others to join its batch, which
+    holds up to `max_batch_size` texts. Calls of at least `max_batch_size`
+    texts (ingestion batches) go straight to the model. Exposes the subset
+    of the SentenceTransformer interface DocumentProcessor uses.
+    """
+
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[_EncodeRequest] = []
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, normalize_embeddings: bool = False, show_progress_bar: bool = False, batch_size: int = 32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if len(texts) >= self.max_batch_size:
+            return self.model.encode(
+                texts, normalize_embeddings=normalize_embeddings,
+                show_progress_bar=show_progress_bar, batch_size=batch_size,
+            )
+
+        request = _EncodeRequest(texts, normalize_embeddings)
+        with self._condition:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+            self._pending.append(request)
+            self._condition.notify()
+        vectors = request.future.result()
+        return vectors[0] if single else vectors
+
+    def _next_batch(self) -> List[_EncodeRequest]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while sum(len(request.texts) for request in self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0].texts) <= self.max_batch_size):
+                request = self._pending.pop(0)
+                batch.append(request)
+                size += len(request.texts)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # Normalization is part of the encode call, so each setting is its own pass
+            for normalize in {request.normalize for request in batch}:
+                group = [request for request in batch if request.normalize == normalize]
+                try:
+                    vectors = self.model.encode(
+                        [text for request in group for text in request.texts],
+                        normalize_embeddings=normalize,
+                        show_progress_bar=False,
+                        batch_size=self.max_batch_size,
+                    )
+                except Exception as e:
+                    for request in group:
+                        request.future.set_exception(e)
+                    continue
+                vectors = np.asarray(vectors)
+                offset = 0
+                for request in group:
+                    request.future.set_result(vectors[offset:offset + len(request.texts)])
+                    offset += len(request.texts)
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.metrics import record_cache_lookup
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache shared by ingestion and queries.
+
+    Vectors live in a memory-mapped float32 array of `capacity` rows and a
+    SQLite index maps sha256(model, normalization, text) to a row. When the
+    array is full the least recently used rows are overwritten.
+
+    A cache directory belongs to one process: rows are read after the index
+    lookup, under an in-process lock only, so another process could
+    overwrite a row in between. Give each API process its own
+    EMBEDDING_CACHE_DIR.
+    """
+
+    def __init__(self, directory: str, model_name: str, dim: int, capacity: int):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.join(directory, re.sub(r"[^\w.-]", "_", model_name))
+        os.makedirs(cache_dir, exist_ok=True)
+        vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._conn = sqlite3.connect(
+            os.path.join(cache_dir, "index.sqlite3"), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, slot INTEGER NOT NULL UNIQUE, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+        layout = f"{dim}x{capacity}"
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'layout'").fetchone()
+        if row is None or row[0] != layout or not os.path.exists(vectors_path):
+            # Shape changed (or first run): start from an empty cache
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('layout', ?)", (layout,))
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+        else:
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+
+    def _key(self, text: str, normalized: bool) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{int(normalized)}\0{text}".encode("utf-8")).hexdigest()
+
+    def _lookup_slots(self, keys: Sequence[str]) -> Dict[str, int]:
+        """Maps the cached keys among `keys` to their rows and marks them as recently used."""
+        found: Dict[str, int] = {}
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self._conn.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", batch
+            ).fetchall())
+        if found:
+            now = time.time_ns()
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+            )
+        return found
+
+    def get_many(self, texts: Sequence[str], normalized: bool) -> List[Optional[np.ndarray]]:
+        """Returns a cached vector (or None) for every text, in order."""
+        keys = [self._key(text, normalized) for text in texts]
+        with self._lock:
+            found = self._lookup_slots(keys)
+            results = [np.array(self._vectors[found[key]]) if key in found else None for key in keys]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        record_cache_lookup("embedding", hits=hits, misses=len(keys) - hits)
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]], normalized: bool):
+        """Stores vectors for `texts`, evicting the least recently used rows when full."""
+        items = {self._key(text, normalized): vector for text, vector in zip(texts, vectors)}
+        if not items:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                keys = list(items)[-self.capacity:]
+                # Touching existing keys first keeps them out of the eviction victims
+                existing = self._lookup_slots(keys)
+                new_keys = [key for key in keys if key not in existing]
+                used = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                free_slots = list(range(used, min(self.capacity, used + len(new_keys))))
+                evict_count = len(new_keys) - len(free_slots)
+                victims = self._conn.execute(
+                    "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (evict_count,)
+                ).fetchall() if evict_count > 0 else []
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+                self.evictions += len(victims)
+
+                now = time.time_ns()
+                slots = free_slots + [slot for _, slot in victims]
+                for key, slot in zip(new_keys, slots):
+                    self._vectors[slot] = np.asarray(items[key], dtype=np.float32)
+                self._vectors.flush()
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for key, slot in zip(new_keys, slots)],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": entries,
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
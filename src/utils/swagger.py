@@ -9,7 +9,7 @@ from src.schemas.responses import (
 
 upload_endpoint = {
 	"summary": "Upload and process PDF documents",
-	"description": "Upload one or more PDF files. The files will be processed, embedded, and stored in the vector database. Returns processing metadata.",
+	"description": "Upload one or more PDF files. The files are processed, embedded, and stored in the vector database by a background job. Returns the job id.",
 	"requestBody": {
 		"content": {
 			"multipart/form-data": {
@@ -29,15 +29,15 @@ upload_endpoint = {
 	},
 	"responses": {
 		200: {
-			"description": "Documents processed and stored successfully",
+			"description": "Documents queued for background processing; follow progress at /jobs/{job_id}",
 			"content": {
 				"application/json": {
 					"example": {
-						"statusCode": 200,
+						"statusCode": 202,
 						"success": True,
-						"message": "PDF documents processed and stored successfully",
-						"documents_processed": 2,
-						"vectors_stored": 10
+						"message": "PDF documents queued for processing",
+						"job_id": "3f1c2a9e8b7d4c6fa1e2d3c4b5a69788",
+						"status": "queued"
 					}
 				}
 			}
@@ -73,11 +73,11 @@ query_endpoint = {
 	"requestBody": {
 		"content": {
 			"application/json": {
-				"schema": QueryRequest.schema(),
+				"schema": QueryRequest.model_json_schema(),
 				"example": {
 					"query": "What are the online services does APMC provide?",
 					"top_k": 5,
-					"min_score": 0.8
+					"min_score": 0.3
 				}
 			}
 		}
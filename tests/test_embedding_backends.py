@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from src.config.settings import settings
+from src.utils.embedding_backends import BACKEND_ONNX, BACKEND_ONNX_INT8, BACKEND_TORCH, load_embedding_model
+
+# Lowest acceptable cosine similarity of a backend's vectors to the PyTorch ones
+MIN_COSINE = 0.98
+
+SENTENCES = [
+    "How do I renew a trader licence?",
+    "The registration fee is payable before the end of the first week of term.",
+    "Late submissions lose ten percent of the marks per day.",
+    "Students can defer an exam on medical grounds with a doctor's note.",
+    "Hostel rooms are allocated in order of application.",
+    "What documents do I need to open a business account?",
+    "Refunds are processed within fourteen working days.",
+    "The library is open from eight in the morning until midnight.",
+]
+
+
+def _encode(backend: str):
+    model = load_embedding_model(settings.EMBEDDING_MODEL, backend)
+    return np.asarray(model.encode(SENTENCES, normalize_embeddings=True, show_progress_bar=False), dtype=np.float32)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return _encode(BACKEND_TORCH)
+
+
+@pytest.mark.parametrize("backend", [BACKEND_ONNX, BACKEND_ONNX_INT8])
+def test_onnx_vectors_match_the_torch_reference(backend, reference, tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+    # A locally quantized int8 model is exported here rather than under data/
+    monkeypatch.setattr(settings, "EMBEDDING_ONNX_DIR", str(tmp_path))
+
+    # Both sides are normalized, so the row-wise dot product is the cosine similarity
+    cosine = np.sum(_encode(backend) * reference, axis=1)
+    assert cosine.min() >= MIN_COSINE
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fakes import FakeGeminiModel
+from src.core.exceptions import LLMServiceAPIException, LLMUnavailableException
+from src.services.llm_gateway import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, LLMGateway, is_retryable,
+)
+
+RESET_SECONDS = 0.05
+
+
+def _gateway(max_attempts: int = 2) -> LLMGateway:
+    return LLMGateway(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        burst_seconds=1,
+        max_attempts=max_attempts,
+        backoff_seconds=0,
+        max_backoff_seconds=0,
+        attempt_timeout_seconds=5,
+        deadline_seconds=5,
+        breaker=CircuitBreaker(failure_threshold=2, reset_seconds=RESET_SECONDS),
+    )
+
+
+def _call(model: FakeGeminiModel):
+    return lambda prompt, timeout: model.generate_content(prompt).text
+
+
+def _recovering_call(model: FakeGeminiModel):
+    """Fails while the model's error rate says so, then the model recovers."""
+    def call(prompt, timeout):
+        try:
+            return model.generate_content(prompt).text
+        finally:
+            model.error_rate = 0.0
+    return call
+
+
+def _open(gateway: LLMGateway, model: FakeGeminiModel):
+    model.error_rate = 1.0
+    for i in range(2):
+        with pytest.raises(LLMServiceAPIException):
+            gateway.call(f"failing prompt {i}", _call(model))
+    assert gateway.breaker.state == CIRCUIT_OPEN
+
+
+def test_half_open_trial_keeps_its_slot_through_retries():
+    gateway, model = _gateway(), FakeGeminiModel()
+    _open(gateway, model)
+
+    calls = model.calls
+    with pytest.raises(LLMUnavailableException):
+        gateway.call("rejected while open", _call(model))
+    assert model.calls == calls
+
+    time.sleep(RESET_SECONDS)
+    # The trial's first attempt is throttled, its retry succeeds
+    model.error_rate = 1.0
+    assert gateway.call("trial prompt", _recovering_call(model))
+    assert model.calls == calls + 2
+    assert gateway.breaker.state == CIRCUIT_CLOSED
+    assert gateway.call("healthy prompt", _call(model))
+
+
+def test_failed_trial_reopens_and_allows_the_next_trial():
+    gateway, model = _gateway(), FakeGeminiModel()
+    _open(gateway, model)
+
+    time.sleep(RESET_SECONDS)
+    with pytest.raises(LLMServiceAPIException):
+        gateway.call("failing trial", _call(model))
+    assert gateway.breaker.state == CIRCUIT_OPEN
+
+    time.sleep(RESET_SECONDS)
+    model.error_rate = 0.0
+    assert gateway.call("next trial", _call(model))
+    assert gateway.breaker.state == CIRCUIT_CLOSED
+
+
+def test_cancelled_async_trial_releases_its_slot():
+    gateway, model = _gateway(), FakeGeminiModel()
+    _open(gateway, model)
+    time.sleep(RESET_SECONDS)
+
+    async def generate(prompt, timeout):
+        return (await model.generate_content_async(prompt)).text
+
+    async def run():
+        model.error_rate, model.latency_ms = 0.0, 1000.0
+        trial = asyncio.create_task(gateway.call_async("cancelled trial", generate))
+        await asyncio.sleep(0.01)
+        assert gateway.breaker.state == CIRCUIT_HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        model.latency_ms = 0.0
+        return await gateway.call_async("trial after disconnect", generate)
+
+    assert asyncio.run(run())
+    assert gateway.breaker.state == CIRCUIT_CLOSED
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (RuntimeError("429 Resource has been exhausted (e.g. check quota)."), True),
+    (RuntimeError("503 The model is overloaded."), True),
+    (TimeoutError(), True),
+    (ValueError("400 Request contains an invalid argument: id 45001"), False),
+    (ValueError("invalid timeout value in the connection settings"), False),
+])
+def test_retryable_errors_match_status_codes_and_phrases(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_client_errors_leave_the_breaker_alone():
+    gateway, model = _gateway(), FakeGeminiModel()
+    _open(gateway, model)
+    time.sleep(RESET_SECONDS)
+
+    def invalid(prompt, timeout):
+        raise ValueError("400 Request contains an invalid argument.")
+
+    with pytest.raises(ValueError):
+        gateway.call("invalid trial", invalid)
+    # Neither closed nor reopened; the next call gets the trial slot
+    assert gateway.breaker.state == CIRCUIT_HALF_OPEN
+    model.error_rate = 0.0
+    assert gateway.call("next trial", _call(model))
+    assert gateway.breaker.state == CIRCUIT_CLOSED
@@ -0,0 +1,46 @@
+import pytest
+
+from src.services.sessions import SessionStore
+
+
+def _store() -> SessionStore:
+    return SessionStore(
+        max_sessions=10,
+        ttl_seconds=60,
+        max_turns=5,
+        history_turns=3,
+        history_tokens=500,
+        reuse_similarity=0.9,
+        topic_terms=3,
+    )
+
+
+def _previous(store: SessionStore, question: str):
+    store.record("s1", question, question, "answer", None, ("hybrid", 5))
+    return store.last_turn("s1")
+
+
+@pytest.mark.parametrize("query", [
+    "Is there a late fee for the library?",
+    "Is this course open to part-time students?",
+    "Can one pay the tuition fee online?",
+    "When is it possible to defer an exam?",
+])
+def test_independent_questions_are_kept(query):
+    store = _store()
+    previous = _previous(store, "What is the hostel registration deadline?")
+    assert not store.is_follow_up(query)
+    assert store.rewrite(query, previous) == query
+
+
+@pytest.mark.parametrize("query", [
+    "And for postgraduates?",
+    "What about the fee?",
+    "It is due when?",
+    "How much does it cost?",
+])
+def test_follow_ups_get_the_previous_topic(query):
+    store = _store()
+    previous = _previous(store, "What is the hostel registration deadline?")
+    assert store.is_follow_up(query)
+    assert store.rewrite(query, previous).startswith(f"{query} hostel registration")